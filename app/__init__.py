@@ -61,6 +61,41 @@ def create_app(test_config: dict | None = None) -> Flask:
         SECRET_KEY="change-me",
         SQLALCHEMY_DATABASE_URI=f"sqlite:///{Path(app.instance_path) / 'qualidade.db'}",
         SQLALCHEMY_TRACK_MODIFICATIONS=False,
+        # PRAGMAs aplicados a cada conexão do SQLite, na ordem (ver app/sqlite_profile.py); {} mantém os padrões
+        SQLITE_PRAGMAS={
+            'busy_timeout': 10000,
+            'journal_mode': 'WAL',
+            'synchronous': 'NORMAL',
+            'cache_size': -64 * 1024,
+            'mmap_size': 256 * 1024 * 1024,
+            'temp_store': 'MEMORY',
+        },
+        # Cache em processo dos consolidados do painel (entradas / segundos)
+        QUERY_CACHE_SIZE=256,
+        QUERY_CACHE_TTL=300,
+        # Arquivo com a versão dos dados, compartilhado pelos processos do servidor (None = instance/data_version)
+        DATA_VERSION_FILE=None,
+        # Índices das tabelas do Input*Dados (ordem e trigramas de cada coluna), em entradas
+        TABLE_INDEX_CACHE_SIZE=256,
+        # Planilhas do Input*Dados persistidas em disco (None = instance/datasets)
+        DATASETS_DIR=None,
+        # Cache das planilhas já lidas, por hash do arquivo (None = instance/parse_cache)
+        PARSE_CACHE_DIR=None,
+        PARSE_CACHE_MAX_BYTES=512 * 1024 * 1024,
+        PARSE_CACHE_MAX_ENTRIES=64,
+        # Jobs de importação do Input*Dados (None = instance/jobs; INGEST_WORKERS=None usa até 4 processos, 0 lê no próprio processo)
+        INGEST_JOBS_DIR=None,
+        INGEST_WORKERS=None,
+        INGEST_MAX_JOBS=2,
+        INGEST_JOB_RETENTION_HOURS=24,
+        # Servidor de produção (servidor.py --cli --production e painel Tk): threads por processo, processos,
+        # conexões abertas por processo, fila do listen, keep-alive ocioso e espera no encerramento (segundos)
+        SERVER_THREADS=8,
+        SERVER_PROCESSES=1,
+        SERVER_CONNECTION_LIMIT=200,
+        SERVER_BACKLOG=1024,
+        SERVER_CHANNEL_TIMEOUT=120,
+        SERVER_SHUTDOWN_TIMEOUT=30,
     )
 
     # Allow override for tests
@@ -72,20 +107,47 @@ def create_app(test_config: dict | None = None) -> Flask:
     # Init DB
     db.init_app(app)
 
+    from .sqlite_profile import init_sqlite_profile
+    init_sqlite_profile(app)
+
+    from .cache import init_query_cache
+    init_query_cache(app)
+
+    from .table_index import init_table_index
+    init_table_index(app)
+
+    from .datasets import init_dataset_store
+    init_dataset_store(app)
+
+    from .parse_cache import init_parse_cache
+    init_parse_cache(app)
+
+    from .jobs import init_ingest_jobs
+    init_ingest_jobs(app)
+
     # Models
-    from .models import ConfigList, Colaborador
+    from .models import ConfigList, Colaborador, ResumoDiario
+    from .summary import ensure_summary
+    from .search import ensure_fts
 
     with app.app_context():
         db.create_all()
         # Seed default lists if empty
         if ConfigList.query.count() == 0:
             seed_defaults()
+        ensure_columns()
         ensure_indexes()
+        ensure_summary()
+        ensure_fts()
 
     # Blueprints / routes
     from .views import bp
     app.register_blueprint(bp)
 
+    # Comandos de manutenção (flask --app servidor ...)
+    from .cli import register_commands
+    register_commands(app)
+
     return app
 
 
@@ -104,11 +166,52 @@ def seed_defaults():
     db.session.commit()
 
 
+# Colunas incluídas depois da criação das tabelas (db.create_all não altera tabelas existentes).
+# (tabela, coluna, definição)
+ADDED_COLUMNS = (
+    # Versão do registro para a edição e a API em lote (concorrência otimista)
+    ('colaboradores', 'versao', 'INTEGER NOT NULL DEFAULT 1'),
+)
+
+
+def ensure_columns():
+    """Acrescenta às tabelas existentes as colunas de ``ADDED_COLUMNS`` que faltarem."""
+    for table, column, definition in ADDED_COLUMNS:
+        existing = {row[1] for row in db.session.execute(text(f"PRAGMA table_info({table})"))}
+        if column not in existing:
+            db.session.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {definition}"))
+    db.session.commit()
+
+
+# Índices compostos alinhados às consultas de views.py / aggregations.py.
+# (nome, tabela, colunas) — confira os planos com: flask --app servidor indices-explain
+INDEXES = (
+    # /tabela e /tabela/export: filtro por período + ORDER BY data, created_at (id desempata)
+    ('ix_colaboradores_data_created', 'colaboradores', ('data', 'created_at', 'id')),
+    # Consolidados lidos da origem (resumo-rebuild, conferência): cobre filtro e GROUP BY
+    ('ix_colaboradores_painel', 'colaboradores', ('data', 'turno', 'tipo', 'setor', 'supervisor', 'matricula')),
+    # Merge TALKMAN (painel HC, manipular_dados) e coluna Treinado
+    ('ix_colaboradores_tipo_matricula', 'colaboradores', ('tipo', 'matricula')),
+    # Catálogo de dimensões (DISTINCT turno/tipo/setor/supervisor + min/max data)
+    ('ix_resumo_diario_dimensoes', 'resumo_diario', ('turno', 'tipo', 'setor', 'supervisor', 'data')),
+)
+
+# Índices substituídos pelos compostos acima (prefixos redundantes)
+OBSOLETE_INDEXES = (
+    'ix_colaboradores_data',
+    'ix_colaboradores_created_at',
+)
+
+
 def ensure_indexes():
     """Cria índices úteis no SQLite se não existirem (melhora filtros/ordenação)."""
     try:
-        db.session.execute(text("CREATE INDEX IF NOT EXISTS ix_colaboradores_data ON colaboradores (data)"))
-        db.session.execute(text("CREATE INDEX IF NOT EXISTS ix_colaboradores_created_at ON colaboradores (created_at)"))
+        for name in OBSOLETE_INDEXES:
+            db.session.execute(text(f"DROP INDEX IF EXISTS {name}"))
+        for name, table, columns in INDEXES:
+            db.session.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({', '.join(columns)})"))
+        # Atualiza as estatísticas do planejador quando necessário (barato se nada mudou)
+        db.session.execute(text("PRAGMA optimize"))
         db.session.commit()
     except Exception:
         db.session.rollback()
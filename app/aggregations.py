@@ -0,0 +1,268 @@
+"""Agregações dos consolidados do painel gráfico.
+
+O painel precisa de várias séries sobre o mesmo recorte de ``colaboradores``
+(setor, tipo, turno, linha do tempo, totais e limites de data). Em vez de uma
+consulta por série, os registros filtrados são lidos uma única vez, já
+agrupados no menor grão necessário (data, dimensões e matrícula), e todas as
+séries são derivadas dessa leitura em uma passada do pandas.
+
+O painel lê as mesmas séries de ``resumo_diario`` (``summary_dashboard_aggregates``);
+a leitura direta de ``colaboradores`` continua disponível como referência.
+"""
+import json
+from collections import Counter
+from datetime import datetime
+
+import pandas as pd
+from sqlalchemy import func, select
+
+from . import db
+from .models import Colaborador, ResumoDiario
+
+
+DIMENSION_COLUMNS = ('turno', 'tipo', 'setor', 'supervisor')
+
+
+def _is_selected(value) -> bool:
+    return bool(value) and value != 'all'
+
+
+def _order_counts(counts: pd.Series) -> tuple[list, list]:
+    """Ordena uma contagem por valor decrescente e, nos empates, pela chave decrescente.
+
+    O desempate pela chave é proposital: as consultas originais
+    (``ORDER BY count(...) DESC``) deixavam a ordem dos empates por conta do
+    plano do SQLite, que muda com os índices; aqui ela é sempre a mesma.
+    """
+    if counts.empty:
+        return [], []
+    frame = counts.rename('qtd').rename_axis('chave').reset_index()
+    frame = frame.sort_values(['qtd', 'chave'], ascending=[False, False], kind='mergesort')
+    return frame['chave'].tolist(), [int(v) for v in frame['qtd'].tolist()]
+
+
+def _order_counter(counter: Counter) -> tuple[list, list]:
+    return _order_counts(pd.Series(dict(counter), dtype='int64'))
+
+
+def _timeline_points(rows) -> list[list[int]]:
+    points = []
+    for data, qtd in rows:
+        try:
+            # Usar meio-dia para evitar DST edge-cases
+            ts = datetime(data.year, data.month, data.day, 12, 0, 0)
+            points.append([int(ts.timestamp() * 1000), int(qtd or 0)])
+        except Exception:
+            pass
+    return points
+
+
+def catalog_statement(model=ResumoDiario):
+    return (
+        select(
+            model.turno,
+            model.tipo,
+            model.setor,
+            model.supervisor,
+            func.min(model.data).label('min_data'),
+            func.max(model.data).label('max_data'),
+        )
+        .group_by(model.turno, model.tipo, model.setor, model.supervisor)
+    )
+
+
+def load_dimension_catalog(model=ResumoDiario) -> dict:
+    """Lê em uma única consulta os valores distintos das dimensões e a faixa total de datas.
+
+    Por padrão usa ``resumo_diario``; ``model=Colaborador`` lê a tabela de origem.
+    """
+    rows = db.session.execute(catalog_statement(model)).all()
+
+    distinct = {column: set() for column in DIMENSION_COLUMNS}
+    min_all = max_all = None
+    for row in rows:
+        for column in DIMENSION_COLUMNS:
+            value = getattr(row, column)
+            if value is not None:
+                distinct[column].add(value)
+        if row.min_data is not None and (min_all is None or row.min_data < min_all):
+            min_all = row.min_data
+        if row.max_data is not None and (max_all is None or row.max_data > max_all):
+            max_all = row.max_data
+
+    return {
+        'min_all': min_all,
+        'max_all': max_all,
+        'turnos': sorted(distinct['turno']),
+        'tipos': sorted(distinct['tipo']),
+        'setores': sorted(distinct['setor']),
+        'supervisores': sorted(distinct['supervisor']),
+    }
+
+
+def grain_statement(sel_min, sel_max, turno=None, tipo=None):
+    grain = (
+        Colaborador.data,
+        Colaborador.turno,
+        Colaborador.tipo,
+        Colaborador.setor,
+        Colaborador.supervisor,
+        Colaborador.matricula,
+    )
+    stmt = select(
+        *grain,
+        func.count(Colaborador.id).label('registros'),
+        func.count(Colaborador.matricula).label('com_matricula'),
+    )
+    if sel_min:
+        stmt = stmt.where(Colaborador.data >= sel_min)
+    if sel_max:
+        stmt = stmt.where(Colaborador.data <= sel_max)
+    if _is_selected(turno):
+        stmt = stmt.where(Colaborador.turno == turno)
+    if _is_selected(tipo):
+        stmt = stmt.where(Colaborador.tipo == tipo)
+    return stmt.group_by(*grain)
+
+
+def read_filtered_grain(sel_min, sel_max, turno=None, tipo=None) -> pd.DataFrame:
+    """Lê os registros do período já agregados por (data, dimensões, matrícula).
+
+    ``registros`` conta linhas e ``com_matricula`` conta matrículas não nulas,
+    o suficiente para reproduzir ``count(id)``, ``count(matricula)`` e
+    ``count(distinct matricula)`` de qualquer recorte.
+    """
+    columns = ['data', *DIMENSION_COLUMNS, 'matricula', 'registros', 'com_matricula']
+    rows = db.session.execute(grain_statement(sel_min, sel_max, turno=turno, tipo=tipo)).all()
+    return pd.DataFrame([tuple(r) for r in rows], columns=columns)
+
+
+def aggregate_grain(grain: pd.DataFrame, setor=None, supervisor=None) -> dict:
+    """Deriva todas as séries do painel a partir do grão lido por ``read_filtered_grain``.
+
+    Setor e supervisor só restringem a linha do tempo, como no painel original.
+    """
+    if grain.empty:
+        return {
+            'total_colaboradores': 0,
+            'min_data': None,
+            'max_data': None,
+            'setor_labels': [], 'setor_series': [],
+            'tipo_labels': [], 'tipo_series': [],
+            'turno_labels': [], 'turno_series': [],
+            'stacked_categories': [], 'stacked_series': [],
+            'timeline_data': [],
+        }
+
+    has_matricula = grain['matricula'].notna()
+
+    setor_rows = grain[grain['setor'].notna() & has_matricula]
+    setor_distinct = setor_rows.drop_duplicates(['setor', 'matricula']).groupby('setor').size()
+    setor_labels, setor_series = _order_counts(setor_distinct)
+
+    tipo_rows = grain[grain['tipo'].notna()]
+    tipo_labels, tipo_series = _order_counts(tipo_rows.groupby('tipo')['com_matricula'].sum())
+
+    turno_rows = grain[grain['turno'].notna()]
+    turno_labels, turno_series = _order_counts(turno_rows.groupby('turno')['com_matricula'].sum())
+
+    stacked_rows = grain[grain['setor'].notna()]
+    stacked_categories, stacked_series = _order_counts(stacked_rows.groupby('setor')['registros'].sum())
+
+    time_rows = grain
+    if _is_selected(setor):
+        time_rows = time_rows[time_rows['setor'] == setor]
+    if _is_selected(supervisor):
+        time_rows = time_rows[time_rows['supervisor'] == supervisor]
+    time_rows = time_rows[time_rows['matricula'].notna()]
+    timeline = (
+        time_rows
+        .drop_duplicates(['data', 'matricula'])
+        .groupby('data')
+        .size()
+        .sort_index()
+    )
+
+    return {
+        'total_colaboradores': int(grain['registros'].sum()),
+        'min_data': grain['data'].min(),
+        'max_data': grain['data'].max(),
+        'setor_labels': setor_labels, 'setor_series': setor_series,
+        'tipo_labels': tipo_labels, 'tipo_series': tipo_series,
+        'turno_labels': turno_labels, 'turno_series': turno_series,
+        'stacked_categories': stacked_categories, 'stacked_series': stacked_series,
+        'timeline_data': _timeline_points(timeline.items()),
+    }
+
+
+def compute_dashboard_aggregates(sel_min, sel_max, turno=None, tipo=None, setor=None, supervisor=None) -> dict:
+    """Calcula os consolidados do painel com uma leitura dos registros filtrados."""
+    grain = read_filtered_grain(sel_min, sel_max, turno=turno, tipo=tipo)
+    return aggregate_grain(grain, setor=setor, supervisor=supervisor)
+
+
+def summary_statement(sel_min, sel_max, turno=None, tipo=None):
+    stmt = select(
+        ResumoDiario.data,
+        ResumoDiario.turno,
+        ResumoDiario.tipo,
+        ResumoDiario.setor,
+        ResumoDiario.supervisor,
+        ResumoDiario.registros,
+        ResumoDiario.matriculas,
+    )
+    if sel_min:
+        stmt = stmt.where(ResumoDiario.data >= sel_min)
+    if sel_max:
+        stmt = stmt.where(ResumoDiario.data <= sel_max)
+    if _is_selected(turno):
+        stmt = stmt.where(ResumoDiario.turno == turno)
+    if _is_selected(tipo):
+        stmt = stmt.where(ResumoDiario.tipo == tipo)
+    return stmt
+
+
+def summary_dashboard_aggregates(sel_min, sel_max, turno=None, tipo=None, setor=None, supervisor=None) -> dict:
+    """Calcula os mesmos consolidados de ``compute_dashboard_aggregates`` a partir de ``resumo_diario``.
+
+    Contagens simples somam ``registros``; contagens distintas unem os
+    conjuntos de matrículas de cada chave.
+    """
+    stmt = summary_statement(sel_min, sel_max, turno=turno, tipo=tipo)
+    total = 0
+    min_data = max_data = None
+    tipo_counts, turno_counts, setor_counts = Counter(), Counter(), Counter()
+    setor_matriculas, timeline_matriculas = {}, {}
+    for row in db.session.execute(stmt):
+        registros = int(row.registros or 0)
+        if registros <= 0:
+            continue
+        matriculas = json.loads(row.matriculas or '{}').keys()
+        total += registros
+        min_data = row.data if min_data is None or row.data < min_data else min_data
+        max_data = row.data if max_data is None or row.data > max_data else max_data
+        tipo_counts[row.tipo] += registros
+        turno_counts[row.turno] += registros
+        setor_counts[row.setor] += registros
+        setor_matriculas.setdefault(row.setor, set()).update(matriculas)
+        if _is_selected(setor) and row.setor != setor:
+            continue
+        if _is_selected(supervisor) and row.supervisor != supervisor:
+            continue
+        timeline_matriculas.setdefault(row.data, set()).update(matriculas)
+
+    setor_labels, setor_series = _order_counter(Counter({k: len(v) for k, v in setor_matriculas.items()}))
+    tipo_labels, tipo_series = _order_counter(tipo_counts)
+    turno_labels, turno_series = _order_counter(turno_counts)
+    stacked_categories, stacked_series = _order_counter(setor_counts)
+
+    return {
+        'total_colaboradores': total,
+        'min_data': min_data,
+        'max_data': max_data,
+        'setor_labels': setor_labels, 'setor_series': setor_series,
+        'tipo_labels': tipo_labels, 'tipo_series': tipo_series,
+        'turno_labels': turno_labels, 'turno_series': turno_series,
+        'stacked_categories': stacked_categories, 'stacked_series': stacked_series,
+        'timeline_data': _timeline_points((data, len(matriculas)) for data, matriculas in sorted(timeline_matriculas.items())),
+    }
@@ -0,0 +1,195 @@
+"""Alteração e exclusão de colaboradores em lote (``POST /api/colaboradores/lote``).
+
+Corpo da requisição (JSON)::
+
+    {"atualizar": [{"id": 10, "versao": 3, "campos": {"supervisor": "JOÃO"}}, ...],
+     "excluir": [{"id": 11, "versao": 1}, ...]}
+
+Os campos seguem as regras do formulário (listas sem diferenciar maiúsculas e
+acentos, Supervisor em MAIÚSCULO, datas ``AAAA-MM-DD`` ou ``DD/MM/AAAA``).
+
+Concorrência otimista: cada registro tem a coluna ``versao``, incrementada a
+cada gravação (pelo ORM, via ``version_id_col``, e aqui na própria
+instrução). Quem envia o lote informa a versão que leu; se algum registro foi
+alterado ou excluído desde então, o lote inteiro é recusado (``BatchConflict``)
+com as versões atuais, e nada é gravado.
+
+O lote é uma transação: as alterações com os mesmos campos viram um único
+``UPDATE ... WHERE id = ? AND versao = ?`` executado por ``executemany``, as
+exclusões um ``DELETE`` igual, e o resumo diário recebe um só delta.
+"""
+from sqlalchemy import bindparam, delete, select, update
+
+from . import db
+from .bulk_import import FIELD_LABELS, clean_value
+from .models import Colaborador
+from .summary import apply_summary_delta
+
+
+BATCH_FIELDS = tuple(FIELD_LABELS)
+
+BATCH_MAX_ITEMS = 5000
+
+# Limite de parâmetros por consulta do SQLite (versões antigas: 999)
+_SELECT_CHUNK = 900
+
+_table = Colaborador.__table__
+
+
+class BatchError(ValueError):
+    """Lote inválido; ``errors`` traz os problemas encontrados, um por item."""
+
+    def __init__(self, message: str, errors=()):
+        super().__init__(message)
+        self.errors = list(errors)
+
+
+class BatchConflict(Exception):
+    """Registros alterados ou excluídos por outra gravação depois de lidos.
+
+    ``conflicts`` é ``[{'id': ..., 'versao_atual': ...}]`` (``None`` se excluído).
+    """
+
+    def __init__(self, conflicts):
+        super().__init__(f'{len(conflicts)} registro(s) alterado(s) por outra gravação')
+        self.conflicts = conflicts
+
+
+def _item_key(item, position: int, errors: list, section: str):
+    if not isinstance(item, dict):
+        errors.append(f'{section}[{position}]: item deve ser um objeto com id e versao')
+        return None
+    try:
+        item_id = int(item['id'])
+        versao = int(item['versao'])
+    except (KeyError, TypeError, ValueError):
+        errors.append(f'{section}[{position}]: id e versao devem ser números inteiros')
+        return None
+    return item_id, versao
+
+
+def parse_batch(payload, lists: dict):
+    """Valida o corpo da requisição; devolve (alterações ``[(id, versao, campos)]``, exclusões ``[(id, versao)]``).
+
+    ``lists`` vem de ``bulk_import.load_lists()``. Levanta ``BatchError``.
+    """
+    if not isinstance(payload, dict):
+        raise BatchError('Envie um JSON com "atualizar" e/ou "excluir".')
+    raw_updates = payload.get('atualizar') or []
+    raw_deletes = payload.get('excluir') or []
+    if not isinstance(raw_updates, list) or not isinstance(raw_deletes, list):
+        raise BatchError('"atualizar" e "excluir" devem ser listas.')
+    if not raw_updates and not raw_deletes:
+        raise BatchError('Nenhum registro informado.')
+    if len(raw_updates) + len(raw_deletes) > BATCH_MAX_ITEMS:
+        raise BatchError(f'Lote acima do limite de {BATCH_MAX_ITEMS} registros.')
+
+    errors = []
+    updates = []
+    for position, item in enumerate(raw_updates):
+        key = _item_key(item, position, errors, 'atualizar')
+        if key is None:
+            continue
+        campos = item.get('campos')
+        if not isinstance(campos, dict) or not campos:
+            errors.append(f'atualizar[{position}] (id {key[0]}): informe os campos a alterar')
+            continue
+        cleaned = {}
+        for field, value in campos.items():
+            if field not in BATCH_FIELDS:
+                errors.append(f"atualizar[{position}] (id {key[0]}): campo desconhecido '{field}'")
+                continue
+            try:
+                cleaned[field], problem = clean_value(field, value, lists)
+            except (ValueError, TypeError, OverflowError) as err:
+                # Valor que nem a conversão aceita (tipo inesperado no JSON): erro do item, não 500
+                problem = f'Valor inválido para {FIELD_LABELS[field]} ({err})'
+            if problem:
+                errors.append(f'atualizar[{position}] (id {key[0]}): {problem}')
+        updates.append((key[0], key[1], cleaned))
+
+    deletes = []
+    for position, item in enumerate(raw_deletes):
+        key = _item_key(item, position, errors, 'excluir')
+        if key is not None:
+            deletes.append(key)
+
+    seen = set()
+    for item_id in [item_id for item_id, _, _ in updates] + [item_id for item_id, _ in deletes]:
+        if item_id in seen:
+            errors.append(f'id {item_id} aparece mais de uma vez no lote')
+        seen.add(item_id)
+
+    if errors:
+        raise BatchError('Lote inválido; nada foi alterado.', errors)
+    return updates, deletes
+
+
+def _current_rows(ids) -> dict:
+    """``{id: linha}`` com versão e campos do resumo dos registros ``ids`` que existem."""
+    columns = (_table.c.id, _table.c.versao, _table.c.data, _table.c.turno, _table.c.tipo,
+               _table.c.setor, _table.c.supervisor, _table.c.matricula)
+    rows = {}
+    ids = list(ids)
+    for start in range(0, len(ids), _SELECT_CHUNK):
+        chunk = ids[start:start + _SELECT_CHUNK]
+        for row in db.session.execute(select(*columns).where(_table.c.id.in_(chunk))):
+            rows[row.id] = row
+    return rows
+
+
+def _conflicts(expected: dict, rows: dict):
+    return [
+        {'id': item_id, 'versao_atual': rows[item_id].versao if item_id in rows else None}
+        for item_id, versao in expected.items()
+        if item_id not in rows or rows[item_id].versao != versao
+    ]
+
+
+def _entry(row, campos=None) -> tuple:
+    values = {**row._mapping, **(campos or {})}
+    return (values['data'], values['turno'], values['tipo'], values['setor'], values['supervisor'], values['matricula'])
+
+
+def apply_batch(updates, deletes) -> dict:
+    """Grava o lote na transação da sessão, sem commit; em conflito desfaz e levanta ``BatchConflict``.
+
+    Devolve ``{'atualizados': n, 'excluidos': n, 'versoes': {id: nova versão}}``.
+    """
+    expected = {item_id: versao for item_id, versao, _ in updates}
+    expected.update(deletes)
+    rows = _current_rows(expected)
+    conflicts = _conflicts(expected, rows)
+    if conflicts:
+        raise BatchConflict(conflicts)
+
+    connection = db.session.connection()
+    groups = {}
+    for item_id, versao, campos in updates:
+        groups.setdefault(tuple(sorted(campos.items())), []).append({'_id': item_id, '_versao': versao})
+    matched = 0
+    for fields, params in groups.items():
+        statement = (
+            update(_table)
+            .where(_table.c.id == bindparam('_id'), _table.c.versao == bindparam('_versao'))
+            .values(**dict(fields), versao=_table.c.versao + 1)
+        )
+        matched += connection.execute(statement, params).rowcount
+    if deletes:
+        statement = delete(_table).where(_table.c.id == bindparam('_id'), _table.c.versao == bindparam('_versao'))
+        matched += connection.execute(statement, [{'_id': i, '_versao': v} for i, v in deletes]).rowcount
+
+    if matched != len(expected):
+        # Outra gravação entre a leitura e o UPDATE/DELETE: desfaz o lote e relê as versões
+        db.session.rollback()
+        raise BatchConflict(_conflicts(expected, _current_rows(expected)))
+
+    apply_summary_delta(
+        added=[_entry(rows[item_id], campos) for item_id, _, campos in updates],
+        removed=[_entry(rows[item_id]) for item_id in expected],
+    )
+    return {
+        'atualizados': len(updates),
+        'excluidos': len(deletes),
+        'versoes': {str(item_id): versao + 1 for item_id, versao, _ in updates},
+    }
@@ -0,0 +1,232 @@
+"""Importação em lote de colaboradores a partir de planilha (.xlsx) ou CSV.
+
+As colunas são as da exportação da tabela (``IMPORT_COLUMNS``), reconhecidas
+sem diferenciar maiúsculas e acentos, então um arquivo exportado pode voltar
+como veio. Cada linha passa pelas mesmas regras do formulário de Alimentação,
+com as listas (``ConfigList``) carregadas uma vez em memória; os valores das
+listas também são aceitos sem diferenciar maiúsculas e acentos e gravados na
+grafia cadastrada.
+
+A gravação é uma única transação: os registros vão em lotes de
+``IMPORT_BATCH_SIZE`` por ``executemany`` (o SQLAlchemy junta cada lote em
+``INSERT ... VALUES (...), (...)``), o resumo diário recebe um só delta e o
+commit é um só, em vez de uma ida ao banco e um commit por registro.
+"""
+import csv
+import io
+import math
+import re
+import time
+from datetime import date, datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import insert
+
+from . import db
+from .models import Colaborador, ConfigList
+from .normalization import strip_accents
+from .readers import read_sheet
+from .summary import apply_summary_delta
+
+
+# (cabeçalho, campo do modelo, obrigatório)
+IMPORT_COLUMNS = (
+    ('Data', 'data', True),
+    ('Matrícula', 'matricula', True),
+    ('Nome', 'nome', True),
+    ('Tipo', 'tipo', True),
+    ('Setor', 'setor', True),
+    ('Área', 'area', True),
+    ('Turno', 'turno', True),
+    ('Supervisor', 'supervisor', True),
+    ('Integração', 'integracao', True),
+    ('Observação', 'observacao', False),
+)
+
+FIELD_LABELS = {field: header for header, field, _ in IMPORT_COLUMNS}
+
+# Campos validados contra as listas configuráveis
+LIST_FIELDS = ('tipo', 'setor', 'area', 'turno', 'integracao')
+
+# Ordem das mensagens de erro de cada linha
+_VALIDATION_ORDER = ('matricula', 'nome', 'supervisor', 'data') + LIST_FIELDS + ('observacao',)
+
+IMPORT_EXTENSIONS = ('.xlsx', '.csv')
+
+IMPORT_BATCH_SIZE = 500
+
+_DATE_FORMATS = ('%Y-%m-%d', '%d/%m/%Y', '%d/%m/%y', '%d-%m-%Y')
+
+# Matrícula é um INTEGER do SQLite (64 bits com sinal)
+MATRICULA_MAX = 2 ** 63 - 1
+
+# Inteiro escrito por extenso; ".0" só como o Excel/pandas grava números inteiros
+_MATRICULA_TEXT = re.compile(r'\+?(\d+)(?:\.0+)?', re.ASCII)
+
+
+class ImportFileError(ValueError):
+    """O arquivo não pode ser importado (formato, cabeçalho ou vazio)."""
+
+
+def _fold(value) -> str:
+    return strip_accents(str(value).strip().lower())
+
+
+def _text(value) -> str:
+    if value is None or (isinstance(value, float) and pd.isna(value)) or value is pd.NaT:
+        return ''
+    return str(value).strip()
+
+
+def _parse_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    text = _text(value)
+    for fmt in _DATE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+def _parse_matricula(value):
+    """Matrícula como inteiro exato em 1..``MATRICULA_MAX``; None se inválida.
+
+    Como no formulário (``int(...)``), frações e expoentes ("12.7", "1e3") são
+    recusados em vez de arredondados; de células numéricas aceita-se o float
+    com valor inteiro (123.0).
+    """
+    if isinstance(value, (bool, np.bool_)):
+        return None
+    if isinstance(value, (int, np.integer)):
+        number = int(value)
+    elif isinstance(value, (float, np.floating)):
+        if not math.isfinite(value) or not float(value).is_integer():
+            return None
+        number = int(value)
+    else:
+        match = _MATRICULA_TEXT.fullmatch(_text(value))
+        if match is None:
+            return None
+        number = int(match.group(1))
+    return number if 1 <= number <= MATRICULA_MAX else None
+
+
+def read_import_file(file_storage) -> pd.DataFrame:
+    """Lê o arquivo enviado como DataFrame de objetos, com as colunas renomeadas para os campos."""
+    extension = Path(file_storage.filename or '').suffix.lower()
+    if extension not in IMPORT_EXTENSIONS:
+        raise ImportFileError('Formato não suportado. Envie um arquivo .xlsx ou .csv.')
+
+    if extension == '.csv':
+        raw = file_storage.read()
+        try:
+            text = raw.decode('utf-8-sig')
+        except UnicodeDecodeError:
+            # CSV salvo pelo Excel em português
+            text = raw.decode('cp1252')
+        try:
+            dialect = csv.Sniffer().sniff(text[:4096], delimiters=';,\t')
+            sep = dialect.delimiter
+        except csv.Error:
+            sep = ','
+        df = pd.read_csv(io.StringIO(text), sep=sep, dtype=str, keep_default_na=False)
+    else:
+        df = read_sheet(file_storage.stream, extension=extension)
+
+    by_fold = {_fold(header): field for header, field, _ in IMPORT_COLUMNS}
+    rename = {}
+    for column in df.columns:
+        field = by_fold.get(_fold(column))
+        if field and field not in rename.values():
+            rename[column] = field
+    missing = [header for header, field, required in IMPORT_COLUMNS if required and field not in rename.values()]
+    if missing:
+        raise ImportFileError(f'Colunas ausentes: {", ".join(missing)}.')
+    df = df[list(rename)].rename(columns=rename)
+    if 'observacao' not in df.columns:
+        df['observacao'] = ''
+    return df.astype(object)
+
+
+def load_lists() -> dict:
+    """``{campo: {valor dobrado: valor cadastrado}}`` das listas, numa consulta."""
+    lists = {field: {} for field in LIST_FIELDS}
+    for item in ConfigList.query.filter(ConfigList.nome_lista.in_(LIST_FIELDS)).all():
+        lists[item.nome_lista].setdefault(_fold(item.valor), item.valor)
+    return lists
+
+
+def clean_value(field: str, value, lists: dict):
+    """Aplica a ``value`` as regras do formulário para ``field``; devolve (valor, problema ou ``None``).
+
+    Usado também pelas alterações em lote (``app/batch.py``).
+    """
+    if field == 'matricula':
+        matricula = _parse_matricula(value)
+        return matricula, None if matricula is not None else f"Matrícula inválida: '{_text(value)}'"
+    if field == 'data':
+        data = _parse_date(value)
+        return data, None if data is not None else f"Data inválida: '{_text(value)}'"
+    text = _text(value)
+    if field in LIST_FIELDS:
+        canonical = lists[field].get(_fold(text)) if text else None
+        return canonical, None if canonical is not None else f"{FIELD_LABELS[field]} fora da lista: '{text}'"
+    if field == 'observacao':
+        return text or None, None
+    if field == 'supervisor':
+        text = text.upper()
+    return text, None if text else f'{FIELD_LABELS[field]} é obrigatório'
+
+
+def validate_rows(df: pd.DataFrame, lists: dict):
+    """Valida as linhas; devolve (registros válidos, erros ``[(linha, mensagem)]``).
+
+    A linha é a da planilha (cabeçalho na linha 1); linhas totalmente vazias são ignoradas.
+    """
+    created_at = datetime.utcnow()
+    records = []
+    errors = []
+    fields = [field for _, field, _ in IMPORT_COLUMNS]
+    for position, values in enumerate(df[fields].itertuples(index=False, name=None)):
+        row = dict(zip(fields, values))
+        if not any(_text(value) for value in values):
+            continue
+        line = position + 2
+        problems = []
+        record = {}
+        for field in _VALIDATION_ORDER:
+            record[field], problem = clean_value(field, row[field], lists)
+            if problem:
+                problems.append(problem)
+
+        if problems:
+            errors.append((line, '; '.join(problems)))
+            continue
+        record['created_at'] = created_at
+        records.append(record)
+    return records, errors
+
+
+def insert_colaboradores(records, batch_size: int = IMPORT_BATCH_SIZE) -> float:
+    """Insere ``records`` em lotes e atualiza o resumo, sem commit; devolve o tempo de banco (s)."""
+    started = time.perf_counter()
+    statement = insert(Colaborador)
+    for start in range(0, len(records), batch_size):
+        db.session.execute(statement, records[start:start + batch_size])
+    apply_summary_delta(added=[
+        (r['data'], r['turno'], r['tipo'], r['setor'], r['supervisor'], r['matricula']) for r in records
+    ])
+    return time.perf_counter() - started
+
+
+def template_rows(lists: dict):
+    """Linha de exemplo do modelo para download, com o primeiro valor de cada lista."""
+    example = {field: min(values.values(), default='') for field, values in lists.items()}
+    yield [date.today().isoformat(), '12345', 'MARIA SILVA SANTOS', example['tipo'], example['setor'],
+           example['area'], example['turno'], 'SUPERVISOR', example['integracao'], '']
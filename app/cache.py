@@ -0,0 +1,179 @@
+"""Cache em processo (LRU com TTL) para resultados de consultas do painel.
+
+As chaves incluem a versão dos dados: toda rota que grava no banco chama
+``bump_data_version()`` e as entradas antigas deixam de ser encontradas,
+saindo do cache por LRU/TTL. A versão fica no arquivo ``DATA_VERSION_FILE``
+(``instance/data_version``), lido a cada consulta, para que uma gravação feita
+em um processo do servidor invalide o cache de todos os outros. Como nos
+conjuntos de dados (``app/datasets.py``), cada versão é um ``time.time_ns()``
+gravado por troca atômica do arquivo.
+"""
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+
+log = logging.getLogger(__name__)
+
+
+_MISSING = object()
+
+
+class TTLCache:
+    """Dicionário LRU thread-safe cujas entradas expiram após ``ttl`` segundos."""
+
+    def __init__(self, maxsize: int = 256, ttl: float = 300.0):
+        self.maxsize = max(1, int(maxsize))
+        self.ttl = float(ttl)
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def configure(self, maxsize: int | None = None, ttl: float | None = None):
+        with self._lock:
+            if maxsize is not None:
+                self.maxsize = max(1, int(maxsize))
+            if ttl is not None:
+                self.ttl = float(ttl)
+            self._trim()
+
+    def _trim(self):
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._data.get(key, _MISSING)
+            if item is _MISSING:
+                self.misses += 1
+                return default
+            expires_at, value = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            self._trim()
+
+    def get_or_set(self, key, factory):
+        """Retorna o valor em cache ou calcula com ``factory()`` e armazena."""
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = factory()
+            self.set(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+            }
+
+
+_version_lock = threading.Lock()
+_version_path = None
+# Última versão lida do arquivo (ou a própria, sem arquivo configurado)
+_data_version = 0
+
+
+def _read_version_file() -> int | None:
+    try:
+        with open(_version_path, encoding='ascii') as fh:
+            return int(fh.read())
+    except FileNotFoundError:
+        return 0
+    except (OSError, ValueError):
+        # Arquivo sendo trocado (Windows) ou corrompido: fica com a última versão lida
+        return None
+
+
+def _write_version_file(version: int):
+    fd, tmp_name = tempfile.mkstemp(prefix=f'.{_version_path.name}.', dir=_version_path.parent)
+    try:
+        with os.fdopen(fd, 'w', encoding='ascii') as fh:
+            fh.write(str(version))
+        for attempt in range(5):
+            try:
+                os.replace(tmp_name, _version_path)
+                return
+            except PermissionError:
+                # No Windows a troca falha enquanto outro processo lê o arquivo
+                if attempt == 4:
+                    raise
+                time.sleep(0.01)
+    finally:
+        if os.path.exists(tmp_name):
+            os.remove(tmp_name)
+
+
+def get_data_version() -> int:
+    global _data_version
+    if _version_path is None:
+        return _data_version
+    version = _read_version_file()
+    if version is not None:
+        _data_version = version
+    return _data_version
+
+
+def bump_data_version() -> int:
+    """Invalida (por versão) tudo que foi calculado a partir do banco, em todos os processos."""
+    global _data_version
+    with _version_lock:
+        version = max(time.time_ns(), get_data_version() + 1)
+        if _version_path is not None:
+            try:
+                _write_version_file(version)
+            except OSError:
+                # Sem a nova versão a chave continua a mesma: descarta o cache deste processo
+                log.exception('Falha ao gravar a versão dos dados em %s; '
+                              'os demais processos só verão a gravação após QUERY_CACHE_TTL.', _version_path)
+                query_cache.clear()
+                return get_data_version()
+        _data_version = version
+        return version
+
+
+query_cache = TTLCache()
+
+
+def init_query_cache(app):
+    global _version_path
+    _version_path = Path(app.config.get('DATA_VERSION_FILE') or Path(app.instance_path) / 'data_version')
+    _version_path.parent.mkdir(parents=True, exist_ok=True)
+    query_cache.configure(
+        maxsize=app.config.get('QUERY_CACHE_SIZE', 256),
+        ttl=app.config.get('QUERY_CACHE_TTL', 300),
+    )
+
+
+def cache_stats() -> dict:
+    return {'data_version': get_data_version(), **query_cache.stats()}
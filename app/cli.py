@@ -0,0 +1,105 @@
+"""Comandos de manutenção disponíveis via ``flask --app servidor <comando>``."""
+import click
+from flask.cli import with_appcontext
+
+from . import db
+
+
+@click.command('resumo-rebuild')
+@click.option('--check-only', is_flag=True, help='Apenas compara o resumo atual com os dados, sem recriar.')
+@with_appcontext
+def resumo_rebuild_command(check_only: bool):
+    """Recria a tabela resumo_diario e confere com os dados de colaboradores."""
+    from .summary import rebuild_summary, verify_summary
+
+    if not check_only:
+        try:
+            keys = rebuild_summary()
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        click.echo(f'Resumo diário recriado: {keys} chaves.')
+
+    problems = verify_summary()
+    if problems:
+        for problem in problems:
+            click.echo(problem, err=True)
+        raise click.ClickException(f'{len(problems)} divergência(s) entre resumo_diario e colaboradores.')
+    click.echo('Resumo diário confere com colaboradores.')
+
+
+@click.command('indices-explain')
+@click.option('--strict', is_flag=True, help='Falha (código 1) se alguma consulta quente varrer a tabela inteira.')
+@with_appcontext
+def indices_explain_command(strict: bool):
+    """Mostra o EXPLAIN QUERY PLAN das consultas do painel, tabela e exportações."""
+    from . import ensure_indexes
+    from .query_plans import analyze_queries
+
+    ensure_indexes()
+    flagged = 0
+    for result in analyze_queries():
+        if result['full_scans'] and not result['full_scan_expected']:
+            status = 'VARREDURA COMPLETA'
+            flagged += 1
+        elif result['full_scans']:
+            status = 'varredura esperada'
+        else:
+            status = 'ok'
+        click.echo(f"[{status}] {result['name']}")
+        for step in result['plan']:
+            click.echo(f'    {step}')
+
+    if flagged:
+        message = f'{flagged} consulta(s) sem índice adequado.'
+        if strict:
+            raise click.ClickException(message)
+        click.echo(message)
+    else:
+        click.echo('Todas as consultas quentes usam índices.')
+
+
+@click.command('busca-rebuild')
+@with_appcontext
+def busca_rebuild_command():
+    """Reindexa a busca textual (FTS5) de nome, supervisor e observação."""
+    from .search import ensure_fts, fts_available, rebuild_fts
+
+    ensure_fts()
+    if not fts_available():
+        raise click.ClickException('SQLite sem suporte a FTS5; a busca usa ilike.')
+    try:
+        rebuild_fts()
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    click.echo('Índice de busca reconstruído.')
+
+
+@click.command('sqlite-profile')
+@with_appcontext
+def sqlite_profile_command():
+    """Mostra os PRAGMAs efetivos de uma conexão do banco (perfil de SQLITE_PRAGMAS)."""
+    from flask import current_app
+    from .sqlite_profile import sqlite_pragma_values
+
+    configured = current_app.config.get('SQLITE_PRAGMAS') or {}
+    names = list(configured) or ['journal_mode', 'synchronous', 'busy_timeout', 'cache_size', 'mmap_size', 'temp_store']
+    connection = db.engine.raw_connection()
+    try:
+        values = sqlite_pragma_values(connection.driver_connection, names)
+    finally:
+        connection.close()
+    for name in names:
+        expected = configured.get(name)
+        note = f' (configurado: {expected})' if expected is not None else ''
+        click.echo(f'{name} = {values[name]}{note}')
+
+
+def register_commands(app):
+    app.cli.add_command(resumo_rebuild_command)
+    app.cli.add_command(indices_explain_command)
+    app.cli.add_command(busca_rebuild_command)
+    app.cli.add_command(sqlite_profile_command)
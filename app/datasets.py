@@ -0,0 +1,276 @@
+"""Armazenamento em disco das planilhas carregadas em Input*Dados.
+
+Cada conjunto (``input`` = separação/rastreabilidade, ``hc`` = base HC) fica em
+``instance/datasets`` como um arquivo Feather (Arrow) versionado, apontado por
+um manifesto ``<nome>.json``. Uma nova carga grava um arquivo novo e troca o
+manifesto com ``os.replace`` (atômico): quem já leu a versão anterior continua
+com ela e a próxima leitura pega a nova.
+
+Os processos do servidor leem o mesmo arquivo com ``memory_map``; colunas
+numéricas são mapeadas sem cópia e cada processo só materializa o conjunto na
+primeira vez que ele é pedido (ou quando o manifesto muda). Sem ``pyarrow``, ou
+se alguma coluna não puder ser convertida para Arrow, o conjunto é gravado em
+pickle.
+"""
+import importlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+
+log = logging.getLogger(__name__)
+
+DATASET_NAMES = ('input', 'hc')
+# Calculados a partir dos dois acima na importação (app/derived.py)
+DERIVED_NAMES = ('input_view', 'execucao_lookup')
+
+# Arquivos gravados pelas versões antigas em instance/ (migrados uma vez, na primeira inicialização)
+LEGACY_PICKLES = {
+    'input': 'last_input_planilha.pkl',
+    'hc': 'last_hc_planilha.pkl',
+}
+# Registro (em DATASETS_DIR) dos conjuntos cujos pickles antigos já foram tratados
+LEGACY_MARKER = 'legacy_migrated.json'
+
+
+def _feather():
+    try:
+        return importlib.import_module('pyarrow.feather')
+    except ImportError:
+        return None
+
+
+def write_atomic(target: Path, write):
+    """Grava via arquivo temporário no mesmo diretório e renomeia por cima de ``target``."""
+    fd, tmp_name = tempfile.mkstemp(prefix=f'.{target.name}.', dir=target.parent)
+    os.close(fd)
+    try:
+        write(tmp_name)
+        os.replace(tmp_name, target)
+    except BaseException:
+        try:
+            os.remove(tmp_name)
+        except OSError:
+            pass
+        raise
+
+
+def write_frame(target_stem: Path, df: pd.DataFrame) -> Path:
+    """Grava ``df`` em ``<target_stem>.feather`` (ou ``.pkl`` se o Arrow não aceitar) de forma atômica."""
+    target_stem = Path(target_stem)
+    feather = _feather()
+    if feather is not None:
+        target = target_stem.with_name(f'{target_stem.name}.feather')
+        try:
+            write_atomic(target, lambda tmp: feather.write_feather(df, tmp, compression='uncompressed'))
+            return target
+        except Exception as err:
+            log.info('Feather indisponível para %s (%s); usando pickle.', target_stem.name, err)
+    target = target_stem.with_name(f'{target_stem.name}.pkl')
+    write_atomic(target, df.to_pickle)
+    return target
+
+
+def read_frame(path: Path) -> pd.DataFrame:
+    """Lê um arquivo gravado por ``write_frame`` (Feather com memory-map ou pickle)."""
+    path = Path(path)
+    if path.suffix == '.feather':
+        feather = _feather()
+        if feather is None:
+            raise RuntimeError('Dependência pyarrow não encontrada. Instale com: pip install pyarrow')
+        return feather.read_table(path, memory_map=True).to_pandas(split_blocks=True)
+    return pd.read_pickle(path)
+
+
+class DatasetStore:
+    """Conjuntos de dados nomeados, persistidos em ``root`` e carregados sob demanda."""
+
+    def __init__(self, root=None):
+        self.root = Path(root) if root else None
+        self._lock = threading.Lock()
+        # nome -> (versão, DataFrame) já materializados neste processo
+        self._loaded = {}
+
+    def configure(self, root):
+        with self._lock:
+            self.root = Path(root)
+            self._loaded.clear()
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _check_name(self, name: str):
+        if name not in DATASET_NAMES and name not in DERIVED_NAMES:
+            raise ValueError(f'Conjunto de dados desconhecido: {name}')
+
+    def _manifest_path(self, name: str) -> Path:
+        return self.root / f'{name}.json'
+
+    def manifest(self, name: str) -> dict | None:
+        """Manifesto atual do conjunto (versão, arquivo, formato, dimensões) ou None."""
+        self._check_name(name)
+        if self.root is None:
+            return None
+        try:
+            with open(self._manifest_path(name), encoding='utf-8') as fh:
+                return json.load(fh)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError):
+            log.warning('Manifesto inválido para o conjunto %s; ignorando.', name)
+            return None
+
+    def get(self, name: str) -> pd.DataFrame | None:
+        """DataFrame da versão atual (somente leitura: use ``.copy()`` antes de alterar)."""
+        return self.load(name)[1]
+
+    def load(self, name: str) -> tuple[dict | None, pd.DataFrame | None]:
+        """(manifesto, DataFrame) da versão atual; ``(None, None)`` se não houver."""
+        entry = self.manifest(name)
+        for attempt in range(2):
+            if entry is None:
+                with self._lock:
+                    self._loaded.pop(name, None)
+                return None, None
+            with self._lock:
+                cached = self._loaded.get(name)
+                if cached is not None and cached[0] == entry['version']:
+                    return entry, cached[1]
+            started = time.perf_counter()
+            try:
+                df = read_frame(self.root / entry['file'])
+            except Exception:
+                # Outro processo pode ter publicado uma versão entre a leitura do manifesto e a do
+                # arquivo (save() remove o arquivo anterior): relê o manifesto e tenta a versão nova
+                current = self.manifest(name)
+                if attempt == 0 and (current is None or current['version'] != entry['version']):
+                    entry = current
+                    continue
+                log.exception('Falha ao carregar o conjunto %s (%s)', name, entry.get('file'))
+                return None, None
+            log.info('Conjunto %s v%s carregado de %s em %.1f ms',
+                     name, entry['version'], entry['file'], (time.perf_counter() - started) * 1000)
+            with self._lock:
+                self._loaded[name] = (entry['version'], df)
+            return entry, df
+        return None, None
+
+    def version(self, name: str) -> int | None:
+        entry = self.manifest(name)
+        return entry['version'] if entry else None
+
+    def save(self, name: str, df: pd.DataFrame, meta: dict | None = None) -> dict:
+        """Publica uma nova versão do conjunto e devolve o manifesto gravado.
+
+        ``meta`` (serializável em JSON) é gravado junto no manifesto.
+        """
+        self._check_name(name)
+        if self.root is None:
+            raise RuntimeError('Armazenamento de conjuntos de dados não configurado.')
+        frame = df.reset_index(drop=True)
+        version = time.time_ns()
+        path = write_frame(self.root / f'{name}-{version}', frame)
+        file_name = path.name
+        fmt = 'feather' if path.suffix == '.feather' else 'pickle'
+
+        entry = {
+            'name': name,
+            'version': version,
+            'file': file_name,
+            'format': fmt,
+            'rows': int(frame.shape[0]),
+            'columns': [str(c) for c in frame.columns],
+            'updated_at': datetime.now().isoformat(timespec='seconds'),
+        }
+        if meta is not None:
+            entry['meta'] = meta
+        write_atomic(
+            self._manifest_path(name),
+            lambda tmp: Path(tmp).write_text(json.dumps(entry, ensure_ascii=False), encoding='utf-8'),
+        )
+        with self._lock:
+            self._loaded[name] = (version, frame)
+        self._remove_stale_files(name, keep=file_name)
+        return entry
+
+    def clear(self, name: str):
+        """Remove o conjunto (leituras seguintes retornam None)."""
+        self._check_name(name)
+        if self.root is None:
+            return
+        try:
+            os.remove(self._manifest_path(name))
+        except FileNotFoundError:
+            pass
+        with self._lock:
+            self._loaded.pop(name, None)
+        self._remove_stale_files(name, keep=None)
+
+    def _remove_stale_files(self, name: str, keep: str | None):
+        # Versões antigas ainda mapeadas por outro processo (Windows) ficam para a próxima limpeza
+        for path in self.root.glob(f'{name}-*'):
+            if path.name == keep:
+                continue
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+    def _legacy_marker_path(self) -> Path:
+        return self.root / LEGACY_MARKER
+
+    def migrate_legacy(self, instance_path):
+        """Importa os ``last_*_planilha.pkl`` antigos uma única vez por diretório de conjuntos.
+
+        Cada nome tratado fica registrado em ``LEGACY_MARKER``: depois disso o
+        pickle antigo não volta a ser importado, mesmo que o conjunto seja
+        limpo (o HC é limpo a cada importação) e o servidor reiniciado.
+        """
+        if self.root is None:
+            return
+        marker = self._legacy_marker_path()
+        try:
+            done = set(json.loads(marker.read_text(encoding='utf-8')).get('migrated', []))
+        except FileNotFoundError:
+            # Diretório já em uso antes do marcador: a migração já aconteceu nas versões anteriores
+            in_use = any(self._manifest_path(name).exists() for name in DATASET_NAMES + DERIVED_NAMES)
+            done = set(LEGACY_PICKLES) if in_use else set()
+        except (OSError, ValueError):
+            log.warning('Marcador de migração inválido em %s; refazendo a verificação.', marker)
+            done = set()
+
+        pending = [name for name in LEGACY_PICKLES if name not in done]
+        for name in pending:
+            legacy_name = LEGACY_PICKLES[name]
+            legacy = Path(instance_path) / legacy_name
+            if legacy.exists() and self.manifest(name) is None:
+                try:
+                    df = pd.read_pickle(legacy)
+                except Exception as err:
+                    log.warning('Não foi possível migrar %s: %s', legacy, err)
+                    continue
+                if isinstance(df, pd.DataFrame):
+                    self.save(name, df)
+                    # Só o manifesto fica; o conteúdo é carregado quando for pedido
+                    with self._lock:
+                        self._loaded.pop(name, None)
+                    log.info('Planilha %s migrada para o conjunto %s', legacy_name, name)
+            done.add(name)
+
+        if pending or not marker.exists():
+            payload = json.dumps({'migrated': sorted(done)}, ensure_ascii=False)
+            write_atomic(marker, lambda tmp: Path(tmp).write_text(payload, encoding='utf-8'))
+
+
+dataset_store = DatasetStore()
+
+
+def init_dataset_store(app):
+    root = app.config.get('DATASETS_DIR') or os.path.join(app.instance_path, 'datasets')
+    dataset_store.configure(root)
+    dataset_store.migrate_legacy(app.instance_path)
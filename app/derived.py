@@ -0,0 +1,445 @@
+"""Visões derivadas das planilhas do Input*Dados, calculadas na importação.
+
+O painel (aba Input*Dados) e as exportações não trabalham direto com os
+conjuntos ``input`` e ``hc``: precisam do Turno HC preenchido a partir da base
+HC, da data interpretada, das marcas de Treinado/Execução por Voz e do turno
+normalizado. Isso só muda quando uma planilha é enviada, então é calculado uma
+vez, no fim do job de importação, e gravado no ``dataset_store``:
+
+- ``input_view``: colunas da tabela de separação (Turno HC já preenchido) mais
+  as colunas auxiliares ``__treinado``, ``__execucao_sim``, ``__parsed_date`` e
+  ``__turno``; o manifesto guarda os gráficos da separação sem filtros.
+- ``execucao_lookup``: "Execução por Voz" por Matrícula, usada no merge do HC.
+
+O manifesto de cada visão registra as versões de ``input``/``hc`` de onde ela
+saiu; se não baterem (ex.: planilhas migradas de uma versão antiga), a visão é
+recalculada na primeira requisição.
+"""
+import logging
+import threading
+
+import numpy as np
+import pandas as pd
+
+from .datasets import dataset_store
+from .normalization import (
+    TEMPORARIO_LABEL,
+    clean_execucao_series,
+    is_execucao_sim_series,
+    normalize_execucao_category_series,
+    normalize_execucao_series,
+    normalize_matricula_series,
+    normalize_situacao_hc_series,
+    normalize_turno_label_series,
+    strip_accents_series,
+)
+
+
+log = logging.getLogger(__name__)
+
+# Incrementar quando o cálculo das visões mudar (recalcula as já gravadas)
+DERIVED_VERSION = 1
+
+_rebuild_lock = threading.RLock()
+
+
+def get_input_column_definitions():
+    return [
+        {"name": "Do Endereço", "param": "do_endereco", "icon": "geo-alt", "placeholder": "Endereço"},
+        {"name": "Funcionário", "param": "funcionario", "icon": "hash", "placeholder": "Funcionário"},
+        {"name": "Nome", "param": "nome", "icon": "person", "placeholder": "Nome"},
+        {"name": "Data", "param": "data", "icon": "calendar-event", "placeholder": "Data"},
+        {"name": "Execução por Voz", "param": "execucao", "icon": "mic", "placeholder": "Execução"},
+        {"name": "Treinado", "param": "treinado", "icon": "mortarboard", "placeholder": "Treinado"},
+        {"name": "Turno HC", "param": "turno_hc", "icon": "clock-history", "placeholder": "Turno"},
+    ]
+
+
+def input_table_columns() -> list:
+    return [col['name'] for col in get_input_column_definitions()]
+
+
+def build_execucao_por_voz_lookup(df: pd.DataFrame | None):
+    """Constrói uma tabela auxiliar com "Execução por Voz" indexada por Matrícula."""
+    if df is None:
+        return None
+
+    required_columns = {'Funcionário', 'Execução por Voz'}
+    if not required_columns.issubset(df.columns):
+        return None
+
+    lookup = df[['Funcionário', 'Execução por Voz']].copy()
+    lookup['Funcionário'] = normalize_matricula_series(lookup['Funcionário'])
+    lookup = lookup[lookup['Funcionário'].notna()].copy()
+    if lookup.empty:
+        return None
+
+    try:
+        lookup['Funcionário'] = lookup['Funcionário'].astype(int)
+    except Exception:
+        pass
+
+    lookup['Execução por Voz'] = normalize_execucao_series(lookup['Execução por Voz'])
+    lookup['__priority'] = lookup['Execução por Voz'].eq('').astype(int)
+    lookup = (
+        lookup
+        .sort_values(['Funcionário', '__priority', 'Execução por Voz'])
+        .drop_duplicates(subset=['Funcionário'], keep='first')
+        .drop(columns='__priority')
+    )
+
+    return lookup.rename(columns={'Funcionário': 'Matrícula'})
+
+
+def build_hc_turno_lookup(source_hc: pd.DataFrame | None) -> dict:
+    """Matrícula -> Turno HC (temporários sem turno usam o "Turno" da base)."""
+    if source_hc is None or not {'Matrícula', 'Turno HC'}.issubset(source_hc.columns):
+        return {}
+    extra_cols = []
+    if 'Situação HC' in source_hc.columns:
+        extra_cols.append('Situação HC')
+    if 'Turno' in source_hc.columns:
+        extra_cols.append('Turno')
+    turno_lookup_df = source_hc[['Matrícula', 'Turno HC', *extra_cols]].copy()
+    turno_lookup_df['Matrícula'] = normalize_matricula_series(turno_lookup_df['Matrícula'])
+    turno_lookup_df = turno_lookup_df[turno_lookup_df['Matrícula'].notna()]
+    turno_lookup_df['Turno HC'] = turno_lookup_df['Turno HC'].fillna('').astype(str).str.strip()
+
+    if 'Situação HC' in turno_lookup_df.columns:
+        situacao_normalizada = normalize_situacao_hc_series(turno_lookup_df['Situação HC']).fillna('')
+        situacao_ascii = strip_accents_series(situacao_normalizada.astype(str)).str.lower()
+        temporario_mask = situacao_ascii.str.contains('tempor', na=False)
+    else:
+        temporario_mask = pd.Series(False, index=turno_lookup_df.index)
+
+    if 'Turno' in turno_lookup_df.columns:
+        turno_fallback = turno_lookup_df['Turno'].fillna('').astype(str).str.strip()
+    else:
+        turno_fallback = pd.Series('', index=turno_lookup_df.index)
+
+    fallback_mask = (turno_lookup_df['Turno HC'] == '') & temporario_mask & (turno_fallback != '')
+    if fallback_mask.any():
+        turno_lookup_df.loc[fallback_mask, 'Turno HC'] = turno_fallback.loc[fallback_mask]
+
+    turno_lookup_df = turno_lookup_df.drop_duplicates(subset=['Matrícula'], keep='first')
+    turno_lookup_df['Turno HC'] = turno_lookup_df['Turno HC'].replace('', np.nan).fillna('1° Turno')
+    return turno_lookup_df.set_index('Matrícula')['Turno HC'].to_dict()
+
+
+def build_input_view(source_df: pd.DataFrame, hc_turno_lookup: dict) -> pd.DataFrame:
+    """Tabela de separação do painel com Turno HC preenchido e colunas auxiliares.
+
+    As colunas da tabela ficam como na planilha (os filtros e a ordenação do
+    painel dependem disso); as auxiliares são calculadas sobre os valores
+    exibidos (``fillna('')``), como o painel fazia a cada requisição.
+    """
+    columns = input_table_columns()
+    df_input = source_df.copy()
+    missing_cols = [col for col in columns if col not in df_input.columns]
+    if missing_cols:
+        log.warning('Planilha Input*Dados ajustada por colunas ausentes: %s', missing_cols)
+        for col in missing_cols:
+            df_input[col] = 'Não' if col == 'Treinado' else ''
+    df_input = df_input[columns].copy()
+    if hc_turno_lookup:
+        try:
+            mapped_turnos = normalize_matricula_series(df_input['Funcionário']).map(hc_turno_lookup).fillna('')
+            existing_turnos = df_input['Turno HC'].fillna('').astype(str)
+            df_input['Turno HC'] = (
+                existing_turnos
+                .where(existing_turnos.str.strip() != '', mapped_turnos)
+                .fillna('')
+            )
+            df_input['Turno HC'] = df_input['Turno HC'].replace('', '1° Turno')
+        except Exception as err:
+            log.warning('Falha ao combinar Turno HC com Input*Dados: %s', err)
+
+    shown = df_input.fillna('')
+    df_input['__treinado'] = shown['Treinado'].astype(str).str.strip().str.lower() == 'sim'
+    df_input['__execucao_sim'] = is_execucao_sim_series(shown['Execução por Voz'])
+    df_input['__parsed_date'] = pd.to_datetime(shown['Data'], dayfirst=True, errors='coerce')
+    df_input['__turno'] = normalize_turno_label_series(shown['Turno HC'])
+    return df_input.reset_index(drop=True)
+
+
+def empty_turno_charts() -> dict:
+    return {
+        'turno1': {
+            'labels': [],
+            'values': [],
+            'datasets': [],
+            'totals': {'execucao': 0, 'treinado': 0},
+            'series_label': 'Treinados',
+            'turno_label': '1° Turno',
+            'color': '#f59e0b'
+        },
+        'turno2': {
+            'labels': [],
+            'values': [],
+            'datasets': [],
+            'totals': {'execucao': 0, 'treinado': 0},
+            'series_label': 'Treinados',
+            'turno_label': '2° Turno',
+            'color': '#ef4444'
+        }
+    }
+
+
+def _group_by_turno_date(view: pd.DataFrame, mask: pd.Series, count_label: str) -> pd.DataFrame:
+    if mask is None or not mask.any():
+        return pd.DataFrame(columns=['__turno', '__parsed_date', count_label])
+    subset = view.loc[mask, ['__turno', '__parsed_date']].dropna(subset=['__parsed_date'])
+    if subset.empty:
+        return pd.DataFrame(columns=['__turno', '__parsed_date', count_label])
+    return (
+        subset
+        .groupby(['__turno', '__parsed_date'])
+        .size()
+        .reset_index(name=count_label)
+    )
+
+
+def input_charts(view: pd.DataFrame) -> tuple[dict | None, dict]:
+    """(merge_colab_percent, merge_turno_charts) das linhas de ``view`` (já filtrada)."""
+    merge_turno_charts = empty_turno_charts()
+    if view.empty:
+        return None, merge_turno_charts
+
+    trained_mask = view['__treinado']
+    exec_sim_mask = view['__execucao_sim']
+    trained_total = int(trained_mask.sum())
+    trained_exec_count = int((trained_mask & exec_sim_mask).sum())
+    trained_no_exec_count = max(0, trained_total - trained_exec_count)
+    total_count = trained_exec_count + trained_no_exec_count
+    if total_count > 0:
+        trained_pct = round((trained_exec_count / total_count) * 100, 2)
+        untrained_pct = round((trained_no_exec_count / total_count) * 100, 2)
+    else:
+        trained_pct = untrained_pct = 0.0
+
+    merge_colab_percent = {
+        "labels": ["Com execução por Voz", "Sem execução por Voz"],
+        "values": [trained_exec_count, trained_no_exec_count],
+        "percentages": [trained_pct, untrained_pct],
+        "total": total_count
+    }
+
+    exec_grouped = _group_by_turno_date(view, exec_sim_mask, 'execucao_count')
+    trained_grouped = _group_by_turno_date(view, trained_mask, 'treinado_count')
+    if exec_grouped.empty and trained_grouped.empty:
+        return merge_colab_percent, merge_turno_charts
+
+    combined = pd.merge(
+        exec_grouped,
+        trained_grouped,
+        on=['__turno', '__parsed_date'],
+        how='outer'
+    ).fillna(0)
+    combined['execucao_count'] = combined.get('execucao_count', 0).astype(int)
+    combined['treinado_count'] = combined.get('treinado_count', 0).astype(int)
+
+    for key, turno_label in [('turno1', '1° Turno'), ('turno2', '2° Turno')]:
+        turno_df = combined[combined['__turno'] == turno_label]
+        if turno_df.empty:
+            continue
+        turno_df = turno_df.sort_values('__parsed_date')
+        exec_values = turno_df['execucao_count'].astype(int).tolist()
+        treinado_values = turno_df['treinado_count'].astype(int).tolist()
+        merge_turno_charts[key]['labels'] = turno_df['__parsed_date'].dt.strftime('%d/%m/%Y').tolist()
+        merge_turno_charts[key]['values'] = exec_values
+        merge_turno_charts[key]['datasets'] = [
+            {
+                'key': 'execucao',
+                'label': 'Execução por Voz (Sim)',
+                'values': exec_values,
+                'color': '#2563eb'
+            },
+            {
+                'key': 'treinado',
+                'label': 'Treinado (Sim)',
+                'values': treinado_values,
+                'color': '#16a34a'
+            }
+        ]
+        merge_turno_charts[key]['totals'] = {
+            'execucao': int(sum(exec_values)),
+            'treinado': int(sum(treinado_values))
+        }
+    return merge_colab_percent, merge_turno_charts
+
+
+def build_hc_panel(df_db: pd.DataFrame, source_hc: pd.DataFrame, execucao_lookup: pd.DataFrame | None):
+    """Merge banco x HC x Execução por Voz, resumo e gráfico de treinamento do painel.
+
+    Devolve ``(merged_hc, hc_preview_info, hc_training_chart)``; depende do
+    banco, então é guardado no ``query_cache`` pela versão dos dados.
+    """
+    df_db = df_db.copy()
+    df_db['Matrícula'] = normalize_matricula_series(df_db['Matrícula'])
+    df_db = df_db[df_db['Matrícula'].notna()].copy()
+    try:
+        df_db['Matrícula'] = df_db['Matrícula'].astype(int)
+    except Exception:
+        pass
+
+    merged_hc = pd.merge(df_db, source_hc, on='Matrícula', how='left')
+    if execucao_lookup is not None:
+        merged_hc = pd.merge(merged_hc, execucao_lookup, on='Matrícula', how='left')
+    if 'Situação HC' in merged_hc.columns:
+        merged_hc['Situação HC'] = normalize_situacao_hc_series(merged_hc['Situação HC'])
+    if {'Turno HC', 'Turno', 'Situação HC'}.issubset(merged_hc.columns):
+        temporario_mask = merged_hc['Situação HC'] == TEMPORARIO_LABEL
+        if temporario_mask.any():
+            merged_hc.loc[temporario_mask, 'Turno HC'] = merged_hc.loc[temporario_mask, 'Turno']
+
+    cargo_hc_column = 'Cargo HC' if 'Cargo HC' in merged_hc.columns else None
+    if cargo_hc_column:
+        with_hc = int(merged_hc[cargo_hc_column].notna().sum())
+        without_hc = int(merged_hc[cargo_hc_column].isna().sum())
+    else:
+        with_hc = 0
+        without_hc = len(merged_hc)
+    hc_preview_info = {
+        'total': len(merged_hc),
+        'with_hc': with_hc,
+        'without_hc': without_hc,
+    }
+    return merged_hc, hc_preview_info, _hc_training_chart(merged_hc)
+
+
+def _hc_training_chart(merged_hc: pd.DataFrame) -> dict | None:
+    execucao_column = 'Execução por Voz' if 'Execução por Voz' in merged_hc.columns else None
+    if not execucao_column or not {'Situação HC', 'Matrícula'}.issubset(merged_hc.columns):
+        return None
+
+    pivot_source = merged_hc[['Situação HC', execucao_column, 'Matrícula']].copy()
+    pivot_source[execucao_column] = clean_execucao_series(pivot_source[execucao_column])
+    pivot_source = pivot_source[pivot_source[execucao_column] != '']
+    pivot_source[execucao_column] = normalize_execucao_category_series(pivot_source[execucao_column])
+    pivot_source = pivot_source[pivot_source[execucao_column] != '']
+    if pivot_source.empty:
+        return None
+    pivot_source['Situação HC'] = pivot_source['Situação HC'].fillna('Sem Situação').astype(str).str.strip()
+    pivot_source.loc[pivot_source['Situação HC'] == '', 'Situação HC'] = 'Sem Situação'
+
+    pivot_table = pd.pivot_table(
+        pivot_source,
+        index='Situação HC',
+        columns=execucao_column,
+        values='Matrícula',
+        aggfunc='count',
+        fill_value=0,
+    )
+    if pivot_table.empty:
+        return None
+    try:
+        pivot_table = pivot_table.astype(int)
+    except Exception:
+        pivot_table = pivot_table.applymap(lambda x: int(x) if pd.notna(x) else 0)
+
+    desired_execucao = ['Sim', 'Não']
+    pivot_table = pivot_table.loc[:, [col for col in pivot_table.columns if col in desired_execucao]]
+    for col in desired_execucao:
+        if col not in pivot_table.columns:
+            pivot_table[col] = 0
+    pivot_table = pivot_table[desired_execucao]
+    pivot_table = pivot_table.loc[:, (pivot_table != 0).any(axis=0)]
+    if pivot_table.empty:
+        return None
+
+    totals_by_situacao = pivot_table.sum(axis=1).sort_values(ascending=False)
+    pivot_table = pivot_table.loc[totals_by_situacao.index]
+    pivot_table = pivot_table.loc[:, [col for col in desired_execucao if col in pivot_table.columns]]
+
+    datasets = []
+    for column in pivot_table.columns:
+        column_label = str(column).strip() or 'Execução não informada'
+        values = [int(v) for v in pivot_table[column].astype(int).tolist()]
+        datasets.append({
+            'label': column_label,
+            'data': values,
+            'total': int(sum(values)),
+        })
+
+    return {
+        'situacao_labels': [str(idx) for idx in pivot_table.index.tolist()],
+        'datasets': datasets,
+        'totals': [int(v) for v in totals_by_situacao.loc[pivot_table.index].astype(int).tolist()],
+        'execucao_labels': [str(c) for c in pivot_table.columns.tolist()],
+        'overall_total': int(pivot_table.values.sum()),
+    }
+
+
+def _source_versions(store) -> dict:
+    return {
+        'derived_version': DERIVED_VERSION,
+        'input': store.version('input'),
+        'hc': store.version('hc'),
+    }
+
+
+def _is_current(entry: dict | None, sources: dict) -> bool:
+    return entry is not None and (entry.get('meta') or {}).get('sources') == sources
+
+
+def rebuild_derived_views(store=dataset_store) -> dict:
+    """Recalcula e grava ``input_view`` e ``execucao_lookup``; devolve as versões de origem."""
+    with _rebuild_lock:
+        sources = _source_versions(store)
+        source_df = store.get('input')
+        if source_df is None:
+            store.clear('input_view')
+            store.clear('execucao_lookup')
+            return sources
+
+        try:
+            hc_turno_lookup = build_hc_turno_lookup(store.get('hc'))
+        except Exception as err:
+            log.warning('Falha ao construir lookup de Turno HC para Input*Dados: %s', err)
+            hc_turno_lookup = {}
+        view = build_input_view(source_df, hc_turno_lookup)
+        merge_colab_percent, merge_turno_charts = input_charts(view)
+        store.save('input_view', view, meta={
+            'sources': sources,
+            'merge_colab_percent': merge_colab_percent,
+            'merge_turno_charts': merge_turno_charts,
+        })
+
+        lookup = build_execucao_por_voz_lookup(source_df)
+        if lookup is None:
+            store.clear('execucao_lookup')
+        else:
+            store.save('execucao_lookup', lookup, meta={'sources': sources})
+        log.info('Visões derivadas do Input*Dados recalculadas (%s linhas)', len(view))
+        return sources
+
+
+def _views_current(store) -> bool:
+    sources = _source_versions(store)
+    if sources['input'] is None:
+        return store.manifest('input_view') is None and store.manifest('execucao_lookup') is None
+    return _is_current(store.manifest('input_view'), sources)
+
+
+def ensure_derived_views(store=dataset_store):
+    """Recalcula as visões se as planilhas mudaram desde a última gravação."""
+    if _views_current(store):
+        return
+    with _rebuild_lock:
+        # Outra thread pode ter recalculado enquanto esta esperava
+        if not _views_current(store):
+            rebuild_derived_views(store)
+
+
+def get_input_view(store=dataset_store) -> tuple[pd.DataFrame | None, dict]:
+    """(visão da separação, meta com os gráficos sem filtro e a ``version``) ou ``(None, {})``."""
+    ensure_derived_views(store)
+    entry, view = store.load('input_view')
+    if view is None:
+        return None, {}
+    return view, dict(entry.get('meta') or {}, version=entry['version'])
+
+
+def get_execucao_lookup(store=dataset_store) -> pd.DataFrame | None:
+    ensure_derived_views(store)
+    return store.get('execucao_lookup')
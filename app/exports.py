@@ -0,0 +1,343 @@
+"""Exportações em streaming (XLSX, CSV e Parquet).
+
+``iter_xlsx`` gera um arquivo XLSX mínimo (planilha única, strings inline)
+diretamente em um ZIP sem ``seek``: as linhas são escritas em lotes e os bytes
+comprimidos são entregues ao cliente assim que ficam prontos. A memória usada
+não depende da quantidade de linhas exportadas.
+
+``iter_csv`` produz CSV UTF-8 com BOM (abre direto no Excel) e ``iter_parquet``
+grava Parquet colunar em lotes num arquivo temporário, enviado em partes ao
+final (o rodapé do Parquet só existe depois da última linha).
+"""
+import csv
+import importlib
+import io
+import math
+import re
+import tempfile
+import zipfile
+from datetime import date, datetime
+from xml.sax.saxutils import escape
+
+import numpy as np
+import pandas as pd
+from flask import Response, stream_with_context
+
+
+XLSX_MIMETYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+CSV_MIMETYPE = 'text/csv'
+PARQUET_MIMETYPE = 'application/vnd.apache.parquet'
+
+EXPORT_FORMATS = {
+    'xlsx': ('xlsx', XLSX_MIMETYPE),
+    'csv': ('csv', CSV_MIMETYPE),
+    'parquet': ('parquet', PARQUET_MIMETYPE),
+}
+
+
+def normalize_export_format(value) -> str:
+    """Formato pedido em ``?format=``; valores desconhecidos voltam para XLSX."""
+    value = (value or '').strip().lower()
+    return value if value in EXPORT_FORMATS else 'xlsx'
+
+
+_ILLEGAL_XML_CHARS = re.compile(r'[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '<Override PartName="/xl/styles.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+    '</Types>'
+)
+
+_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+
+_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet1.xml"/>'
+    '<Relationship Id="rId2" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" '
+    'Target="styles.xml"/>'
+    '</Relationships>'
+)
+
+# Estilo 0: padrão; estilo 1: cabeçalho em negrito, branco sobre azul (#0D6EFD), centralizado
+_STYLES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    '<fonts count="2">'
+    '<font><sz val="11"/><name val="Calibri"/><family val="2"/></font>'
+    '<font><b/><sz val="11"/><color rgb="FFFFFFFF"/><name val="Calibri"/><family val="2"/></font>'
+    '</fonts>'
+    '<fills count="3">'
+    '<fill><patternFill patternType="none"/></fill>'
+    '<fill><patternFill patternType="gray125"/></fill>'
+    '<fill><patternFill patternType="solid"><fgColor rgb="FF0D6EFD"/><bgColor rgb="FF0D6EFD"/></patternFill></fill>'
+    '</fills>'
+    '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    '<cellXfs count="2">'
+    '<xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+    '<xf numFmtId="0" fontId="1" fillId="2" borderId="0" xfId="0" applyFont="1" applyFill="1" applyAlignment="1">'
+    '<alignment horizontal="center" vertical="center"/></xf>'
+    '</cellXfs>'
+    '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+    '</styleSheet>'
+)
+
+
+class _ChunkSink:
+    """Destino sem ``seek`` para o ``zipfile``: acumula bytes até serem drenados."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def column_letter(index: int) -> str:
+    """Letra da coluna (1 -> A, 27 -> AA)."""
+    letters = ''
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
+
+def _cell_xml(ref: str, value, style: int = 0) -> str:
+    style_attr = f' s="{style}"' if style else ''
+    if value is None:
+        return ''
+    if isinstance(value, (bool, np.bool_)):
+        return f'<c r="{ref}" t="b"{style_attr}><v>{int(bool(value))}</v></c>'
+    if isinstance(value, (int, np.integer)):
+        return f'<c r="{ref}"{style_attr}><v>{int(value)}</v></c>'
+    if isinstance(value, (float, np.floating)):
+        if math.isnan(value) or math.isinf(value):
+            return ''
+        return f'<c r="{ref}"{style_attr}><v>{float(value)!r}</v></c>'
+    if isinstance(value, datetime):
+        text = value.strftime('%Y-%m-%d %H:%M:%S')
+    elif isinstance(value, date):
+        text = value.strftime('%Y-%m-%d')
+    else:
+        text = str(value)
+    text = escape(_ILLEGAL_XML_CHARS.sub('', text))
+    return f'<c r="{ref}" t="inlineStr"{style_attr}><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+def _row_xml(row_number: int, values, letters, style: int = 0) -> str:
+    cells = ''.join(
+        _cell_xml(f'{letter}{row_number}', value, style)
+        for letter, value in zip(letters, values)
+    )
+    return f'<row r="{row_number}">{cells}</row>'
+
+
+def iter_xlsx(headers, rows, *, sheet_name='Dados', widths=None, styled_header=True, autofilter=True,
+              batch_size=500):
+    """Gera os bytes de um XLSX com ``headers`` e as linhas do iterável ``rows``."""
+    headers = [str(h) for h in headers]
+    letters = [column_letter(i) for i in range(1, len(headers) + 1)]
+    sink = _ChunkSink()
+    archive = zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_DEFLATED)
+
+    archive.writestr('[Content_Types].xml', _CONTENT_TYPES)
+    archive.writestr('_rels/.rels', _ROOT_RELS)
+    archive.writestr('xl/_rels/workbook.xml.rels', _WORKBOOK_RELS)
+    archive.writestr('xl/styles.xml', _STYLES)
+    archive.writestr(
+        'xl/workbook.xml',
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        f'<sheets><sheet name="{escape(sheet_name[:31])}" sheetId="1" r:id="rId1"/></sheets>'
+        '</workbook>',
+    )
+    yield sink.drain()
+
+    with archive.open('xl/worksheets/sheet1.xml', 'w') as sheet:
+        head = [
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+            'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+            '<sheetViews><sheetView workbookViewId="0">'
+            '<pane ySplit="1" topLeftCell="A2" activePane="bottomLeft" state="frozen"/>'
+            '</sheetView></sheetViews>'
+        ]
+        if widths:
+            head.append('<cols>')
+            head.extend(
+                f'<col min="{i}" max="{i}" width="{float(w)}" customWidth="1"/>'
+                for i, w in enumerate(widths, start=1)
+            )
+            head.append('</cols>')
+        head.append('<sheetData>')
+        head.append(_row_xml(1, headers, letters, style=1 if styled_header else 0))
+        sheet.write(''.join(head).encode('utf-8'))
+
+        row_number = 1
+        batch = []
+        for values in rows:
+            row_number += 1
+            batch.append(_row_xml(row_number, values, letters))
+            if len(batch) >= batch_size:
+                sheet.write(''.join(batch).encode('utf-8'))
+                batch.clear()
+                yield sink.drain()
+        tail = ''.join(batch) + '</sheetData>'
+        if autofilter and letters:
+            tail += f'<autoFilter ref="A1:{letters[-1]}{row_number}"/>'
+        tail += '</worksheet>'
+        sheet.write(tail.encode('utf-8'))
+
+    archive.close()
+    yield sink.drain()
+
+
+def streaming_download(chunks, *, filename: str, mimetype: str) -> Response:
+    """Resposta em partes (chunked) para download; o gerador roda com o contexto da requisição."""
+    response = Response(stream_with_context(chunk for chunk in chunks if chunk), mimetype=mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+    response.headers['Cache-Control'] = 'no-store'
+    return response
+
+
+def iter_csv(headers, rows, *, batch_size=1000):
+    """Gera CSV UTF-8 com BOM, codificando as linhas em lotes."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\r\n')
+    writer.writerow([str(h) for h in headers])
+    yield '\ufeff'.encode('utf-8') + buffer.getvalue().encode('utf-8')
+    buffer.seek(0)
+    buffer.truncate()
+
+    pending = 0
+    for values in rows:
+        writer.writerow(['' if v is None else v for v in values])
+        pending += 1
+        if pending >= batch_size:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    if pending:
+        yield buffer.getvalue().encode('utf-8')
+
+
+def require_pyarrow():
+    try:
+        pa = importlib.import_module('pyarrow')
+        pq = importlib.import_module('pyarrow.parquet')
+    except ImportError as exc:
+        raise RuntimeError('Dependência pyarrow não encontrada. Instale com: pip install pyarrow') from exc
+    return pa, pq
+
+
+def iter_parquet(schema, batches, *, chunk_size=1024 * 1024):
+    """Grava lotes de colunas (``{coluna: lista}``) em Parquet e entrega o arquivo em partes.
+
+    ``schema`` é um ``pyarrow.Schema``. O arquivo temporário fica em memória
+    até 8 MB e depois vai para disco.
+    """
+    pa, pq = require_pyarrow()
+    with tempfile.SpooledTemporaryFile(max_size=8 * 1024 * 1024) as target:
+        with pq.ParquetWriter(target, schema, compression='snappy') as writer:
+            for batch in batches:
+                writer.write_table(pa.Table.from_pydict(batch, schema=schema))
+        target.seek(0)
+        while True:
+            chunk = target.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+
+
+def row_batches(headers, rows, *, batch_size=5000):
+    """Agrupa linhas em lotes colunares ``{cabeçalho: valores}`` para ``iter_parquet``."""
+    columns = {h: [] for h in headers}
+    count = 0
+    for values in rows:
+        for header, value in zip(headers, values):
+            columns[header].append(value)
+        count += 1
+        if count >= batch_size:
+            yield columns
+            columns = {h: [] for h in headers}
+            count = 0
+    if count:
+        yield columns
+
+
+def dataframe_column_widths(df: pd.DataFrame) -> list[int]:
+    widths = []
+    for column in df.columns:
+        try:
+            max_length = df[column].astype(str).map(len).max()
+        except Exception:
+            max_length = None
+        if max_length is None or pd.isna(max_length):
+            max_length = 0
+        widths.append(min(max(len(str(column)), int(max_length)) + 2, 60))
+    return widths
+
+
+def dataframe_export_response(df: pd.DataFrame, *, export_format: str, filename_prefix: str, sheet_name: str):
+    """Exporta um DataFrame já filtrado/ordenado no formato pedido.
+
+    Levanta ``RuntimeError`` se a dependência do formato não estiver instalada.
+    """
+    if df is None:
+        df = pd.DataFrame()
+    export_format = normalize_export_format(export_format)
+    extension, mimetype = EXPORT_FORMATS[export_format]
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    filename = f"{filename_prefix}_{timestamp}.{extension}"
+    headers = [str(c) for c in df.columns]
+
+    if export_format == 'parquet':
+        pa, _ = require_pyarrow()
+        # Colunas mistas (números e '' após fillna) viram texto
+        frame = df.copy()
+        frame.columns = headers
+        for column in frame.columns:
+            if frame[column].dtype == object:
+                frame[column] = frame[column].astype(str)
+        table = pa.Table.from_pandas(frame, preserve_index=False)
+        batches = (table.slice(offset, 50_000).to_pydict() for offset in range(0, max(len(table), 1), 50_000))
+        chunks = iter_parquet(table.schema, batches)
+    else:
+        rows = (list(values) for values in df.itertuples(index=False, name=None))
+        if export_format == 'csv':
+            chunks = iter_csv(headers, rows)
+        else:
+            chunks = iter_xlsx(headers, rows, sheet_name=sheet_name, widths=dataframe_column_widths(df))
+
+    return streaming_download(chunks, filename=filename, mimetype=mimetype)
@@ -0,0 +1,166 @@
+"""Leitura e normalização das planilhas enviadas em Input*Dados.
+
+Cada arquivo é classificado pelo nome (``detect_kind``) e lido pelo parser do
+seu tipo, que devolve o DataFrame já normalizado. O resultado fica no cache de
+leitura (``app/parse_cache.py``) indexado pelo hash do conteúdo, então reenviar
+o mesmo arquivo não passa de novo pela leitura.
+
+A leitura e a normalização (``parse_file``) não dependem do Flask nem do banco
+e rodam no pool de processos dos jobs de importação (``app/jobs.py``). Colunas
+que dependem do banco (``Treinado``) não entram no cache: são calculadas em
+``views.py`` depois da leitura.
+"""
+import json
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from .datasets import write_atomic
+from .normalization import normalize_matricula_series, normalize_situacao_hc_series
+from .parse_cache import file_digest, parse_cache
+from .readers import MissingColumnsError, read_sheet
+
+
+ALLOWED_EXTENSIONS = {'.xlsx', '.xls', '.xlsb'}
+
+HC_SHEET = 'Base Colab.'
+HC_COLUMNS = ["Matrícula", "Cargo", "Situação", "Turno"]
+HC_RENAMES = {
+    "Cargo": "Cargo HC",
+    "Situação": "Situação HC",
+    "Turno": "Turno HC",
+}
+RASTREABILIDADE_COLUMNS = ["Do Endereço", "Funcionário", "Nome", "Data", "Execução por Voz"]
+PREVIEW_ROWS = 5
+
+
+def detect_kind(filename: str) -> str:
+    """'hc', 'rastreabilidade' ou 'planilha' (qualquer outro arquivo aceito)."""
+    if filename.strip().upper().startswith('HC'):
+        return 'hc'
+    if filename.startswith('Rastreabilidade_Tra'):
+        return 'rastreabilidade'
+    return 'planilha'
+
+
+def normalize_hc(df_hc: pd.DataFrame) -> pd.DataFrame:
+    """Matrícula, Cargo HC, Situação HC e Turno HC normalizados.
+
+    Levanta ``MissingColumnsError`` se faltarem colunas.
+    """
+    missing_cols = [col for col in HC_COLUMNS if col not in df_hc.columns]
+    if missing_cols:
+        raise MissingColumnsError(missing_cols)
+
+    display_df = df_hc[HC_COLUMNS].copy()
+    display_df = display_df.rename(columns=HC_RENAMES)
+    display_df['Situação HC'] = normalize_situacao_hc_series(display_df['Situação HC'])
+    display_df['Matrícula'] = normalize_matricula_series(display_df['Matrícula'])
+    display_df = display_df[display_df['Matrícula'].notna()].copy()
+    try:
+        display_df['Matrícula'] = display_df['Matrícula'].astype(int)
+    except Exception:
+        pass
+    return display_df.reset_index(drop=True)
+
+
+def normalize_rastreabilidade(df: pd.DataFrame) -> pd.DataFrame:
+    """Colunas de rastreabilidade mais ``MOD`` (primeira letra do endereço)."""
+    missing_cols = [col for col in RASTREABILIDADE_COLUMNS if col not in df.columns]
+    if missing_cols:
+        raise MissingColumnsError(missing_cols)
+    df_trabalho = df[RASTREABILIDADE_COLUMNS].copy()
+    df_trabalho["MOD"] = df_trabalho["Do Endereço"].fillna("").astype(str).str[:1]
+    return df_trabalho
+
+
+# tipo -> (aba lida, opções de ``read_sheet``, normalização). Da planilha
+# genérica só a prévia é exibida: bastam as 5 primeiras linhas e a dimensão.
+PARSERS = {
+    'hc': (HC_SHEET, {'columns': HC_COLUMNS}, normalize_hc),
+    'rastreabilidade': (0, {'columns': RASTREABILIDADE_COLUMNS}, normalize_rastreabilidade),
+    'planilha': (0, {'nrows': PREVIEW_ROWS, 'scan_all': True}, None),
+}
+
+
+def _report_stage(progress_path, stage: str):
+    if progress_path:
+        write_atomic(Path(progress_path), lambda tmp: Path(tmp).write_text(json.dumps({'stage': stage}), encoding='utf-8'))
+
+
+def parse_file(path, kind: str, extension: str, progress_path=None):
+    """Lê e normaliza um arquivo salvo em disco; executado no pool de processos.
+
+    Só as colunas usadas pelo tipo do arquivo são lidas (``app/readers.py``).
+    Devolve ``(DataFrame, {'reading': s, 'normalizing': s})``. Se
+    ``progress_path`` for informado, a etapa corrente é gravada nele para o
+    acompanhamento do job.
+    """
+    sheet_name, options, normalize = PARSERS[kind]
+    timings = {}
+    _report_stage(progress_path, 'reading')
+    started = time.perf_counter()
+    with open(path, 'rb') as fh:
+        df = read_sheet(fh, sheet_name=sheet_name, extension=extension, **options)
+    timings['reading'] = time.perf_counter() - started
+    _report_stage(progress_path, 'normalizing')
+    started = time.perf_counter()
+    if normalize is not None:
+        df = normalize(df)
+    timings['normalizing'] = time.perf_counter() - started
+    return df, timings
+
+
+class PendingFile:
+    """Leitura de um arquivo agendada por ``submit_file``.
+
+    ``result()`` espera o pool de processos (ou lê no processo atual, se não
+    houver pool), grava o resultado no cache de leitura e devolve
+    ``(DataFrame, tempos por etapa, veio_do_cache)``.
+    """
+
+    def __init__(self, kind, digest, filename, *, future=None, parse_args=None, value=None):
+        self.kind = kind
+        self.digest = digest
+        self.filename = filename
+        self._future = future
+        self._parse_args = parse_args
+        self._value = value
+
+    def result(self):
+        if self._value is None:
+            if self._future is not None:
+                df, timings = self._future.result()
+            else:
+                df, timings = parse_file(*self._parse_args)
+            parse_cache.put(self.kind, self.digest, df, parse_seconds=sum(timings.values()), filename=self.filename)
+            self._value = (df, timings, False)
+        return self._value
+
+
+def submit_file(path, kind: str, extension: str, *, filename: str, executor=None, progress_path=None) -> PendingFile:
+    """Agenda a leitura de um arquivo consultando antes o cache de leitura.
+
+    ``executor`` (um ``ProcessPoolExecutor``) começa a ler na hora quando o
+    arquivo não está no cache; vários arquivos agendados em sequência são
+    lidos em paralelo. O DataFrame devolvido por ``result()`` pode ser
+    alterado livremente.
+    """
+    with open(path, 'rb') as fh:
+        digest = file_digest(fh)
+    cached = parse_cache.get(kind, digest, filename=filename)
+    if cached is not None:
+        return PendingFile(kind, digest, filename, value=(cached.copy(), {}, True))
+
+    parse_args = (str(path), kind, extension, progress_path)
+    if executor is None:
+        return PendingFile(kind, digest, filename, parse_args=parse_args)
+    return PendingFile(kind, digest, filename, future=executor.submit(parse_file, *parse_args))
+
+
+def load_file(path, kind: str, extension: str, *, filename: str, executor=None, progress_path=None):
+    """Lê um arquivo (``submit_file`` + ``result()``)."""
+    return submit_file(
+        path, kind, extension, filename=filename, executor=executor, progress_path=progress_path,
+    ).result()
@@ -0,0 +1,285 @@
+"""Jobs de importação das planilhas do Input*Dados.
+
+O POST grava os arquivos em ``instance/jobs/<id>/`` e devolve o id na hora. Um
+coordenador (thread no processo do servidor, com app context) conduz o job
+pelas etapas ``reading``, ``normalizing``, ``merging`` e ``publishing``; a
+leitura e a normalização de cada arquivo vão para um pool de processos, então
+o trabalho do pandas não disputa o GIL com as requisições.
+
+O estado fica em ``status.json`` no diretório do job, gravado só pelo
+coordenador; o processo que lê um arquivo registra a etapa em que está em
+``progress-<n>.json``. Como tudo está em disco, qualquer processo do servidor
+responde ``/api/input-dados/jobs/<id>``.
+"""
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+from werkzeug.utils import secure_filename
+
+from .datasets import write_atomic
+
+
+log = logging.getLogger(__name__)
+
+JOB_STAGES = ('reading', 'normalizing', 'merging', 'publishing')
+
+_JOB_ID_CHARS = set('0123456789abcdef')
+
+
+class IngestJob:
+    """Estado de um job em execução; usado pelo coordenador."""
+
+    def __init__(self, manager, job_id: str, status: dict):
+        self.manager = manager
+        self.id = job_id
+        self.status = status
+        self.dir = manager.job_dir(job_id)
+
+    def save(self):
+        status = dict(self.status, updated_at=datetime.now().isoformat(timespec='seconds'))
+        write_atomic(
+            self.dir / 'status.json',
+            lambda tmp: Path(tmp).write_text(json.dumps(status, ensure_ascii=False, default=str), encoding='utf-8'),
+        )
+
+    def progress_path(self, index: int) -> Path:
+        return self.dir / f'progress-{index:03d}.json'
+
+    @contextmanager
+    def stage(self, name: str, current_file: str | None = None):
+        """Marca a etapa corrente e soma o tempo gasto nela."""
+        self.status['stage'] = name
+        self.status['current_file'] = current_file
+        self.save()
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_timing(name, time.perf_counter() - started)
+
+    def add_timing(self, name: str, seconds: float):
+        stages = self.status['stages']
+        stages[name] = round(stages.get(name, 0.0) + seconds, 4)
+
+    def message(self, category: str, text: str):
+        """Mensagem exibida (via flash) quando o resultado for aberto."""
+        self.status['messages'].append([category, text])
+
+    def submit_files(self, files):
+        """Agenda a leitura/normalização de todos os arquivos de uma vez.
+
+        ``files`` é uma sequência de ``(caminho, tipo, extensão, nome)``. Os
+        arquivos fora do cache são lidos em paralelo no pool de processos;
+        os resultados são consumidos com ``wait`` na ordem do envio.
+        """
+        from .ingest import submit_file
+
+        executor = self.manager.process_pool()
+        self.status['stage'] = 'reading'
+        self.save()
+        pending = []
+        for index, (path, kind, extension, filename) in enumerate(files):
+            try:
+                pending.append(submit_file(
+                    path, kind, extension,
+                    filename=filename,
+                    executor=executor,
+                    progress_path=str(self.progress_path(index)),
+                ))
+            except Exception as err:
+                # O erro aparece ao consumir este arquivo, como os de leitura
+                pending.append(_FailedFile(err))
+        return pending
+
+    def wait(self, pending, index: int, filename: str):
+        """Resultado (DataFrame) do ``index``-ésimo arquivo agendado por ``submit_files``."""
+        self.status['stage'] = 'reading'
+        self.status['current_file'] = filename
+        self.status['current_index'] = index
+        self.save()
+        try:
+            df, timings, cached = pending[index].result()
+        finally:
+            try:
+                self.progress_path(index).unlink()
+            except OSError:
+                pass
+        for name, seconds in timings.items():
+            self.add_timing(name, seconds)
+        return df
+
+
+class _FailedFile:
+    def __init__(self, error):
+        self.error = error
+
+    def result(self):
+        raise self.error
+
+
+class IngestJobs:
+    def __init__(self):
+        self.root = None
+        self.workers = None
+        self.max_jobs = 2
+        self.retention_hours = 24
+        self._app = None
+        self._lock = threading.Lock()
+        self._processes = None
+        self._threads = None
+
+    def configure(self, app):
+        self._app = app
+        self.root = Path(app.config.get('INGEST_JOBS_DIR') or os.path.join(app.instance_path, 'jobs'))
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.workers = app.config.get('INGEST_WORKERS')
+        self.max_jobs = max(1, int(app.config.get('INGEST_MAX_JOBS', 2)))
+        self.retention_hours = float(app.config.get('INGEST_JOB_RETENTION_HOURS', 24))
+
+    def job_dir(self, job_id: str) -> Path:
+        return self.root / job_id
+
+    def process_pool(self):
+        """Pool de processos da leitura (None com ``INGEST_WORKERS = 0``: lê no próprio processo)."""
+        if self.workers == 0:
+            return None
+        with self._lock:
+            if self._processes is None:
+                workers = self.workers or min(4, os.cpu_count() or 1)
+                self._processes = ProcessPoolExecutor(max_workers=workers)
+            return self._processes
+
+    def _coordinator(self):
+        with self._lock:
+            if self._threads is None:
+                self._threads = ThreadPoolExecutor(max_workers=self.max_jobs, thread_name_prefix='ingest-job')
+            return self._threads
+
+    def submit(self, files, runner, **options) -> str:
+        """Grava os arquivos enviados e agenda ``runner(job, arquivos, **options)``.
+
+        ``files`` são ``FileStorage``; ``runner`` roda com app context na
+        thread do coordenador e recebe a lista ``[{name, path}]`` na ordem do
+        envio.
+        """
+        self._cleanup()
+        job_id = uuid.uuid4().hex
+        job_dir = self.job_dir(job_id)
+        upload_dir = job_dir / 'uploads'
+        upload_dir.mkdir(parents=True)
+        saved = []
+        for index, storage in enumerate(files):
+            target = upload_dir / f'{index:03d}_{secure_filename(storage.filename) or "arquivo"}'
+            storage.save(target)
+            saved.append({'name': storage.filename, 'path': str(target)})
+
+        job = IngestJob(self, job_id, {
+            'id': job_id,
+            'state': 'queued',
+            'stage': None,
+            'current_file': None,
+            'current_index': None,
+            'files': [item['name'] for item in saved],
+            'stages': {},
+            'messages': [],
+            'result': None,
+            'error': None,
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'started_at': None,
+            'finished_at': None,
+        })
+        job.save()
+        self._coordinator().submit(self._run, job, runner, saved, options)
+        return job_id
+
+    def _run(self, job, runner, files, options):
+        job.status['state'] = 'running'
+        job.status['started_at'] = datetime.now().isoformat(timespec='seconds')
+        job.save()
+        started = time.perf_counter()
+        try:
+            with self._app.app_context():
+                job.status['result'] = runner(job, files, **options)
+            job.status['state'] = 'done'
+        except Exception as err:
+            log.exception('Falha no job de importação %s', job.id)
+            job.status['state'] = 'failed'
+            job.status['error'] = str(err)
+            job.message('danger', f'Falha ao processar os arquivos: {err}')
+        finally:
+            job.status['stage'] = None
+            job.status['current_file'] = None
+            job.status['current_index'] = None
+            job.status['finished_at'] = datetime.now().isoformat(timespec='seconds')
+            job.status['total_seconds'] = round(time.perf_counter() - started, 4)
+            job.save()
+            shutil.rmtree(job.dir / 'uploads', ignore_errors=True)
+            for progress_path in job.dir.glob('progress-*.json'):
+                try:
+                    progress_path.unlink()
+                except OSError:
+                    pass
+            log.info('Job de importação %s: %s em %.2f s (%s)',
+                     job.id, job.status['state'], job.status['total_seconds'], job.status['stages'])
+
+    def status(self, job_id: str) -> dict | None:
+        if not job_id or set(job_id) - _JOB_ID_CHARS:
+            return None
+        job_dir = self.job_dir(job_id)
+        try:
+            status = json.loads((job_dir / 'status.json').read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return None
+        if status.get('state') == 'running' and status.get('stage') in ('reading', 'normalizing'):
+            # Etapa de cada arquivo ainda em leitura no pool de processos
+            in_progress = {}
+            for progress_path in job_dir.glob('progress-*.json'):
+                try:
+                    progress = json.loads(progress_path.read_text(encoding='utf-8'))
+                except (OSError, ValueError):
+                    continue
+                in_progress[int(progress_path.stem.split('-')[1])] = progress.get('stage')
+            if in_progress:
+                status['files_progress'] = {
+                    status['files'][index]: stage
+                    for index, stage in sorted(in_progress.items())
+                    if index < len(status['files'])
+                }
+                stage = in_progress.get(status.get('current_index'))
+                status['stage'] = stage or status['stage']
+        return status
+
+    def _cleanup(self):
+        """Remove jobs terminados há mais de ``INGEST_JOB_RETENTION_HOURS``."""
+        limit = time.time() - self.retention_hours * 3600
+        for job_dir in self.root.iterdir():
+            try:
+                if job_dir.is_dir() and (job_dir / 'status.json').stat().st_mtime < limit:
+                    shutil.rmtree(job_dir, ignore_errors=True)
+            except OSError:
+                pass
+
+    def shutdown(self):
+        with self._lock:
+            if self._threads is not None:
+                self._threads.shutdown(wait=True)
+                self._threads = None
+            if self._processes is not None:
+                self._processes.shutdown(wait=True)
+                self._processes = None
+
+
+ingest_jobs = IngestJobs()
+
+
+def init_ingest_jobs(app):
+    ingest_jobs.configure(app)
@@ -34,6 +34,37 @@ class Colaborador(db.Model):
     observacao = db.Column(db.Text, nullable=True)
 
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # Controle de concorrência otimista: incrementada a cada UPDATE (ver app/batch.py)
+    versao = db.Column(db.Integer, nullable=False, default=1, server_default='1')
+
+    __mapper_args__ = {'version_id_col': versao}
 
     def __repr__(self) -> str:
         return f"<Colaborador {self.matricula} - {self.nome}>"
+
+
+class ResumoDiario(db.Model):
+    """Resumo materializado de ``colaboradores`` por dia e dimensões do painel.
+
+    ``matriculas`` guarda um JSON ``{matrícula: ocorrências}`` com o conjunto de
+    matrículas distintas da chave; as ocorrências permitem remover registros sem
+    reler a tabela de origem.
+    """
+    __tablename__ = 'resumo_diario'
+    id = db.Column(db.Integer, primary_key=True)
+
+    data = db.Column(db.Date, nullable=False)
+    turno = db.Column(db.String(50), nullable=False)
+    tipo = db.Column(db.String(50), nullable=False)
+    setor = db.Column(db.String(50), nullable=False)
+    supervisor = db.Column(db.String(120), nullable=False)
+
+    registros = db.Column(db.Integer, nullable=False, default=0)
+    matriculas = db.Column(db.Text, nullable=False, default='{}')
+
+    __table_args__ = (
+        db.UniqueConstraint('data', 'turno', 'tipo', 'setor', 'supervisor', name='uq_resumo_chave'),
+    )
+
+    def __repr__(self) -> str:
+        return f"<ResumoDiario {self.data} {self.turno}/{self.tipo}/{self.setor}/{self.supervisor}={self.registros}>"
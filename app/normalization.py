@@ -0,0 +1,288 @@
+"""Normalização dos valores das planilhas (matrícula, situação, turno, execução).
+
+Cada regra existe em duas formas: a função escalar (um valor por chamada) e a
+versão ``*_series``, usada nas colunas inteiras. A versão de Series não chama
+a função uma vez por linha: os valores distintos são identificados em C
+(``pd.factorize``), cada um é normalizado uma única vez e o resultado é
+espalhado de volta pelas linhas (``map_unique``). Matrículas em colunas
+numéricas são convertidas direto com numpy.
+
+O resultado das versões de Series é idêntico ao de ``Series.apply`` com a
+função escalar, inclusive o dtype; ``tests/test_normalization.py`` confere
+isso com valores de borda e com as planilhas antigas de ``instance/``.
+"""
+import re
+import unicodedata
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import infer_dtype
+
+
+TEMPORARIO_LABEL = 'Tempórario'
+DEFAULT_TURNO = '1° Turno'
+
+_NULL_TEXTS = {'nan', 'none', 'null'}
+_EXECUCAO_NEGATIVE = re.compile(r"\b(n[aã]o|pendente|aguard|sem|falta)\b", re.IGNORECASE)
+
+
+# Funções escalares
+
+
+def normalize_matricula(value):
+    if value is None:
+        return None
+    try:
+        text = str(value).strip()
+        if not text:
+            return None
+        lowered = text.lower()
+        if lowered in _NULL_TEXTS:
+            return None
+        numeric = int(float(text))
+        if numeric <= 0:
+            return None
+        return numeric
+    except (ValueError, TypeError, OverflowError):
+        # OverflowError: 'inf'/'-inf' (float infinito não vira int)
+        return None
+
+
+def normalize_situacao_hc(value):
+    """Normaliza os rótulos da coluna "Situação HC" para uso consistente no painel."""
+    if value is None:
+        return TEMPORARIO_LABEL
+
+    try:
+        text = str(value).strip()
+    except Exception:
+        return TEMPORARIO_LABEL
+
+    if not text:
+        return TEMPORARIO_LABEL
+
+    lowered = text.lower()
+    if lowered in _NULL_TEXTS:
+        return TEMPORARIO_LABEL
+
+    normalized = unicodedata.normalize('NFKD', text).encode('ASCII', 'ignore').decode('ASCII')
+    normalized = normalized.replace('\\', '/').upper()
+    normalized = re.sub(r'\s+', ' ', normalized).strip()
+
+    if not normalized:
+        return TEMPORARIO_LABEL
+
+    if normalized in {'N/D', 'ND', 'N A', 'N/A'}:
+        return TEMPORARIO_LABEL
+
+    if normalized in {'SEM INFORMACAO', 'SEM INFORMACOES', 'SEM NADA', 'SEM DADO', 'SEM DADOS', 'SEM REGISTRO'}:
+        return TEMPORARIO_LABEL
+
+    if normalized == 'ATIVIDADE NORMAL':
+        return 'Ativo'
+
+    if normalized.startswith('AFASTAMENTO'):
+        return 'Afastado'
+
+    if normalized.startswith('FERIAS'):
+        return 'Férias'
+
+    if normalized.startswith('RESCISAO'):
+        return 'Rescisão'
+
+    return text
+
+
+def strip_accents(value: str) -> str:
+    return unicodedata.normalize('NFKD', value).encode('ASCII', 'ignore').decode('ASCII')
+
+
+def normalize_execucao(value):
+    """Texto de "Execução por Voz" sem espaços nas pontas; vazio para nulos."""
+    if pd.isna(value):
+        return ''
+    text = str(value).strip()
+    lowered = text.lower()
+    if lowered in {'', 'nan', 'none', 'null'}:
+        return ''
+    return text
+
+
+def is_execucao_sim(value):
+    """True quando "Execução por Voz" indica execução (contém "sim" e nenhuma negação)."""
+    if value is None:
+        return False
+    try:
+        text = str(value).strip()
+    except Exception:
+        return False
+    if not text:
+        return False
+    lowered = text.lower()
+    if lowered in {"", "nan", "none", "null", "0"}:
+        return False
+    if _EXECUCAO_NEGATIVE.search(lowered):
+        return False
+    return 'sim' in lowered
+
+
+def normalize_turno_label(value):
+    """'1° Turno' / '2° Turno' para as grafias usadas no HC; demais valores sem alteração."""
+    if value is None:
+        return DEFAULT_TURNO
+    try:
+        text = str(value).strip()
+    except Exception:
+        return DEFAULT_TURNO
+    if not text:
+        return DEFAULT_TURNO
+    normalized = strip_accents(text)
+    lowered = normalized.lower().replace('º', '').replace('°', '')
+    lowered = re.sub(r'[^a-z0-9]+', ' ', lowered).strip()
+    if lowered.startswith('1') or lowered.startswith('primeiro') or lowered.startswith('turno 1'):
+        return '1° Turno'
+    if lowered.startswith('2') or lowered.startswith('segundo') or lowered.startswith('turno 2'):
+        return '2° Turno'
+    return text or DEFAULT_TURNO
+
+
+def clean_execucao(value):
+    """Como ``normalize_execucao``, mas também descarta "sem informação"/"sem dados"."""
+    if pd.isna(value):
+        return ''
+    text = str(value).strip()
+    lowered = text.lower()
+    if not text or lowered in {'nan', 'none', 'null', 'sem informação', 'sem informacao', 'sem dados'}:
+        return ''
+    return text
+
+
+def normalize_execucao_category(value):
+    """'Sim', 'Não' ou '' (sem categoria) para um valor já limpo por ``clean_execucao``."""
+    if not value:
+        return ''
+    text = str(value).strip()
+    if not text:
+        return ''
+    normalized = strip_accents(text)
+    normalized = re.sub(r'\s+', ' ', normalized).strip().lower()
+    if not normalized:
+        return ''
+    normalized = normalized.replace('%', '')
+    if 'nao' in normalized:
+        return 'Não'
+    if 'sim' in normalized:
+        return 'Sim'
+    return ''
+
+
+# Versões para Series
+
+
+def _first_positions(codes: np.ndarray, count: int) -> np.ndarray:
+    first = np.full(count, len(codes), dtype=np.intp)
+    np.minimum.at(first, codes, np.arange(len(codes), dtype=np.intp))
+    return first
+
+
+def _object_codes(values: np.ndarray) -> np.ndarray:
+    """Códigos por valor distinto de um array object, sem juntar 1, 1.0 e True."""
+    codes = np.empty(len(values), dtype=np.intp)
+    null = pd.isna(values)
+    present = values[~null]
+    if infer_dtype(present, skipna=False) == 'string' or not len(present):
+        # Só texto (mais nulos): factorize em C. Nulos se agrupam pelo tipo
+        # (None, NaN, NaT...), que é o que muda o resultado das funções.
+        present_codes, uniques = pd.factorize(present)
+        codes[~null] = present_codes
+        if null.any():
+            null_types = np.frompyfunc(type, 1, 1)(values[null])
+            codes[null] = pd.factorize(null_types)[0] + len(uniques)
+        return codes
+
+    seen = {}
+    for index, value in enumerate(values):
+        cls = value.__class__
+        # repr separa 0.0 de -0.0 e 1 de 1.0/True, que são iguais como chave de dict
+        key = value if cls is str else (cls, value if cls is int else repr(value))
+        codes[index] = seen.setdefault(key, len(seen))
+    return codes
+
+
+def map_unique(series: pd.Series, func) -> pd.Series:
+    """``series.apply(func)`` chamando ``func`` uma vez por valor distinto.
+
+    ``func`` deve depender só do valor (nulos do mesmo tipo são tratados como
+    iguais). O dtype do resultado é inferido como no ``apply``.
+    """
+    values = series.to_numpy() if isinstance(series.dtype, np.dtype) else None
+    if values is None or not len(values) or values.dtype.kind not in 'biufO':
+        return series.apply(func)
+
+    if values.dtype.kind == 'f':
+        # Bits do float: NaN e -0.0 ficam separados como no apply
+        codes = pd.factorize(values.view(f'i{values.itemsize}'))[0]
+    elif values.dtype.kind == 'O':
+        codes = _object_codes(values)
+    else:
+        codes = pd.factorize(values)[0]
+
+    first = _first_positions(codes, int(codes.max()) + 1)
+    uniques = pd.Series(values[first].astype(object), dtype=object)
+    mapped = uniques.map(func).to_numpy()
+    return pd.Series(mapped.take(codes), index=series.index, name=series.name)
+
+
+def normalize_matricula_series(series: pd.Series) -> pd.Series:
+    """``series.apply(normalize_matricula)``: inteiros positivos, nulos para o resto."""
+    values = series.to_numpy() if isinstance(series.dtype, np.dtype) else None
+    if values is None or not len(values) or values.dtype.kind not in 'iuf':
+        return map_unique(series, normalize_matricula)
+
+    numbers = values.astype(np.float64)
+    if values.dtype.kind in 'iu':
+        # int(float(str(v))): inteiros acima de 2**53 passam pelo arredondamento do float
+        finite = np.ones(len(numbers), dtype=bool)
+    else:
+        finite = ~np.isnan(numbers)
+        if np.isinf(numbers).any():
+            return map_unique(series, normalize_matricula)
+    truncated = np.trunc(numbers)
+    if (np.abs(truncated[finite]) >= 2 ** 63).any():
+        return map_unique(series, normalize_matricula)
+
+    valid = finite & (truncated > 0)
+    if valid.all():
+        return pd.Series(truncated.astype(np.int64), index=series.index, name=series.name)
+    if not valid.any():
+        return pd.Series([None] * len(values), index=series.index, name=series.name, dtype=object)
+    return pd.Series(np.where(valid, truncated, np.nan), index=series.index, name=series.name)
+
+
+def normalize_situacao_hc_series(series: pd.Series) -> pd.Series:
+    return map_unique(series, normalize_situacao_hc)
+
+
+def normalize_execucao_series(series: pd.Series) -> pd.Series:
+    return map_unique(series, normalize_execucao)
+
+
+def is_execucao_sim_series(series: pd.Series) -> pd.Series:
+    return map_unique(series, is_execucao_sim)
+
+
+def normalize_turno_label_series(series: pd.Series) -> pd.Series:
+    return map_unique(series, normalize_turno_label)
+
+
+def clean_execucao_series(series: pd.Series) -> pd.Series:
+    return map_unique(series, clean_execucao)
+
+
+def normalize_execucao_category_series(series: pd.Series) -> pd.Series:
+    return map_unique(series, normalize_execucao_category)
+
+
+def strip_accents_series(series: pd.Series) -> pd.Series:
+    return map_unique(series, strip_accents)
+
@@ -0,0 +1,182 @@
+"""Cache em disco das planilhas já lidas, endereçado pelo conteúdo do arquivo.
+
+A chave é o SHA-256 dos bytes enviados mais o tipo de leitura (HC,
+rastreabilidade, planilha genérica); o valor é o DataFrame normalizado,
+gravado como os conjuntos de ``app/datasets.py`` (Feather ou pickle). Reenviar
+o mesmo arquivo devolve o resultado sem passar pelo ``pd.read_excel``.
+
+O tamanho é limitado por ``PARSE_CACHE_MAX_BYTES`` e ``PARSE_CACHE_MAX_ENTRIES``;
+ao passar de um deles saem as entradas usadas há mais tempo. Mudanças na
+normalização devem incrementar ``PARSE_CACHE_VERSION`` para descartar o que foi
+gravado antes.
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+from .datasets import read_frame, write_atomic, write_frame
+
+
+log = logging.getLogger(__name__)
+
+PARSE_CACHE_VERSION = 2
+
+
+def file_digest(stream, chunk_size: int = 1024 * 1024) -> str:
+    """SHA-256 do conteúdo de ``stream``; a posição volta para o início."""
+    digest = hashlib.sha256()
+    stream.seek(0)
+    for chunk in iter(lambda: stream.read(chunk_size), b''):
+        digest.update(chunk)
+    stream.seek(0)
+    return digest.hexdigest()
+
+
+class ParseCache:
+    def __init__(self, root=None, max_bytes: int = 512 * 1024 * 1024, max_entries: int = 64):
+        self.root = Path(root) if root else None
+        self.max_bytes = int(max_bytes)
+        self.max_entries = int(max_entries)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.seconds_saved = 0.0
+
+    def configure(self, root=None, max_bytes: int | None = None, max_entries: int | None = None):
+        if root is not None:
+            self.root = Path(root)
+            self.root.mkdir(parents=True, exist_ok=True)
+        if max_bytes is not None:
+            self.max_bytes = int(max_bytes)
+        if max_entries is not None:
+            self.max_entries = int(max_entries)
+
+    @property
+    def enabled(self) -> bool:
+        return self.root is not None and self.max_entries > 0 and self.max_bytes > 0
+
+    def _key(self, kind: str, digest: str) -> str:
+        return f'{kind}-v{PARSE_CACHE_VERSION}-{digest}'
+
+    def _entries(self):
+        """(meta, arquivo de dados) de cada entrada válida."""
+        entries = []
+        for meta_path in self.root.glob('*.json'):
+            try:
+                meta = json.loads(meta_path.read_text(encoding='utf-8'))
+                data_path = self.root / meta['file']
+                stat = data_path.stat()
+            except (OSError, ValueError, KeyError):
+                continue
+            entries.append((meta_path, data_path, stat.st_size, os.stat(meta_path).st_mtime))
+        return entries
+
+    def get(self, kind: str, digest: str, filename: str | None = None) -> pd.DataFrame | None:
+        if not self.enabled:
+            return None
+        meta_path = self.root / f'{self._key(kind, digest)}.json'
+        try:
+            meta = json.loads(meta_path.read_text(encoding='utf-8'))
+            df = read_frame(self.root / meta['file'])
+            # Feather não guarda ``df.attrs`` (ex.: dimensão da aba original)
+            df.attrs.update(meta.get('attrs') or {})
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return None
+        except Exception as err:
+            log.warning('Entrada inválida no cache de leitura (%s): %s', meta_path.name, err)
+            with self._lock:
+                self.misses += 1
+            return None
+        try:
+            # mtime do metadado marca o último uso (ordem de descarte)
+            os.utime(meta_path)
+        except OSError:
+            pass
+        saved = float(meta.get('parse_seconds') or 0)
+        with self._lock:
+            self.hits += 1
+            self.seconds_saved += saved
+        log.info('Cache de leitura: "%s" (%s, %s...) reaproveitado; %.2f s de leitura economizados',
+                 filename or meta.get('filename'), kind, digest[:12], saved)
+        return df
+
+    def put(self, kind: str, digest: str, df: pd.DataFrame, parse_seconds: float, filename: str | None = None):
+        """Grava o resultado de uma leitura; falhas só são registradas no log."""
+        if not self.enabled:
+            return
+        key = self._key(kind, digest)
+        try:
+            data_path = write_frame(self.root / key, df)
+            meta = {
+                'file': data_path.name,
+                'kind': kind,
+                'filename': filename,
+                'rows': int(df.shape[0]),
+                'attrs': df.attrs,
+                'parse_seconds': round(parse_seconds, 4),
+                'created_at': datetime.now().isoformat(timespec='seconds'),
+            }
+            write_atomic(
+                self.root / f'{key}.json',
+                lambda tmp: Path(tmp).write_text(json.dumps(meta, ensure_ascii=False), encoding='utf-8'),
+            )
+        except Exception as err:
+            log.warning('Não foi possível gravar "%s" no cache de leitura: %s', filename, err)
+            return
+        log.info('Cache de leitura: "%s" (%s) lido em %.2f s e armazenado', filename, kind, parse_seconds)
+        self._evict()
+
+    def _evict(self):
+        with self._lock:
+            entries = sorted(self._entries(), key=lambda e: e[3])
+            total = sum(e[2] for e in entries)
+            while entries and (len(entries) > self.max_entries or total > self.max_bytes):
+                meta_path, data_path, size, _ = entries.pop(0)
+                for path in (meta_path, data_path):
+                    try:
+                        path.unlink()
+                    except OSError:
+                        pass
+                total -= size
+                log.info('Cache de leitura: entrada %s descartada', meta_path.stem)
+
+    def clear(self):
+        if self.root is None:
+            return
+        for path in self.root.iterdir():
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+    def stats(self) -> dict:
+        entries = self._entries() if self.enabled else []
+        with self._lock:
+            return {
+                'entries': len(entries),
+                'bytes': sum(e[2] for e in entries),
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'seconds_saved': round(self.seconds_saved, 3),
+            }
+
+
+parse_cache = ParseCache()
+
+
+def init_parse_cache(app):
+    parse_cache.configure(
+        root=app.config.get('PARSE_CACHE_DIR') or os.path.join(app.instance_path, 'parse_cache'),
+        max_bytes=app.config.get('PARSE_CACHE_MAX_BYTES', 512 * 1024 * 1024),
+        max_entries=app.config.get('PARSE_CACHE_MAX_ENTRIES', 64),
+    )
@@ -0,0 +1,88 @@
+"""Diagnóstico de planos de consulta (``EXPLAIN QUERY PLAN``) das consultas quentes.
+
+Monta as mesmas consultas que as rotas executam, com valores representativos,
+e aponta as que o SQLite resolve varrendo a tabela inteira em vez de usar um
+índice (veja ``INDEXES`` em ``app/__init__.py``).
+"""
+from datetime import date, timedelta
+
+from sqlalchemy import func, select
+
+from . import db
+from .aggregations import catalog_statement, grain_statement, summary_statement
+from .models import Colaborador
+
+
+def representative_queries() -> list[dict]:
+    """Consultas do painel, da tabela e das exportações.
+
+    ``full_scan_expected`` marca as que leem a tabela inteira por definição
+    (ex.: exportação HC sem filtro), em que o alerta é apenas informativo.
+    """
+    from .views import build_tabela_query, hc_database_statement
+
+    today = date.today()
+    start = today - timedelta(days=29)
+    tabela = build_tabela_query(start, today)
+    tabela_matricula = build_tabela_query(start, today, q_matricula=123)
+    tabela_nome = build_tabela_query(start, today, q_nome='joao', q_supervisor='silva')
+
+    return [
+        {'name': 'painel: catálogo de dimensões (resumo_diario)', 'statement': catalog_statement()},
+        {'name': 'painel: consolidados do período (resumo_diario)',
+         'statement': summary_statement(start, today, turno='1° Turno', tipo='TALKMAN')},
+        {'name': 'painel: consolidados lidos da origem',
+         'statement': grain_statement(start, today, turno='1° Turno', tipo='TALKMAN')},
+        {'name': 'painel: merge HC (TALKMAN)', 'statement': hc_database_statement()},
+        {'name': 'input-dados: matrículas TALKMAN (Treinado)',
+         'statement': select(Colaborador.matricula, Colaborador.tipo).where(Colaborador.matricula.isnot(None))},
+        {'name': 'tabela: página do período', 'statement': tabela.limit(25).offset(0).statement},
+        {'name': 'tabela: total do período',
+         'statement': tabela.order_by(None).with_entities(func.count(Colaborador.id)).statement},
+        {'name': 'tabela: filtro por matrícula', 'statement': tabela_matricula.limit(25).statement},
+        {'name': 'tabela: filtro por nome/supervisor', 'statement': tabela_nome.limit(25).statement},
+        {'name': 'tabela/export: período completo', 'statement': tabela.statement},
+        {'name': 'export HC: todos os colaboradores',
+         'statement': hc_database_statement(talkman_only=False), 'full_scan_expected': True},
+    ]
+
+
+def explain(statement) -> list[str]:
+    """Executa ``EXPLAIN QUERY PLAN`` e devolve o detalhe de cada passo do plano."""
+    bind = db.session.get_bind()
+    compiled = statement.compile(dialect=bind.dialect)
+    params = compiled.construct_params()
+    values = tuple(
+        value.isoformat() if isinstance(value, date) else value
+        for value in (params[key] for key in (compiled.positiontup or []))
+    )
+    with bind.connect() as conn:
+        rows = conn.exec_driver_sql(f'EXPLAIN QUERY PLAN {compiled}', values).all()
+    return [str(row[-1]) for row in rows]
+
+
+def is_full_scan(step: str) -> bool:
+    """Um passo ``SCAN <tabela>`` sem índice lê todas as linhas da tabela.
+
+    Tabelas virtuais (FTS5) aparecem como SCAN mas consultam o próprio índice.
+    """
+    text = step.strip().upper()
+    return (
+        text.startswith('SCAN ')
+        and ' USING ' not in text
+        and 'SUBQUERY' not in text
+        and 'VIRTUAL TABLE' not in text
+    )
+
+
+def analyze_queries() -> list[dict]:
+    results = []
+    for query in representative_queries():
+        plan = explain(query['statement'])
+        results.append({
+            'name': query['name'],
+            'plan': plan,
+            'full_scans': [step for step in plan if is_full_scan(step)],
+            'full_scan_expected': query.get('full_scan_expected', False),
+        })
+    return results
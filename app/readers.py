@@ -0,0 +1,211 @@
+"""Leitura em fluxo das planilhas (.xlsb/.xlsx), só com as colunas usadas.
+
+``pd.read_excel`` monta a aba inteira em memória (todas as linhas e colunas)
+antes de qualquer seleção. Aqui as linhas são percorridas com o iterador do
+pyxlsb (``rows(sparse=True)``) ou do openpyxl em modo ``read_only``
+(``iter_rows``) e só as colunas pedidas são guardadas; ``nrows`` permite parar
+logo depois das linhas de prévia.
+
+As células são convertidas como nos leitores do pandas e as linhas guardadas
+passam pelo mesmo ``TextParser`` usado pelo ``read_excel``, então o resultado
+(inclusive dtypes, linhas vazias no meio e cabeçalhos "Unnamed") é o mesmo de
+``pd.read_excel(...)[colunas]``. Arquivos .xls continuam no ``read_excel``.
+"""
+import importlib
+
+import numpy as np
+import pandas as pd
+from pandas.errors import EmptyDataError
+from pandas.io.parsers import TextParser
+
+
+class MissingColumnsError(KeyError):
+    """A planilha não tem todas as colunas que o tipo dela exige."""
+
+    def __init__(self, columns):
+        self.columns = list(columns)
+        super().__init__(f'Colunas ausentes: {", ".join(self.columns)}')
+
+    def __str__(self):
+        return self.args[0]
+
+    def __reduce__(self):
+        # Preserva ``columns`` ao voltar do pool de processos
+        return (type(self), (self.columns,))
+
+
+def _require(module: str, install: str | None = None):
+    try:
+        return importlib.import_module(module)
+    except ImportError:
+        raise RuntimeError(f'Dependência {module} não encontrada. Instale com: pip install {install or module}')
+
+
+def _sheet_not_found(sheet_name):
+    return ValueError(f"Worksheet named '{sheet_name}' not found")
+
+
+def _xlsb_rows(source, sheet_name):
+    """(índice da linha, valores convertidos) das linhas não vazias de uma aba .xlsb."""
+    pyxlsb = _require('pyxlsb')
+
+    def convert(value):
+        if value is None:
+            return ''
+        if isinstance(value, float):
+            as_int = int(value)
+            return as_int if as_int == value else value
+        return value
+
+    with pyxlsb.open_workbook(source) as workbook:
+        if isinstance(sheet_name, str):
+            if sheet_name not in workbook.sheets:
+                raise _sheet_not_found(sheet_name)
+            sheet = workbook.get_sheet(sheet_name)
+        else:
+            sheet = workbook.get_sheet(sheet_name + 1)
+        try:
+            for row in sheet.rows(sparse=True):
+                yield row[0].r, [convert(cell.v) for cell in row]
+        finally:
+            sheet.close()
+
+
+def _xlsx_rows(source, sheet_name):
+    """(índice da linha, valores convertidos) de cada linha de uma aba .xlsx."""
+    openpyxl = _require('openpyxl')
+    from openpyxl.cell.cell import TYPE_ERROR, TYPE_NUMERIC
+
+    def convert(cell):
+        value = cell.value
+        if value is None:
+            return ''
+        data_type = getattr(cell, 'data_type', None)
+        if data_type == TYPE_ERROR:
+            return np.nan
+        if data_type == TYPE_NUMERIC:
+            as_int = int(value)
+            return as_int if as_int == value else float(value)
+        return value
+
+    workbook = openpyxl.load_workbook(source, read_only=True, data_only=True, keep_links=False)
+    try:
+        if isinstance(sheet_name, str):
+            if sheet_name not in workbook.sheetnames:
+                raise _sheet_not_found(sheet_name)
+            sheet = workbook[sheet_name]
+        else:
+            sheet = workbook.worksheets[sheet_name]
+        sheet.reset_dimensions()
+        for index, row in enumerate(sheet.iter_rows()):
+            yield index, [convert(cell) for cell in row]
+    finally:
+        workbook.close()
+
+
+def _row_has_data(values) -> bool:
+    return any(not (isinstance(v, str) and v == '') for v in values)
+
+
+def _trimmed_width(values) -> int:
+    width = len(values)
+    while width and isinstance(values[width - 1], str) and values[width - 1] == '':
+        width -= 1
+    return width
+
+
+def read_sheet(source, *, extension: str, sheet_name=0, columns=None, nrows=None, scan_all=False) -> pd.DataFrame:
+    """Lê uma aba guardando só ``columns`` (na ordem pedida) e no máximo ``nrows`` linhas.
+
+    Levanta ``ValueError`` se a aba não existir e ``MissingColumnsError`` se
+    faltar alguma coluna no cabeçalho. Com ``nrows`` a leitura para após a
+    última linha necessária, a menos que ``scan_all`` seja verdadeiro: nesse
+    caso o restante da aba é percorrido (sem guardar nada) só para contar
+    linhas e colunas. A dimensão da aba inteira fica em ``df.attrs['source_shape']``
+    quando conhecida.
+    """
+    extension = (extension or '').lower()
+    if extension == '.xls':
+        _require('xlrd', 'xlrd==1.2.0')
+        try:
+            source.seek(0)
+        except Exception:
+            pass
+        df = pd.read_excel(source, engine='xlrd', sheet_name=sheet_name)
+        shape = df.shape
+        if columns is not None:
+            missing = [col for col in columns if col not in df.columns]
+            if missing:
+                raise MissingColumnsError(missing)
+            df = df[list(columns)]
+        if nrows is not None:
+            df = df.head(nrows)
+        df.attrs['source_shape'] = shape
+        return df
+
+    rows = _xlsb_rows(source, sheet_name) if extension == '.xlsb' else _xlsx_rows(source, sheet_name)
+
+    def select(values):
+        if positions is None:
+            return values[:_trimmed_width(values)]
+        return [values[p] if p < len(values) else '' for p in positions]
+
+    header = None
+    positions = None
+    # Linhas de dados guardadas; a linha i da aba (i >= 1) é data[i - 1], linhas vazias viram []
+    data = []
+    last_index = -1
+    max_width = 0
+    complete = True
+    try:
+        for index, values in rows:
+            if header is None:
+                # A linha 0 da aba é o cabeçalho, mesmo vazia (header=0 do read_excel)
+                header = values[:_trimmed_width(values)] if index == 0 else []
+                max_width = len(header)
+                if header:
+                    last_index = 0
+                if columns is not None:
+                    names = [str(v) for v in header]
+                    missing = [col for col in columns if col not in names]
+                    if missing:
+                        raise MissingColumnsError(missing)
+                    positions = [names.index(col) for col in columns]
+                if index == 0:
+                    continue
+
+            if not _row_has_data(values):
+                continue
+            max_width = max(max_width, _trimmed_width(values))
+            position = index - 1
+            if nrows is None or position < nrows:
+                while len(data) < position:
+                    data.append([])
+                data.append(select(values))
+            last_index = index
+            if nrows is not None and position >= nrows - 1 and not scan_all:
+                complete = False
+                break
+    finally:
+        rows.close()
+
+    if header is None or last_index < 0:
+        df = pd.DataFrame()
+        df.attrs['source_shape'] = (0, 0)
+        return df
+
+    if positions is None:
+        width = max([len(header)] + [len(r) for r in data])
+        selected_header = header + [''] * (width - len(header))
+        data = [r + [''] * (width - len(r)) for r in data]
+    else:
+        selected_header = [header[p] for p in positions]
+        data = [r or [''] * len(positions) for r in data]
+
+    try:
+        df = TextParser([selected_header] + data, header=0, skip_blank_lines=False).read()
+    except EmptyDataError:
+        df = pd.DataFrame()
+    if complete:
+        df.attrs['source_shape'] = (last_index, max_width if positions is None else len(positions))
+    return df
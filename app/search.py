@@ -0,0 +1,106 @@
+"""Busca textual em ``colaboradores`` via índice FTS5 do SQLite.
+
+A tabela virtual ``colaboradores_fts`` indexa nome, supervisor e observação
+(conteúdo externo, mantido por triggers) com ``remove_diacritics``, então
+"JOÃO", "joao" e "Joã" encontram o mesmo registro. Cada palavra digitada vira
+uma busca por prefixo. Sem FTS5 no SQLite, os filtros voltam ao ``ilike``.
+"""
+import re
+
+from sqlalchemy import and_, literal_column, select, table, text
+
+from . import db
+from .models import Colaborador
+
+
+FTS_TABLE = 'colaboradores_fts'
+FTS_COLUMNS = ('nome', 'supervisor', 'observacao')
+
+_fts_available = False
+
+_FTS_DDL = (
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        nome, supervisor, observacao,
+        content='colaboradores', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2',
+        prefix='2 3'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON colaboradores BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, nome, supervisor, observacao)
+        VALUES (new.id, new.nome, new.supervisor, new.observacao);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON colaboradores BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, nome, supervisor, observacao)
+        VALUES ('delete', old.id, old.nome, old.supervisor, old.observacao);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF nome, supervisor, observacao ON colaboradores BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, nome, supervisor, observacao)
+        VALUES ('delete', old.id, old.nome, old.supervisor, old.observacao);
+        INSERT INTO {FTS_TABLE}(rowid, nome, supervisor, observacao)
+        VALUES (new.id, new.nome, new.supervisor, new.observacao);
+    END""",
+)
+
+
+def fts_available() -> bool:
+    return _fts_available
+
+
+def rebuild_fts():
+    """Reindexa todo o conteúdo de ``colaboradores`` (sem commit)."""
+    db.session.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+
+
+def ensure_fts():
+    """Cria a tabela FTS5 e os triggers; indexa os registros existentes na criação."""
+    global _fts_available
+    try:
+        exists = db.session.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+            {'name': FTS_TABLE},
+        ).first() is not None
+        for ddl in _FTS_DDL:
+            db.session.execute(text(ddl))
+        if not exists:
+            rebuild_fts()
+        db.session.commit()
+        _fts_available = True
+    except Exception:
+        db.session.rollback()
+        _fts_available = False
+
+
+def fts_query(terms: dict) -> str | None:
+    """Monta a expressão MATCH para ``{coluna: texto digitado}``.
+
+    Cada palavra vira ``coluna : "palavra"*`` e todas são combinadas com AND.
+    Retorna None se nenhum termo tiver palavras indexáveis.
+    """
+    clauses = []
+    for column, value in terms.items():
+        if column not in FTS_COLUMNS:
+            raise ValueError(f'Coluna sem índice de busca: {column}')
+        words = re.findall(r'\w+', value or '')
+        if not words:
+            return None
+        clauses.extend(f'{column} : "{word}"*' for word in words)
+    return ' AND '.join(clauses) if clauses else None
+
+
+def text_filter(terms: dict):
+    """Condição SQLAlchemy para filtrar ``Colaborador`` pelos termos de busca.
+
+    Usa o índice FTS5 quando disponível e ``ilike('%...%')`` caso contrário.
+    """
+    terms = {column: value for column, value in terms.items() if value}
+    if not terms:
+        return None
+    expression = fts_query(terms) if _fts_available else None
+    if expression is None:
+        return and_(*(getattr(Colaborador, column).ilike(f"%{value}%") for column, value in terms.items()))
+    matches = (
+        select(literal_column('rowid'))
+        .select_from(table(FTS_TABLE))
+        .where(literal_column(FTS_TABLE).op('MATCH')(expression))
+    )
+    return Colaborador.id.in_(matches)
@@ -0,0 +1,286 @@
+"""Servidor de produção: waitress com pool de threads e, opcionalmente, vários processos.
+
+O ``app.run`` e o ``make_server`` do Werkzeug atendem uma requisição por vez,
+então um envio ou exportação demorada trava os demais usuários. Aqui cada
+processo atende com ``SERVER_THREADS`` threads, mantém as conexões abertas
+entre requisições (keep-alive, fechadas após ``SERVER_CHANNEL_TIMEOUT``
+segundos ociosas) e limita as conexões abertas (``SERVER_CONNECTION_LIMIT``;
+acima disso o socket deixa de aceitar e os clientes esperam na fila do
+``listen``, de ``SERVER_BACKLOG`` posições).
+
+Com ``SERVER_PROCESSES > 1`` este processo só abre o socket e o entrega aos
+processos filhos (``multiprocessing`` com spawn, como no Windows e no
+executável do PyInstaller), que montam o próprio app e aceitam conexões do
+mesmo socket; um filho que cair é reiniciado, e os filhos param sozinhos se
+o principal morrer (o pipe de controle fecha). O cache de consultas é de cada
+processo, mas a versão dos dados que o invalida é compartilhada (ver
+``app/cache.py``).
+
+O encerramento é gracioso: o socket para de aceitar, as conexões ociosas são
+fechadas e as requisições em andamento têm até ``SERVER_SHUTDOWN_TIMEOUT``
+segundos para terminar.
+
+Só usa código Python puro (waitress), que entra no executável sem ajustes.
+"""
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import threading
+import time
+
+
+log = logging.getLogger(__name__)
+
+
+def _load_waitress():
+    try:
+        import waitress.server
+        from waitress import wasyncore
+    except ImportError as exc:  # pragma: no cover - depende do ambiente
+        raise RuntimeError('Dependência waitress não encontrada. Instale com: pip install waitress') from exc
+    return waitress.server, wasyncore
+
+
+def server_options(app, **overrides) -> dict:
+    """Configuração do servidor a partir de ``SERVER_*`` do app; ``None`` em ``overrides`` é ignorado."""
+    options = {
+        'threads': app.config.get('SERVER_THREADS', 8),
+        'processes': app.config.get('SERVER_PROCESSES', 1),
+        'connection_limit': app.config.get('SERVER_CONNECTION_LIMIT', 200),
+        'backlog': app.config.get('SERVER_BACKLOG', 1024),
+        'channel_timeout': app.config.get('SERVER_CHANNEL_TIMEOUT', 120),
+        'shutdown_timeout': app.config.get('SERVER_SHUTDOWN_TIMEOUT', 30),
+    }
+    options.update({key: value for key, value in overrides.items() if value is not None})
+    for key in ('threads', 'processes', 'connection_limit', 'backlog'):
+        options[key] = max(1, int(options[key]))
+    for key in ('channel_timeout', 'shutdown_timeout'):
+        options[key] = max(0, int(options[key]))
+    return options
+
+
+def bind_socket(host: str, port: int, backlog: int) -> socket.socket:
+    """Abre o socket de escuta (erro já aqui se a porta estiver ocupada)."""
+    family = socket.AF_INET6 if ':' in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    try:
+        if os.name != 'nt':
+            # No Windows SO_REUSEADDR permite dois servidores na mesma porta
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((host, port))
+        sock.listen(backlog)
+    except OSError:
+        sock.close()
+        raise
+    sock.set_inheritable(True)
+    return sock
+
+
+class WorkerServer:
+    """Um processo servindo ``app`` no socket ``sock`` com o pool de threads do waitress."""
+
+    def __init__(self, app, sock: socket.socket, options: dict):
+        waitress_server, self._wasyncore = _load_waitress()
+        self.options = options
+        self._map = {}
+        self._stop = threading.Event()
+        self._stopped = threading.Event()
+        self._server = waitress_server.create_server(
+            app,
+            map=self._map,
+            sockets=[sock],
+            threads=options['threads'],
+            connection_limit=options['connection_limit'],
+            backlog=options['backlog'],
+            channel_timeout=options['channel_timeout'],
+            # Verifica as conexões ociosas com a mesma frequência do timeout (mínimo 1 s)
+            cleanup_interval=max(1, min(30, options['channel_timeout'])),
+            ident='qualidade',
+        )
+
+    def serve_forever(self):
+        adj = self._server.adj
+        try:
+            while not self._stop.is_set():
+                self._wasyncore.loop(timeout=adj.asyncore_loop_timeout, map=self._map,
+                                     use_poll=adj.asyncore_use_poll, count=1)
+            self._drain()
+        finally:
+            self._stopped.set()
+
+    def _drain(self):
+        # Usa internos do waitress (versão fixada em requirements.txt); se mudarem, encerra sem esperar
+        try:
+            self._drain_channels()
+        except (AttributeError, TypeError):
+            log.warning('Encerramento gracioso indisponível nesta versão do waitress; '
+                        'fechando as conexões sem esperar', exc_info=True)
+            try:
+                self._server.close()
+            except OSError:
+                pass
+        self._wasyncore.close_all(self._map)
+
+    def _drain_channels(self):
+        # Roda na thread do loop: as respostas em andamento ainda são escritas por ele
+        server = self._server
+        server.accepting = False
+        server.del_channel()
+        deadline = time.monotonic() + self.options['shutdown_timeout']
+        while server.active_channels and time.monotonic() < deadline:
+            for channel in list(server.active_channels.values()):
+                if not channel.requests and not channel.total_outbufs_len:
+                    channel.will_close = True
+            self._wasyncore.loop(timeout=0.1, map=self._map, use_poll=server.adj.asyncore_use_poll, count=1)
+        if server.active_channels:
+            log.warning('Encerrando com %d conexão(ões) ainda em andamento', len(server.active_channels))
+        server.task_dispatcher.shutdown(cancel_pending=True, timeout=5)
+
+    def shutdown(self, wait: bool = True):
+        """Pede a parada (de qualquer thread) e, com ``wait``, espera o encerramento gracioso."""
+        self._stop.set()
+        try:
+            self._server.pull_trigger()
+        except OSError:
+            pass
+        if wait:
+            self._stopped.wait(self.options['shutdown_timeout'] + 10)
+
+
+def _worker_main(sock, options, app_config, control, index):
+    """Ponto de entrada dos processos filhos (precisa ser importável para o spawn)."""
+    # Ctrl+C chega a todo o grupo de processos; quem coordena a parada é o processo principal
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    from . import create_app
+
+    app = create_app(app_config)
+    worker = WorkerServer(app, sock, options)
+
+    def wait_stop():
+        # Qualquer mensagem ou o pipe fechado (principal encerrado) é o pedido de parada
+        try:
+            control.recv()
+        except (EOFError, OSError):
+            pass
+        worker.shutdown(wait=False)
+
+    threading.Thread(target=wait_stop, name='server-stop', daemon=True).start()
+    app.logger.info('Processo %d do servidor (pid %d) atendendo com %d threads',
+                    index, os.getpid(), options['threads'])
+    worker.serve_forever()
+
+
+class ProductionServer:
+    """Servidor de produção usado pelo ``servidor.py`` (console e painel Tk).
+
+    ``serve_forever()`` bloqueia até ``shutdown()``; com vários processos ele
+    supervisiona os filhos e reinicia os que terminarem inesperadamente.
+    ``app_config`` é repassado ao ``create_app`` de cada processo filho.
+    """
+
+    def __init__(self, app, host: str = '0.0.0.0', port: int = 5000, app_config: dict | None = None, **overrides):
+        _load_waitress()
+        self.app = app
+        self.host = host
+        self.options = server_options(app, **overrides)
+        self.app_config = app_config
+        self.socket = bind_socket(host, port, self.options['backlog'])
+        self.port = self.socket.getsockname()[1]
+        self._worker = None
+        self._processes = []
+        self._ctx = multiprocessing.get_context('spawn')
+        self._stop = threading.Event()
+        self._stopped = threading.Event()
+
+    @property
+    def url(self) -> str:
+        host = '127.0.0.1' if self.host in ('0.0.0.0', '::') else self.host
+        return f'http://{host}:{self.port}'
+
+    def summary(self) -> str:
+        """Resumo da configuração para exibir na subida."""
+        options = self.options
+        processes = options['processes']
+        lines = [
+            'QUALIDADE Integração - servidor de produção (waitress)',
+            f'  Endereço:     http://{self.host}:{self.port}',
+            f"  Processos:    {processes}" + (' (principal só supervisiona)' if processes > 1 else ''),
+            f"  Threads:      {options['threads']} por processo ({options['threads'] * processes} no total)",
+            f"  Conexões:     até {options['connection_limit']} abertas por processo; fila do listen: {options['backlog']}",
+            f"  Keep-alive:   conexões ociosas fecham após {options['channel_timeout']} s",
+            f"  Encerramento: até {options['shutdown_timeout']} s para as requisições em andamento",
+        ]
+        return '\n'.join(lines)
+
+    def serve_forever(self):
+        try:
+            if self.options['processes'] > 1:
+                self._supervise()
+            else:
+                self._worker = WorkerServer(self.app, self.socket, self.options)
+                if self._stop.is_set():
+                    self._worker.shutdown(wait=False)
+                self._worker.serve_forever()
+        finally:
+            self.socket.close()
+            self._stopped.set()
+
+    def _start_process(self, index: int):
+        reader, writer = self._ctx.Pipe(duplex=False)
+        process = self._ctx.Process(
+            target=_worker_main,
+            args=(self.socket, self.options, self.app_config, reader, index),
+            name=f'qualidade-server-{index}',
+        )
+        process.start()
+        reader.close()
+        return process, writer
+
+    def _supervise(self):
+        self._processes = [self._start_process(index) for index in range(1, self.options['processes'] + 1)]
+        while not self._stop.wait(1.0):
+            for position, (process, writer) in enumerate(self._processes):
+                if not process.is_alive() and not self._stop.is_set():
+                    log.warning('Processo %s do servidor terminou (código %s); reiniciando',
+                                process.name, process.exitcode)
+                    writer.close()
+                    self._processes[position] = self._start_process(position + 1)
+        for process, writer in self._processes:
+            try:
+                writer.send('stop')
+            except OSError:
+                pass
+            writer.close()
+        deadline = time.monotonic() + self.options['shutdown_timeout'] + 10
+        for process, _ in self._processes:
+            process.join(max(0.0, deadline - time.monotonic()))
+            if process.is_alive():
+                log.warning('Processo %s não terminou a tempo; finalizando', process.name)
+                process.terminate()
+                process.join(5)
+
+    def shutdown(self, wait: bool = True):
+        """Encerramento gracioso (pode ser chamado de outra thread ou de um handler de sinal)."""
+        self._stop.set()
+        if self._worker is not None:
+            self._worker.shutdown(wait=False)
+        if wait:
+            self._stopped.wait(self.options['shutdown_timeout'] + 20)
+
+
+def serve(app, host: str = '0.0.0.0', port: int = 5000, app_config: dict | None = None, **overrides):
+    """Sobe o servidor de produção em primeiro plano até Ctrl+C ou SIGTERM."""
+    server = ProductionServer(app, host=host, port=port, app_config=app_config, **overrides)
+    print(server.summary(), flush=True)
+
+    def stop(signum, frame):
+        log.info('Sinal %s recebido; encerrando o servidor', signum)
+        threading.Thread(target=server.shutdown, daemon=True).start()
+
+    signal.signal(signal.SIGINT, stop)
+    if hasattr(signal, 'SIGTERM'):
+        signal.signal(signal.SIGTERM, stop)
+    server.serve_forever()
+    print('Servidor encerrado.', flush=True)
@@ -0,0 +1,63 @@
+"""Perfil de conexão do SQLite: PRAGMAs aplicados a cada conexão nova do pool.
+
+Sem eles o banco roda com journal de rollback: enquanto um formulário grava,
+as leituras do painel e da tabela esperam o commit, e dois gravadores ao mesmo
+tempo podem falhar com "database is locked". O perfil padrão
+(``SQLITE_PRAGMAS`` em ``app/__init__.py``) usa:
+
+- ``busy_timeout``: quem encontra o banco ocupado espera a vez (ms) em vez de
+  falhar; vem primeiro para valer também na troca do ``journal_mode``;
+- ``journal_mode=WAL``: leitores não esperam gravadores (nem o contrário), só
+  gravadores entram em fila entre si;
+- ``synchronous=NORMAL``: seguro em WAL (uma queda de energia pode perder o
+  último commit, mas não corrompe o banco) e sem fsync a cada transação;
+- ``cache_size`` (negativo = KiB por conexão), ``mmap_size`` (bytes lidos por
+  memory-map) e ``temp_store=MEMORY`` (ordenações e tabelas temporárias).
+
+Em WAL o banco fica acompanhado de ``qualidade.db-wal`` e ``qualidade.db-shm``;
+para copiar o banco com o servidor parado basta o ``.db``, com ele rodando
+copie os três arquivos juntos.
+"""
+from sqlalchemy import event
+
+from . import db
+
+
+def apply_sqlite_pragmas(dbapi_connection, pragmas: dict):
+    """Executa ``PRAGMA nome=valor`` para cada item, na ordem, numa conexão sqlite3."""
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in pragmas.items():
+            if not str(name).isidentifier():
+                raise ValueError(f'PRAGMA inválido em SQLITE_PRAGMAS: {name!r}')
+            cursor.execute(f'PRAGMA {name}={value}')
+    finally:
+        cursor.close()
+
+
+def sqlite_pragma_values(dbapi_connection, names) -> dict:
+    """Valores efetivos dos PRAGMAs ``names`` numa conexão (para conferência)."""
+    cursor = dbapi_connection.cursor()
+    try:
+        values = {}
+        for name in names:
+            row = cursor.execute(f'PRAGMA {name}').fetchone()
+            values[name] = row[0] if row else None
+        return values
+    finally:
+        cursor.close()
+
+
+def init_sqlite_profile(app):
+    pragmas = dict(app.config.get('SQLITE_PRAGMAS') or {})
+    if not pragmas:
+        return
+    with app.app_context():
+        engines = list(db.engines.values())
+    for engine in engines:
+        if engine.dialect.name != 'sqlite':
+            continue
+        event.listen(
+            engine, 'connect',
+            lambda dbapi_connection, connection_record: apply_sqlite_pragmas(dbapi_connection, pragmas),
+        )
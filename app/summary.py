@@ -0,0 +1,150 @@
+"""Manutenção incremental da tabela ``resumo_diario``.
+
+Cada gravação em ``colaboradores`` aplica aqui o delta correspondente na mesma
+sessão (e, portanto, na mesma transação) do ``Colaborador``. O painel lê seus
+consolidados deste resumo, cujo tamanho cresce com o número de dias e não com o
+número de registros.
+"""
+import json
+from collections import Counter, defaultdict
+
+from sqlalchemy import delete, func, select, tuple_
+
+from . import db
+from .models import Colaborador, ResumoDiario
+
+
+SUMMARY_KEY_COLUMNS = ('data', 'turno', 'tipo', 'setor', 'supervisor')
+
+
+def summary_entry(col) -> tuple:
+    """Retorna (data, turno, tipo, setor, supervisor, matrícula) de um registro."""
+    return (col.data, col.turno, col.tipo, col.setor, col.supervisor, col.matricula)
+
+
+def _load_matriculas(raw) -> Counter:
+    try:
+        return Counter({int(k): int(v) for k, v in json.loads(raw or '{}').items()})
+    except (TypeError, ValueError):
+        return Counter()
+
+
+def _dump_matriculas(matriculas: Counter) -> str:
+    return json.dumps({str(k): v for k, v in sorted(matriculas.items()) if v > 0}, separators=(',', ':'))
+
+
+def apply_summary_delta(added=(), removed=()):
+    """Aplica no resumo os registros incluídos/removidos (sem commit).
+
+    ``added`` e ``removed`` são sequências de tuplas no formato de
+    ``summary_entry``. Uma edição é a remoção do estado antigo mais a inclusão
+    do novo.
+    """
+    deltas = defaultdict(Counter)
+    for sign, entries in ((1, added), (-1, removed)):
+        for entry in entries:
+            *key, matricula = entry
+            deltas[tuple(key)][matricula] += sign
+    if not deltas:
+        return
+
+    key_columns = [getattr(ResumoDiario, name) for name in SUMMARY_KEY_COLUMNS]
+    existing = {
+        (row.data, row.turno, row.tipo, row.setor, row.supervisor): row
+        for row in ResumoDiario.query.filter(tuple_(*key_columns).in_(list(deltas.keys()))).all()
+    }
+
+    for key, delta in deltas.items():
+        row = existing.get(key)
+        if row is None:
+            row = ResumoDiario(**dict(zip(SUMMARY_KEY_COLUMNS, key)), registros=0, matriculas='{}')
+            db.session.add(row)
+        matriculas = _load_matriculas(row.matriculas)
+        matriculas.update(delta)
+        registros = (row.registros or 0) + sum(delta.values())
+        if registros <= 0:
+            if row.id is not None:
+                db.session.delete(row)
+            else:
+                db.session.expunge(row)
+            continue
+        row.registros = registros
+        row.matriculas = _dump_matriculas(matriculas)
+
+
+def _live_summary() -> dict:
+    """Agrupa ``colaboradores`` no formato do resumo (chave -> Counter de matrículas)."""
+    stmt = (
+        select(
+            Colaborador.data,
+            Colaborador.turno,
+            Colaborador.tipo,
+            Colaborador.setor,
+            Colaborador.supervisor,
+            Colaborador.matricula,
+            func.count(Colaborador.id),
+        )
+        .group_by(
+            Colaborador.data,
+            Colaborador.turno,
+            Colaborador.tipo,
+            Colaborador.setor,
+            Colaborador.supervisor,
+            Colaborador.matricula,
+        )
+    )
+    live = defaultdict(Counter)
+    for data, turno, tipo, setor, supervisor, matricula, qtd in db.session.execute(stmt):
+        live[(data, turno, tipo, setor, supervisor)][matricula] += int(qtd)
+    return live
+
+
+def rebuild_summary() -> int:
+    """Recria o resumo do zero a partir de ``colaboradores`` (sem commit)."""
+    db.session.execute(delete(ResumoDiario))
+    live = _live_summary()
+    db.session.add_all([
+        ResumoDiario(
+            **dict(zip(SUMMARY_KEY_COLUMNS, key)),
+            registros=sum(matriculas.values()),
+            matriculas=_dump_matriculas(matriculas),
+        )
+        for key, matriculas in live.items()
+    ])
+    return len(live)
+
+
+def verify_summary() -> list[str]:
+    """Compara o resumo com os dados atuais e devolve as divergências encontradas."""
+    live = _live_summary()
+    stored = {}
+    for row in ResumoDiario.query.all():
+        key = (row.data, row.turno, row.tipo, row.setor, row.supervisor)
+        stored[key] = (row.registros, _load_matriculas(row.matriculas))
+
+    problems = []
+    for key in sorted(set(live) | set(stored), key=lambda k: tuple('' if v is None else str(v) for v in k)):
+        label = ' / '.join(str(v) for v in key)
+        expected = live.get(key)
+        found = stored.get(key)
+        if found is None:
+            problems.append(f'Chave ausente no resumo: {label}')
+        elif expected is None:
+            problems.append(f'Chave sem registros na origem: {label}')
+        elif found[0] != sum(expected.values()):
+            problems.append(f'Contagem divergente em {label}: resumo={found[0]} origem={sum(expected.values())}')
+        elif +found[1] != +expected:
+            problems.append(f'Matrículas divergentes em {label}')
+    return problems
+
+
+def ensure_summary():
+    """Popula o resumo na primeira execução (bancos criados antes da tabela existir)."""
+    try:
+        has_summary = db.session.query(ResumoDiario.id).first() is not None
+        has_rows = db.session.query(Colaborador.id).first() is not None
+        if has_rows and not has_summary:
+            rebuild_summary()
+            db.session.commit()
+    except Exception:
+        db.session.rollback()
@@ -0,0 +1,265 @@
+"""Filtro e ordenação das tabelas do painel como índices de linha em cache.
+
+As tabelas do Input*Dados (separação e merge HC) não são copiadas nem
+reordenadas a cada página: cada combinação de filtros e ordenação vira um
+array com as posições das linhas, guardado no ``query_cache`` pela chave da
+tabela (versão do conjunto de dados ou do merge com o banco). Mudar de página
+é só ``df.iloc[posicoes[inicio:fim]]``, e as exportações usam o mesmo array.
+
+O que depende só da tabela fica em ``index_cache`` (LRU sem TTL: a chave
+muda com a versão, e as tabelas recalculadas, como o merge HC, recebem uma
+chave nova a cada cálculo), montado uma vez por coluna na primeira vez que é
+usado:
+
+- a ordem da coluna (estável, nas duas direções); com filtros, ela só é
+  restrita às linhas que passaram. O tipo da chave de ordenação (número, data
+  ou texto) é escolhido olhando a coluna inteira;
+- o ``SubstringIndex`` da coluna: os valores distintos em minúsculas e sem
+  acento e um índice de trigramas sobre eles. O filtro é busca de trecho
+  literal ("joao" encontra "JOÃO"); cada letra digitada só cruza listas do
+  índice e confere os valores candidatos, sem percorrer a planilha;
+- o ``FacetIndex`` das colunas com poucos valores distintos (Situação HC,
+  Turno HC, Setor...): cada valor exibido, sua contagem e as linhas em que
+  aparece. Essas colunas viram listas de seleção com valor exato, resolvidas
+  juntando as linhas do valor, e as contagens de cada lista consideram os
+  demais filtros (como um segmentador de BI).
+"""
+import numpy as np
+import pandas as pd
+
+from .cache import TTLCache, query_cache
+from .normalization import strip_accents
+
+
+index_cache = TTLCache(maxsize=256, ttl=float('inf'))
+
+# Colunas com até tantos valores distintos (e no máximo metade das linhas) viram listas de seleção
+FACET_MAX_VALUES = 30
+FACET_EMPTY_LABEL = '(vazio)'
+
+_NO_IDS = np.empty(0, dtype=np.intp)
+
+
+def sort_key(series: pd.Series) -> pd.Series:
+    """Chave de ordenação: numérica se houver números, senão data, senão texto."""
+    numeric_series = pd.to_numeric(series, errors='coerce')
+    if numeric_series.notna().any():
+        return numeric_series
+    datetime_series = pd.to_datetime(series, errors='coerce')
+    if datetime_series.notna().any():
+        return datetime_series
+    return series.astype(str).str.lower()
+
+
+def fold_text(value) -> str:
+    """Texto comparado pelos filtros: minúsculo e sem acentos."""
+    return strip_accents(str(value).lower())
+
+
+def _trigrams(text: str) -> set:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _frozen(array: np.ndarray) -> np.ndarray:
+    # Os arrays ficam compartilhados no cache entre requisições
+    array.flags.writeable = False
+    return array
+
+
+class SubstringIndex:
+    """Índice de trigramas dos valores distintos de uma coluna.
+
+    ``codes[linha]`` aponta para ``values`` (texto de ``astype(str)`` já
+    dobrado por ``fold_text``); ``postings[trigrama]`` são os ids dos valores
+    que o contêm, em ordem crescente.
+    """
+
+    def __init__(self, series: pd.Series):
+        codes, uniques = pd.factorize(series.astype(str))
+        self.codes = _frozen(codes.astype(np.intp, copy=False))
+        self.values = [fold_text(value) for value in uniques]
+        postings = {}
+        for value_id, text in enumerate(self.values):
+            for gram in _trigrams(text):
+                postings.setdefault(gram, []).append(value_id)
+        self.postings = {gram: np.array(ids, dtype=np.intp) for gram, ids in postings.items()}
+
+    def matching_values(self, query: str) -> np.ndarray:
+        """Ids dos valores que contêm ``query`` (após ``fold_text``)."""
+        query = fold_text(query)
+        grams = _trigrams(query)
+        if not grams:
+            # Menos de três letras: confere todos os valores distintos
+            candidates = range(len(self.values))
+        else:
+            lists = sorted((self.postings.get(gram, _NO_IDS) for gram in grams), key=len)
+            candidates = lists[0]
+            for ids in lists[1:]:
+                if not len(candidates):
+                    break
+                candidates = np.intersect1d(candidates, ids, assume_unique=True)
+            if len(query) == 3:
+                return candidates
+        values = self.values
+        return np.array([i for i in candidates if query in values[i]], dtype=np.intp)
+
+    def mask(self, query: str) -> np.ndarray:
+        """Máscara por linha de ``query`` contido no valor."""
+        matched = np.zeros(len(self.values), dtype=bool)
+        matched[self.matching_values(query)] = True
+        return matched[self.codes]
+
+
+class FacetIndex:
+    """Valores de uma coluna como exibidos na tabela, com contagem e linhas de cada um.
+
+    ``labels`` são os textos de ``fillna('').astype(str)`` (vazio vira
+    ``FACET_EMPTY_LABEL``); ``rows[id]`` são as posições das linhas com o valor.
+    """
+
+    def __init__(self, series: pd.Series):
+        codes, uniques = pd.factorize(series.fillna('').astype(str))
+        self.codes = _frozen(codes.astype(np.intp, copy=False))
+        self.labels = [value if value != '' else FACET_EMPTY_LABEL for value in uniques]
+        self.ids = {label: value_id for value_id, label in enumerate(self.labels)}
+        self.counts = _frozen(np.bincount(self.codes, minlength=len(self.labels)))
+        order = np.argsort(self.codes, kind='stable')
+        self.rows = [_frozen(rows) for rows in np.split(order, np.cumsum(self.counts)[:-1])] if len(self.labels) else []
+
+    def mask(self, label: str) -> np.ndarray:
+        """Máscara por linha do valor ``label`` (nenhuma linha se ele não existir)."""
+        mask = np.zeros(len(self.codes), dtype=bool)
+        value_id = self.ids.get(label)
+        if value_id is not None:
+            mask[self.rows[value_id]] = True
+        return mask
+
+    def counts_for(self, mask: np.ndarray | None) -> np.ndarray:
+        """Contagem de cada valor entre as linhas de ``mask`` (todas se None)."""
+        if mask is None:
+            return self.counts
+        return np.bincount(self.codes[mask], minlength=len(self.labels))
+
+
+def column_index(table_key, df: pd.DataFrame, column) -> SubstringIndex:
+    return index_cache.get_or_set(('text_index', table_key, column), lambda: SubstringIndex(df[column]))
+
+
+def facet_index(table_key, df: pd.DataFrame, column) -> FacetIndex:
+    return index_cache.get_or_set(('facet_index', table_key, column), lambda: FacetIndex(df[column]))
+
+
+def facet_columns(table_key, df: pd.DataFrame) -> list:
+    """Colunas de ``df`` com poucos valores distintos, já com o ``FacetIndex`` montado."""
+    def compute():
+        limit = min(FACET_MAX_VALUES, len(df) // 2)
+        columns = []
+        for column in df.columns:
+            if df[column].nunique(dropna=False) <= limit:
+                facet_index(table_key, df, column)
+                columns.append(column)
+        return columns
+
+    return index_cache.get_or_set(('facet_columns', table_key), compute)
+
+
+def sort_permutation(table_key, df: pd.DataFrame, column, ascending: bool = True) -> np.ndarray:
+    """Posições das linhas de ``df`` na ordem de ``column`` (estável, vazios por último)."""
+    def compute():
+        key = sort_key(df[column]).reset_index(drop=True)
+        order = key.sort_values(ascending=ascending, na_position='last', kind='mergesort').index
+        return _frozen(order.to_numpy(dtype=np.intp))
+
+    return index_cache.get_or_set(('table_sort', table_key, column, bool(ascending)), compute)
+
+
+def filter_mask(table_key, df: pd.DataFrame, column, value: str) -> np.ndarray:
+    """Linhas em que ``column`` contém ``value`` (sem diferenciar maiúsculas e acentos)."""
+    return query_cache.get_or_set(
+        ('table_filter', table_key, column, value),
+        lambda: _frozen(column_index(table_key, df, column).mask(value)),
+    )
+
+
+def _selection_mask(table_key, df, filters, facets, skip=None) -> np.ndarray | None:
+    mask = None
+    for column, value in filters.items():
+        column_mask = filter_mask(table_key, df, column, value)
+        mask = column_mask if mask is None else mask & column_mask
+    for column, label in facets.items():
+        if column == skip:
+            continue
+        column_mask = facet_index(table_key, df, column).mask(label)
+        mask = column_mask if mask is None else mask & column_mask
+    return mask
+
+
+def filters_key(filters: dict | None) -> tuple:
+    """Forma canônica (e hasheável) de ``{coluna: texto}`` para chaves de cache."""
+    return tuple(sorted((str(column), value) for column, value in (filters or {}).items()))
+
+
+def row_positions(table_key, df: pd.DataFrame, filters: dict | None = None,
+                  sort_column=None, ascending: bool = True, facets: dict | None = None) -> np.ndarray:
+    """Posições (para ``df.iloc``) das linhas que passam em todos os filtros, já ordenadas.
+
+    ``filters`` é ``{coluna: texto}`` (trecho) e ``facets`` é ``{coluna: valor}``
+    (valor exato, como em ``FacetIndex.labels``); ``sort_column`` fora de
+    ``df`` é ignorada.
+    """
+    filters = filters or {}
+    facets = facets or {}
+    if sort_column is not None and sort_column not in df.columns:
+        sort_column = None
+    cache_key = (
+        'table_rows', table_key,
+        filters_key(filters), filters_key(facets),
+        sort_column, bool(ascending) if sort_column is not None else None,
+    )
+
+    def compute():
+        mask = _selection_mask(table_key, df, filters, facets)
+        if sort_column is not None and len(df):
+            order = sort_permutation(table_key, df, sort_column, ascending)
+            if mask is not None:
+                order = order[mask[order]]
+            return _frozen(np.array(order, dtype=np.intp))
+        if mask is not None:
+            return _frozen(np.flatnonzero(mask).astype(np.intp))
+        return _frozen(np.arange(len(df), dtype=np.intp))
+
+    return query_cache.get_or_set(cache_key, compute)
+
+
+def facet_options(table_key, df: pd.DataFrame, columns, filters: dict | None = None,
+                  facets: dict | None = None) -> dict:
+    """``{coluna: [{'value', 'count', 'selected'}]}`` para as listas de seleção.
+
+    A contagem de cada coluna considera todos os filtros menos o da própria
+    coluna; os valores vêm em ordem alfabética (vazio por último).
+    """
+    filters = filters or {}
+    facets = facets or {}
+
+    def compute():
+        options = {}
+        for column in columns:
+            index = facet_index(table_key, df, column)
+            counts = index.counts_for(_selection_mask(table_key, df, filters, facets, skip=column))
+            selected = facets.get(column)
+            items = [
+                {'value': label, 'count': int(counts[value_id]), 'selected': label == selected}
+                for value_id, label in enumerate(index.labels)
+            ]
+            items.sort(key=lambda item: (item['value'] == FACET_EMPTY_LABEL, fold_text(item['value'])))
+            options[column] = items
+        return options
+
+    return query_cache.get_or_set(
+        ('facet_options', table_key, tuple(columns), filters_key(filters), filters_key(facets)),
+        compute,
+    )
+
+
+def init_table_index(app):
+    index_cache.configure(maxsize=app.config.get('TABLE_INDEX_CACHE_SIZE', 256))
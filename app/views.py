@@ -1,145 +1,69 @@
-import importlib
 import math
 import re
+import time
 import unicodedata
 import pandas as pd
 import numpy as np
-from io import BytesIO
 from pathlib import Path
 from datetime import datetime, timedelta
 
-from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify, send_file, current_app
-from sqlalchemy import and_, func, select
+from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify, current_app, make_response
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.orm.exc import StaleDataError
 from . import db
 from .models import ConfigList, Colaborador
+from .aggregations import load_dimension_catalog, summary_dashboard_aggregates
+from .summary import apply_summary_delta, summary_entry
+from .datasets import dataset_store
+from .ingest import (
+    ALLOWED_EXTENSIONS,
+    HC_SHEET,
+    RASTREABILIDADE_COLUMNS,
+    MissingColumnsError,
+    detect_kind,
+)
+from .derived import (
+    build_hc_panel,
+    empty_turno_charts,
+    get_execucao_lookup,
+    get_input_column_definitions,
+    get_input_view,
+    input_charts,
+    rebuild_derived_views,
+)
+from .normalization import normalize_matricula_series
+from .jobs import ingest_jobs
+from .cache import bump_data_version, cache_stats, get_data_version, query_cache
+from .search import text_filter
+from .table_index import facet_columns, facet_options, filters_key, row_positions
+from .bulk_import import (
+    IMPORT_COLUMNS,
+    ImportFileError,
+    insert_colaboradores,
+    load_lists,
+    read_import_file,
+    template_rows,
+    validate_rows,
+)
+from .batch import BatchConflict, BatchError, apply_batch, parse_batch
+from .exports import (
+    EXPORT_FORMATS,
+    dataframe_export_response,
+    iter_csv,
+    iter_parquet,
+    iter_xlsx,
+    normalize_export_format,
+    require_pyarrow,
+    row_batches,
+    streaming_download,
+)
 
 bp = Blueprint('main', __name__)
 
 
-last_planilha = None
-last_planilha_hc = None
-
-
 # Helpers
 
 
-def normalize_matricula(value):
-    if value is None:
-        return None
-    try:
-        text = str(value).strip()
-        if not text:
-            return None
-        lowered = text.lower()
-        if lowered in {'nan', 'none', 'null'}:
-            return None
-        numeric = int(float(text))
-        if numeric <= 0:
-            return None
-        return numeric
-    except (ValueError, TypeError):
-        return None
-
-
-def normalize_situacao_hc(value):
-    """Normaliza os rótulos da coluna "Situação HC" para uso consistente no painel."""
-    temporario_label = 'Tempórario'
-    if value is None:
-        return temporario_label
-
-    try:
-        text = str(value).strip()
-    except Exception:
-        return temporario_label
-
-    if not text:
-        return temporario_label
-
-    lowered = text.lower()
-    if lowered in {'nan', 'none', 'null'}:
-        return temporario_label
-
-    normalized = unicodedata.normalize('NFKD', text).encode('ASCII', 'ignore').decode('ASCII')
-    normalized = normalized.replace('\\', '/').upper()
-    normalized = re.sub(r'\s+', ' ', normalized).strip()
-
-    if not normalized:
-        return temporario_label
-
-    if normalized in {'N/D', 'ND', 'N A', 'N/A'}:
-        return temporario_label
-
-    if normalized in {'SEM INFORMACAO', 'SEM INFORMACOES', 'SEM NADA', 'SEM DADO', 'SEM DADOS', 'SEM REGISTRO'}:
-        return temporario_label
-
-    if normalized == 'ATIVIDADE NORMAL':
-        return 'Ativo'
-
-    if normalized.startswith('AFASTAMENTO'):
-        return 'Afastado'
-
-    if normalized.startswith('FERIAS'):
-        return 'Férias'
-
-    if normalized.startswith('RESCISAO'):
-        return 'Rescisão'
-
-    return text
-
-
-def build_execucao_por_voz_lookup(df: pd.DataFrame | None):
-    """Constrói uma tabela auxiliar com "Execução por Voz" indexada por Matrícula."""
-    if df is None:
-        return None
-
-    required_columns = {'Funcionário', 'Execução por Voz'}
-    if not required_columns.issubset(df.columns):
-        return None
-
-    lookup = df[['Funcionário', 'Execução por Voz']].copy()
-    lookup['Funcionário'] = lookup['Funcionário'].apply(normalize_matricula)
-    lookup = lookup[lookup['Funcionário'].notna()].copy()
-    if lookup.empty:
-        return None
-
-    try:
-        lookup['Funcionário'] = lookup['Funcionário'].astype(int)
-    except Exception:
-        pass
-
-    def normalize_execucao(value):
-        if pd.isna(value):
-            return ''
-        text = str(value).strip()
-        lowered = text.lower()
-        if lowered in {'', 'nan', 'none', 'null'}:
-            return ''
-        return text
-
-    lookup['Execução por Voz'] = lookup['Execução por Voz'].apply(normalize_execucao)
-    lookup['__priority'] = lookup['Execução por Voz'].eq('').astype(int)
-    lookup = (
-        lookup
-        .sort_values(['Funcionário', '__priority', 'Execução por Voz'])
-        .drop_duplicates(subset=['Funcionário'], keep='first')
-        .drop(columns='__priority')
-    )
-
-    return lookup.rename(columns={'Funcionário': 'Matrícula'})
-
-
-def get_input_column_definitions():
-    return [
-        {"name": "Do Endereço", "param": "do_endereco", "icon": "geo-alt", "placeholder": "Endereço"},
-        {"name": "Funcionário", "param": "funcionario", "icon": "hash", "placeholder": "Funcionário"},
-        {"name": "Nome", "param": "nome", "icon": "person", "placeholder": "Nome"},
-        {"name": "Data", "param": "data", "icon": "calendar-event", "placeholder": "Data"},
-        {"name": "Execução por Voz", "param": "execucao", "icon": "mic", "placeholder": "Execução"},
-        {"name": "Treinado", "param": "treinado", "icon": "mortarboard", "placeholder": "Treinado"},
-        {"name": "Turno HC", "param": "turno_hc", "icon": "clock-history", "placeholder": "Turno"},
-    ]
-
-
 def slugify_column(label):
     if label is None:
         return ''
@@ -150,74 +74,10 @@ def slugify_column(label):
     return slug or 'col'
 
 
-def sort_dataframe(df, column, ascending=True):
-    if column not in df.columns or df.empty:
-        return df
-    series = df[column]
-    numeric_series = pd.to_numeric(series, errors='coerce')
-    if numeric_series.notna().any():
-        sort_key = numeric_series
-    else:
-        datetime_series = pd.to_datetime(series, errors='coerce')
-        if datetime_series.notna().any():
-            sort_key = datetime_series
-        else:
-            sort_key = series.astype(str).str.lower()
-    sorted_df = df.assign(__sort_key=sort_key)
-    sorted_df = sorted_df.sort_values('__sort_key', ascending=ascending, na_position='last', kind='mergesort')
-    return sorted_df.drop(columns='__sort_key')
+class MergeDataError(ValueError):
+    """Falha ao preparar ou mesclar a planilha de rastreabilidade; a mensagem vai para o usuário."""
 
 
-def dataframe_to_excel_response(df: pd.DataFrame, *, filename_prefix: str, sheet_name: str):
-    if df is None:
-        df = pd.DataFrame()
-    df = df.copy()
-    try:
-        from openpyxl.styles import Alignment, Font, PatternFill
-        from openpyxl.utils import get_column_letter
-    except ImportError as exc:
-        raise RuntimeError('Dependência openpyxl não encontrada. Instale com: pip install openpyxl') from exc
-
-    buffer = BytesIO()
-    with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
-        df.to_excel(writer, sheet_name=sheet_name, index=False)
-        workbook = writer.book
-        worksheet = writer.sheets[sheet_name]
-
-        header_font = Font(bold=True, color='FFFFFFFF')
-        header_fill = PatternFill(start_color='FF0D6EFD', end_color='FF0D6EFD', fill_type='solid')
-        header_alignment = Alignment(horizontal='center', vertical='center')
-        for cell in next(worksheet.iter_rows(min_row=1, max_row=1)):
-            cell.font = header_font
-            cell.fill = header_fill
-            cell.alignment = header_alignment
-
-        worksheet.freeze_panes = 'A2'
-
-        for idx, column in enumerate(df.columns, start=1):
-            try:
-                series = df[column].astype(str)
-                max_length = series.map(len).max()
-            except Exception:
-                max_length = None
-            header_length = len(str(column))
-            if max_length is None or pd.isna(max_length):
-                max_length = 0
-            width = min(max(header_length, max_length) + 2, 60)
-            worksheet.column_dimensions[get_column_letter(idx)].width = width
-
-        worksheet.auto_filter.ref = worksheet.dimensions
-
-    buffer.seek(0)
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    filename = f"{filename_prefix}_{timestamp}.xlsx"
-    return send_file(
-        buffer,
-        as_attachment=True,
-        download_name=filename,
-        mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-    )
-
 def manipular_dados(df):
     """Prepara o DF da planilha e faz merge com o banco (apenas tipo TALKMAN) por Matrícula.
 
@@ -225,6 +85,9 @@ def manipular_dados(df):
     - Deduplica por "Matrícula" na planilha.
     - Busca do SQLite (tabela Colaborador) apenas registros com tipo == 'TALKMAN'.
     - Faz merge inner em "Matrícula" e retorna o DF resultante.
+
+    Roda também na thread dos jobs de importação (sem requisição): em caso de
+    falha levanta ``MergeDataError`` com a mensagem, em vez de usar ``flash``.
     """
     import pandas as pd
     from sqlalchemy import select
@@ -239,8 +102,7 @@ def manipular_dados(df):
         database = database.drop_duplicates(subset=["Funcionário"]).reset_index(drop=True)
     except Exception as e:
         current_app.logger.exception("Falha preparando DataFrame para merge: %s", e)
-        flash(f'Falha preparando planilha para merge: {e}', 'danger')
-        return None
+        raise MergeDataError(f'Falha preparando planilha para merge: {e}') from e
 
     try:
         bind = db.session.get_bind()
@@ -258,8 +120,7 @@ def manipular_dados(df):
         df_db = pd.read_sql(stmt, bind)
     except Exception as e:
         current_app.logger.exception("Falha ao ler dados do banco para merge: %s", e)
-        flash(f'Falha ao carregar dados do banco: {e}', 'danger')
-        return None
+        raise MergeDataError(f'Falha ao carregar dados do banco: {e}') from e
 
     try:
         merged = pd.merge(database, df_db, left_on="Funcionário", right_on="Matrícula", how="left")
@@ -267,14 +128,124 @@ def manipular_dados(df):
 
     except Exception as e:
         current_app.logger.exception("Falha no merge dos dados: %s", e)
-        flash(f'Falha ao mesclar dados: {e}', 'danger')
-        return None
+        raise MergeDataError(f'Falha ao mesclar dados: {e}') from e
 
     current_app.logger.info("Merge TALKMAN concluído: %s linhas x %s colunas", merged.shape[0], merged.shape[1])
     return merged, database, df_db
 
 
 
+def build_tabela_query(min_date=None, max_date=None, q_nome='', q_supervisor='', q_matricula=None):
+    """Consulta de /tabela e /tabela/export com os filtros já validados."""
+    q = Colaborador.query
+    if min_date:
+        q = q.filter(Colaborador.data >= min_date)
+    if max_date:
+        q = q.filter(Colaborador.data <= max_date)
+    # Nome/supervisor via índice FTS5 (prefixo, sem acentos); ilike se indisponível
+    text_condition = text_filter({'nome': q_nome, 'supervisor': q_supervisor})
+    if text_condition is not None:
+        q = q.filter(text_condition)
+    if q_matricula is not None:
+        q = q.filter(Colaborador.matricula == q_matricula)
+    return q.order_by(Colaborador.data.desc(), Colaborador.created_at.desc(), Colaborador.id.desc())
+
+
+TABELA_CURSOR_SEP = '|'
+
+
+def encode_tabela_cursor(row) -> str:
+    """Cursor (data, created_at, id) de uma linha da tabela, usado na paginação por chave."""
+    created = row.created_at.isoformat() if row.created_at else ''
+    return TABELA_CURSOR_SEP.join([row.data.isoformat(), created, str(row.id)])
+
+
+def decode_tabela_cursor(raw):
+    if not raw:
+        return None
+    try:
+        data_raw, created_raw, id_raw = raw.split(TABELA_CURSOR_SEP)
+        data = datetime.strptime(data_raw, '%Y-%m-%d').date()
+        created = datetime.fromisoformat(created_raw) if created_raw else None
+        return data, created, int(id_raw)
+    except ValueError:
+        return None
+
+
+def seek_tabela_query(q, cursor, backwards=False):
+    """Aplica a busca por chave a partir de ``cursor`` na ordem (data, created_at, id) DESC.
+
+    ``backwards=True`` devolve as linhas anteriores ao cursor, em ordem crescente
+    (o chamador inverte). NULL em created_at vem por último na ordem decrescente,
+    como no SQLite.
+    """
+    data, created, item_id = cursor
+    same_day = Colaborador.data == data
+    if not backwards:
+        if created is None:
+            after_in_day = and_(Colaborador.created_at.is_(None), Colaborador.id < item_id)
+        else:
+            after_in_day = or_(
+                Colaborador.created_at < created,
+                Colaborador.created_at.is_(None),
+                and_(Colaborador.created_at == created, Colaborador.id < item_id),
+            )
+        return q.filter(Colaborador.data <= data, or_(Colaborador.data < data, and_(same_day, after_in_day)))
+
+    if created is None:
+        before_in_day = or_(
+            Colaborador.created_at.isnot(None),
+            and_(Colaborador.created_at.is_(None), Colaborador.id > item_id),
+        )
+    else:
+        before_in_day = or_(
+            Colaborador.created_at > created,
+            and_(Colaborador.created_at == created, Colaborador.id > item_id),
+        )
+    return (
+        q.filter(Colaborador.data >= data, or_(Colaborador.data > data, and_(same_day, before_in_day)))
+        .order_by(None)
+        .order_by(Colaborador.data.asc(), Colaborador.created_at.asc(), Colaborador.id.asc())
+    )
+
+
+def hc_database_statement(talkman_only=True):
+    """Colunas do banco usadas no merge com a planilha HC."""
+    stmt = select(
+        Colaborador.matricula.label("Matrícula"),
+        Colaborador.nome.label("Nome"),
+        Colaborador.tipo.label("Tipo"),
+        Colaborador.setor.label("Setor"),
+        Colaborador.area.label("Área"),
+        Colaborador.turno.label("Turno"),
+        Colaborador.supervisor.label("Supervisor"),
+        Colaborador.integracao.label("Integração"),
+        Colaborador.data.label("Data"),
+    )
+    if talkman_only:
+        stmt = stmt.where(Colaborador.tipo == 'TALKMAN')
+    return stmt
+
+
+def hc_panel_table():
+    """``(chave, merged_hc, resumo, gráfico)`` da tabela HC do painel, em cache; None sem planilha HC."""
+    hc_entry, source_hc = dataset_store.load('hc')
+    if source_hc is None:
+        return None
+    execucao_lookup = get_execucao_lookup()
+
+    # Depende do banco: recalculado quando os dados ou as planilhas mudam
+    hc_panel_key = ('painel_hc', get_data_version(), hc_entry['version'], dataset_store.version('execucao_lookup'))
+
+    def load_hc_panel():
+        df_db = pd.read_sql(hc_database_statement(), db.session.get_bind())
+        # Cada merge calculado tem a própria chave de tabela: se ele for refeito sob a mesma
+        # chave do cache (TTL), os índices de ordem e filtro do anterior não são reaproveitados
+        return (hc_panel_key + (time.time_ns(),),) + build_hc_panel(df_db, source_hc, execucao_lookup)
+
+    return query_cache.get_or_set(hc_panel_key, load_hc_panel)
+
+
 def get_list(nome: str) -> list[str]:
     rows = ConfigList.query.filter_by(nome_lista=nome).order_by(ConfigList.valor.asc()).all()
     return [r.valor for r in rows]
@@ -285,9 +256,8 @@ def home():
     return redirect(url_for('main.alimentacao'))
 
 
-@bp.route('/alimentacao', methods=['GET', 'POST'])
-def alimentacao():
-    lists = {
+def alimentacao_lists() -> dict:
+    return {
         'tipo': get_list('tipo'),
         'setor': get_list('setor'),
         'area': get_list('area'),
@@ -295,6 +265,11 @@ def alimentacao():
         'integracao': get_list('integracao'),
     }
 
+
+@bp.route('/alimentacao', methods=['GET', 'POST'])
+def alimentacao():
+    lists = alimentacao_lists()
+
     if request.method == 'POST':
         try:
             matricula = int(request.form.get('matricula', '').strip())
@@ -351,13 +326,87 @@ def alimentacao():
             observacao=observacao or None,
         )
         db.session.add(col)
+        apply_summary_delta(added=[summary_entry(col)])
         db.session.commit()
+        bump_data_version()
         flash('Registro salvo com sucesso.', 'success')
         return redirect(url_for('main.alimentacao'))
 
     return render_template('alimentacao.html', lists=lists)
 
 
+# Linhas com erro listadas na página após uma importação (o total aparece sempre)
+IMPORT_MAX_ERRORS_SHOWN = 200
+
+
+@bp.route('/alimentacao/importar', methods=['POST'])
+def importar_colaboradores():
+    """Importa colaboradores de uma planilha (.xlsx) ou CSV, em uma única transação."""
+    arquivo = request.files.get('arquivo')
+    if arquivo is None or not arquivo.filename:
+        flash('Selecione um arquivo .xlsx ou .csv para importar.', 'warning')
+        return redirect(url_for('main.alimentacao'))
+
+    try:
+        df = read_import_file(arquivo)
+    except ImportFileError as err:
+        flash(str(err), 'danger')
+        return redirect(url_for('main.alimentacao'))
+    except Exception as err:
+        current_app.logger.exception('Falha ao ler o arquivo de importação %s: %s', arquivo.filename, err)
+        flash(f'Falha ao ler o arquivo: {err}', 'danger')
+        return redirect(url_for('main.alimentacao'))
+
+    records, errors = validate_rows(df, load_lists())
+    parcial = request.form.get('parcial') == '1'
+    result = {
+        'arquivo': arquivo.filename,
+        'linhas': len(records) + len(errors),
+        'inseridos': 0,
+        'erros': errors[:IMPORT_MAX_ERRORS_SHOWN],
+        'erros_total': len(errors),
+        'parcial': parcial,
+    }
+
+    if errors and not parcial:
+        flash(f'Nenhum registro importado: {len(errors)} linha(s) com erro. Corrija o arquivo ou marque '
+              f'"Importar só as linhas válidas".', 'warning')
+    elif not records:
+        flash('Nenhuma linha válida para importar.', 'warning')
+    else:
+        try:
+            db_seconds = insert_colaboradores(records)
+            started = time.perf_counter()
+            db.session.commit()
+            db_seconds += time.perf_counter() - started
+        except Exception as err:
+            db.session.rollback()
+            current_app.logger.exception('Falha ao gravar a importação de %s: %s', arquivo.filename, err)
+            flash(f'Falha ao gravar a importação (nada foi gravado): {err}', 'danger')
+        else:
+            bump_data_version()
+            result['inseridos'] = len(records)
+            current_app.logger.info('Importação de %s: %d registro(s) em %.0f ms de banco, %d linha(s) com erro',
+                                    arquivo.filename, len(records), db_seconds * 1000, len(errors))
+            message = f'{len(records)} registro(s) importado(s) de {arquivo.filename}.'
+            if errors:
+                message += f' {len(errors)} linha(s) com erro ignorada(s).'
+            flash(message, 'success')
+
+    return render_template('alimentacao.html', lists=alimentacao_lists(), import_result=result)
+
+
+@bp.route('/alimentacao/importar/modelo')
+def importar_colaboradores_modelo():
+    """CSV com o cabeçalho aceito pela importação e uma linha de exemplo."""
+    headers = [header for header, _, _ in IMPORT_COLUMNS]
+    return streaming_download(
+        iter_csv(headers, template_rows(load_lists())),
+        filename='modelo_importacao_colaboradores.csv',
+        mimetype='text/csv',
+    )
+
+
 @bp.route('/tabela')
 def tabela():
     # Período padrão: últimos 30 dias incluindo hoje
@@ -371,29 +420,22 @@ def tabela():
     q_supervisor = (request.args.get('q_supervisor') or '').strip()
     q_matricula_raw = (request.args.get('q_matricula') or '').strip()
 
-    q = Colaborador.query
+    min_date = max_date = q_matricula = None
     if min_date_str:
         try:
             min_date = datetime.strptime(min_date_str, '%Y-%m-%d').date()
-            q = q.filter(Colaborador.data >= min_date)
         except ValueError:
             flash('Data mínima inválida.', 'warning')
     if max_date_str:
         try:
             max_date = datetime.strptime(max_date_str, '%Y-%m-%d').date()
-            q = q.filter(Colaborador.data <= max_date)
         except ValueError:
             flash('Data máxima inválida.', 'warning')
 
     # Filtros de texto
-    if q_nome:
-        q = q.filter(Colaborador.nome.ilike(f"%{q_nome}%"))
-    if q_supervisor:
-        q = q.filter(Colaborador.supervisor.ilike(f"%{q_supervisor}%"))
     if q_matricula_raw:
         try:
             q_matricula = int(q_matricula_raw)
-            q = q.filter(Colaborador.matricula == q_matricula)
         except ValueError:
             flash('Matrícula para filtro deve ser numérica.', 'warning')
 
@@ -402,21 +444,89 @@ def tabela():
     # Limita per_page entre 5 e 100
     per_page = request.args.get('per_page', default=25, type=int) or 25
     per_page = max(5, min(per_page, 100))
-    q = q.order_by(Colaborador.data.desc(), Colaborador.created_at.desc())
-    pagination = db.paginate(q, page=page, per_page=per_page, error_out=False)
+    q = build_tabela_query(min_date, max_date, q_nome, q_supervisor, q_matricula)
+
+    # Total do filtro em cache (invalidado a cada gravação), não recontado a cada página
+    total_key = ('tabela_total', get_data_version(), min_date, max_date, q_nome, q_supervisor, q_matricula)
+    total = query_cache.get_or_set(
+        total_key,
+        lambda: q.order_by(None).with_entities(func.count(Colaborador.id)).scalar() or 0,
+    )
+    total_pages = max(1, math.ceil(total / per_page))
+    page = min(page, total_pages)
+
+    # Navegação anterior/próxima por chave (after/before); saltos numerados usam OFFSET
+    after_raw = request.args.get('after') or ''
+    before_raw = request.args.get('before') or ''
+    after = decode_tabela_cursor(after_raw)
+    before = decode_tabela_cursor(before_raw) if after is None else None
+    rows = []
+    if after is not None:
+        rows = seek_tabela_query(q, after).limit(per_page + 1).all()
+        has_next = len(rows) > per_page
+        rows = rows[:per_page]
+        has_prev = True
+    elif before is not None:
+        rows = seek_tabela_query(q, before, backwards=True).limit(per_page + 1).all()
+        has_prev = len(rows) > per_page
+        rows = list(reversed(rows[:per_page]))
+        has_next = True
+        if not has_prev:
+            page = 1
+    if not rows:
+        after_raw = before_raw = ''
+        # Busca apenas os ids da página (índice de período) e depois as linhas
+        page_ids = (
+            q.with_entities(Colaborador.id)
+            .offset((page - 1) * per_page)
+            .limit(per_page + 1)
+            .all()
+        )
+        has_next = len(page_ids) > per_page
+        page_ids = [item_id for (item_id,) in page_ids[:per_page]]
+        rows = q.filter(Colaborador.id.in_(page_ids)).all() if page_ids else []
+        has_prev = page > 1
+
+    filter_args = {k: v for k, v in {
+        'min_data': min_date_str,
+        'max_data': max_date_str,
+        'q_nome': q_nome,
+        'q_matricula': q_matricula_raw,
+        'q_supervisor': q_supervisor,
+        'per_page': per_page,
+    }.items() if v}
+    # Argumentos que reabrem exatamente esta página (edição/exclusão voltam para cá)
+    page_args = {**filter_args, 'page': page}
+    if after_raw:
+        page_args['after'] = after_raw
+    elif before_raw:
+        page_args['before'] = before_raw
 
     # Janela de páginas para paginação (evita usar max/min em Jinja)
-    try:
-        total_pages = int(pagination.pages or 1)
-    except Exception:
-        total_pages = 1
     window = 2
     start_page = max(1, page - window)
     end_page = min(total_pages, page + window)
 
+    pagination = {
+        'pages': total_pages,
+        'total': total,
+        'has_prev': has_prev and bool(rows),
+        'has_next': has_next and bool(rows),
+        'prev_url': url_for(
+            'main.tabela', **filter_args, page=max(1, page - 1), before=encode_tabela_cursor(rows[0])
+        ) if has_prev and rows else None,
+        'next_url': url_for(
+            'main.tabela', **filter_args, page=page + 1, after=encode_tabela_cursor(rows[-1])
+        ) if has_next and rows else None,
+        'page_links': [
+            {'page': p, 'url': url_for('main.tabela', **filter_args, page=p), 'active': p == page}
+            for p in range(start_page, end_page + 1)
+        ],
+    }
+
     return render_template(
         'tabela.html',
-        rows=pagination.items,
+        rows=rows,
         min_data=min_date_str,
         max_data=max_date_str,
         q_nome=q_nome,
@@ -425,8 +535,10 @@ def tabela():
         pagination=pagination,
         page=page,
         per_page=per_page,
+        page_args=page_args,
         start_page=start_page,
         end_page=end_page,
+        batch_lists=alimentacao_lists(),
     )
 
 
@@ -455,6 +567,8 @@ def editar_colaborador(item_id: int):
         'q_supervisor': request.args.get('q_supervisor'),
         'page': request.args.get('page', type=int),
         'per_page': request.args.get('per_page', type=int),
+        'after': request.args.get('after'),
+        'before': request.args.get('before'),
     }
     filters = {k: v for k, v in filters_raw.items() if v not in (None, '')}
     return_url = url_for('main.tabela', **filters) if filters else url_for('main.tabela')
@@ -511,6 +625,13 @@ def editar_colaborador(item_id: int):
                 return_url=return_url,
             )
 
+        versao = request.form.get('versao', type=int)
+        if versao is not None and versao != col.versao:
+            flash('Este registro foi alterado por outra pessoa enquanto você editava. '
+                  'Os dados atuais foram recarregados; refaça a alteração.', 'warning')
+            return redirect(form_action)
+
+        previous_entry = summary_entry(col)
         if matricula is not None:
             col.matricula = matricula
         col.nome = nome
@@ -524,7 +645,14 @@ def editar_colaborador(item_id: int):
             col.data = data
         col.observacao = observacao or None
 
-        db.session.commit()
+        apply_summary_delta(added=[summary_entry(col)], removed=[previous_entry])
+        try:
+            db.session.commit()
+        except StaleDataError:
+            db.session.rollback()
+            flash('Este registro foi alterado ou excluído por outra pessoa; nada foi gravado.', 'warning')
+            return redirect(return_url)
+        bump_data_version()
         flash('Registro atualizado com sucesso.', 'success')
         return redirect(return_url)
 
@@ -539,6 +667,7 @@ def editar_colaborador(item_id: int):
         'integracao': col.integracao,
         'data': col.data.strftime('%Y-%m-%d') if col.data else '',
         'observacao': col.observacao or '',
+        'versao': col.versao,
     }
 
     return render_template(
@@ -557,9 +686,16 @@ def editar_colaborador(item_id: int):
 @bp.route('/excluir/<int:item_id>', methods=['POST'])
 def excluir(item_id: int):
     item = Colaborador.query.get_or_404(item_id)
+    apply_summary_delta(removed=[summary_entry(item)])
     db.session.delete(item)
-    db.session.commit()
-    flash('Registro excluído com sucesso.', 'success')
+    try:
+        db.session.commit()
+    except StaleDataError:
+        db.session.rollback()
+        flash('Este registro foi alterado ou excluído por outra pessoa; nada foi excluído.', 'warning')
+    else:
+        bump_data_version()
+        flash('Registro excluído com sucesso.', 'success')
 
     # Preserva filtros/paginação vindos por query string
     min_data = request.args.get('min_data')
@@ -569,6 +705,8 @@ def excluir(item_id: int):
     q_supervisor = request.args.get('q_supervisor')
     page = request.args.get('page', type=int)
     per_page = request.args.get('per_page', type=int)
+    after = request.args.get('after')
+    before = request.args.get('before')
     args = {k: v for k, v in {
         'min_data': min_data,
         'max_data': max_data,
@@ -577,22 +715,15 @@ def excluir(item_id: int):
         'q_supervisor': q_supervisor,
         'page': page,
         'per_page': per_page,
+        'after': after,
+        'before': before,
     }.items() if v}
     return redirect(url_for('main.tabela', **args))
 
 
 @bp.route('/tabela/export')
 def tabela_export():
-    """Exporta os dados filtrados para XLSX."""
-    from io import BytesIO
-    try:
-        import openpyxl
-        from openpyxl.utils import get_column_letter
-    except Exception:
-        return jsonify({
-            'error': 'Dependência openpyxl não encontrada. Instale com: pip install openpyxl'
-        }), 500
-
+    """Exporta os dados filtrados para XLSX (gerado e enviado em streaming)."""
     # Período padrão: últimos 30 dias incluindo hoje
     today = datetime.today().date()
     default_min = (today - timedelta(days=29)).strftime('%Y-%m-%d')
@@ -604,69 +735,82 @@ def tabela_export():
     q_supervisor = (request.args.get('q_supervisor') or '').strip()
     q_matricula_raw = (request.args.get('q_matricula') or '').strip()
 
-    q = Colaborador.query
+    min_date = max_date = q_matricula = None
     if min_date_str:
         try:
             min_date = datetime.strptime(min_date_str, '%Y-%m-%d').date()
-            q = q.filter(Colaborador.data >= min_date)
         except ValueError:
             pass
     if max_date_str:
         try:
             max_date = datetime.strptime(max_date_str, '%Y-%m-%d').date()
-            q = q.filter(Colaborador.data <= max_date)
         except ValueError:
             pass
 
-    if q_nome:
-        q = q.filter(Colaborador.nome.ilike(f"%{q_nome}%"))
-    if q_supervisor:
-        q = q.filter(Colaborador.supervisor.ilike(f"%{q_supervisor}%"))
     if q_matricula_raw:
         try:
             q_matricula = int(q_matricula_raw)
-            q = q.filter(Colaborador.matricula == q_matricula)
         except ValueError:
             pass
 
-    q = q.order_by(Colaborador.data.desc(), Colaborador.created_at.desc())
-    rows = q.all()
+    q = build_tabela_query(min_date, max_date, q_nome, q_supervisor, q_matricula).with_entities(
+        Colaborador.data,
+        Colaborador.matricula,
+        Colaborador.nome,
+        Colaborador.tipo,
+        Colaborador.setor,
+        Colaborador.area,
+        Colaborador.turno,
+        Colaborador.supervisor,
+        Colaborador.integracao,
+        Colaborador.observacao,
+    )
 
-    wb = openpyxl.Workbook()
-    ws = wb.active
-    ws.title = 'Dados'
     headers = [
         'Data', 'Matrícula', 'Nome', 'Tipo', 'Setor', 'Área', 'Turno', 'Supervisor', 'Integração', 'Observação'
     ]
-    ws.append(headers)
-    for r in rows:
-        ws.append([
-            r.data.strftime('%Y-%m-%d') if r.data else '',
-            r.matricula,
-            r.nome,
-            r.tipo,
-            r.setor,
-            r.area,
-            r.turno,
-            r.supervisor,
-            r.integracao,
-            r.observacao or '',
-        ])
-    # Largura das colunas básica
-    widths = [12, 10, 26, 14, 18, 18, 12, 18, 12, 40]
-    for idx, w in enumerate(widths, start=1):
-        ws.column_dimensions[get_column_letter(idx)].width = w
-
-    bio = BytesIO()
-    wb.save(bio)
-    bio.seek(0)
-    filename = 'tabela_qualidade.xlsx'
-    return send_file(
-        bio,
-        as_attachment=True,
-        download_name=filename,
-        mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-    )
+    export_format = normalize_export_format(request.args.get('format'))
+
+    def export_rows(date_as_text=True):
+        # Lê o resultado em lotes; nenhuma lista com todas as linhas é montada
+        for r in q.yield_per(1000):
+            if date_as_text:
+                data_value = r.data.strftime('%Y-%m-%d') if r.data else ''
+            else:
+                data_value = r.data
+            yield [
+                data_value,
+                r.matricula,
+                r.nome,
+                r.tipo,
+                r.setor,
+                r.area,
+                r.turno,
+                r.supervisor,
+                r.integracao,
+                r.observacao or '',
+            ]
+
+    if export_format == 'csv':
+        chunks = iter_csv(headers, export_rows())
+    elif export_format == 'parquet':
+        try:
+            pa, _ = require_pyarrow()
+        except RuntimeError as err:
+            flash(str(err), 'danger')
+            return redirect(url_for('main.tabela', **{k: v for k, v in request.args.items() if k != 'format'}))
+        schema = pa.schema(
+            [('Data', pa.date32()), ('Matrícula', pa.int64())]
+            + [(name, pa.string()) for name in headers[2:]]
+        )
+        chunks = iter_parquet(schema, row_batches(headers, export_rows(date_as_text=False)))
+    else:
+        # Largura das colunas básica
+        widths = [12, 10, 26, 14, 18, 18, 12, 18, 12, 40]
+        chunks = iter_xlsx(headers, export_rows(), sheet_name='Dados', widths=widths, styled_header=False, autofilter=False)
+
+    extension, mimetype = EXPORT_FORMATS[export_format]
+    return streaming_download(chunks, filename=f'tabela_qualidade.{extension}', mimetype=mimetype)
 
 
 # Config Lists API and page
@@ -679,6 +823,35 @@ def config_lists():
     return render_template('config_lists.html', all_lists=all_lists)
 
 
+@bp.route('/api/colaboradores/lote', methods=['POST'])
+def api_colaboradores_lote():
+    """Altera e/ou exclui vários colaboradores em uma transação (formato em ``app/batch.py``)."""
+    payload = request.get_json(force=True, silent=True)
+    started = time.perf_counter()
+    try:
+        updates, deletes = parse_batch(payload, load_lists())
+        result = apply_batch(updates, deletes)
+        db.session.commit()
+    except BatchError as err:
+        db.session.rollback()
+        return jsonify({'error': str(err), 'erros': err.errors}), 400
+    except BatchConflict as err:
+        db.session.rollback()
+        return jsonify({
+            'error': 'Registro(s) alterado(s) ou excluído(s) por outra pessoa depois de carregados; '
+                     'nada foi gravado. Recarregue a página e refaça a seleção.',
+            'conflitos': err.conflicts,
+        }), 409
+    except Exception as err:
+        db.session.rollback()
+        current_app.logger.exception('Falha ao gravar lote de colaboradores: %s', err)
+        return jsonify({'error': f'Falha ao gravar o lote (nada foi gravado): {err}'}), 500
+    bump_data_version()
+    current_app.logger.info('Lote de colaboradores: %d alterado(s), %d excluído(s) em %.0f ms',
+                            result['atualizados'], result['excluidos'], (time.perf_counter() - started) * 1000)
+    return jsonify(result)
+
+
 @bp.route('/api/lists/<nome_lista>', methods=['GET', 'POST', 'PUT', 'DELETE'])
 def api_lists(nome_lista):
     nome_lista = nome_lista.lower()
@@ -706,6 +879,7 @@ def api_lists(nome_lista):
             return jsonify({'error': 'Valor já existe (comparação sem diferenciar maiúsculas/minúsculas)'}), 409
         db.session.add(ConfigList(nome_lista=nome_lista, valor=valor))
         db.session.commit()
+        bump_data_version()
         return jsonify({'ok': True})
 
     if request.method == 'PUT':
@@ -732,6 +906,7 @@ def api_lists(nome_lista):
             return jsonify({'error': 'Novo valor já existe (comparação sem diferenciar maiúsculas/minúsculas)'}), 409
         row.valor = new
         db.session.commit()
+        bump_data_version()
         return jsonify({'ok': True})
 
     if request.method == 'DELETE':
@@ -753,159 +928,122 @@ def api_lists(nome_lista):
                 return jsonify({'error': 'Não é possível remover: valor está em uso em registros existentes'}), 409
         db.session.delete(row)
         db.session.commit()
+        bump_data_version()
         return jsonify({'ok': True})
 
     return jsonify({'error': 'Método não suportado'}), 405
 
 
-# Página para upload de planilha (Input*Dados)
-@bp.route('/input-dados', methods=['GET', 'POST'])
-def input_dados():
-    if request.method == 'POST':
-        files = [f for f in request.files.getlist('files') if f and f.filename]
-        if not files:
-            flash('Nenhum arquivo selecionado.', 'warning')
-            return redirect(url_for('main.input_dados'))
+@bp.route('/api/cache/stats')
+def api_cache_stats():
+    """Estatísticas do cache de consultas (para ajustar QUERY_CACHE_SIZE/QUERY_CACHE_TTL)."""
+    return jsonify(cache_stats())
 
-        allowed_extensions = {'.xlsx', '.xls', '.xlsb'}
 
-        try:
-            import pandas as pd  # import local para não quebrar app se pandas não estiver instalado
-        except Exception:
-            flash('Dependência pandas não encontrada. Instale com: pip install pandas', 'danger')
-            return redirect(url_for('main.input_dados'))
+def preview_table(df, limit=5):
+    """Colunas e linhas (texto) das primeiras linhas de ``df`` para as prévias."""
+    try:
+        block = df.head(limit).copy()
+    except Exception:
+        block = df
+    try:
+        block = block.fillna('')
+    except Exception:
+        pass
+    try:
+        rows = block.astype(str).values.tolist()
+    except Exception:
+        rows = block.values.tolist()
+    return [str(c) for c in list(block.columns)], rows
 
-        global last_planilha, last_planilha_hc
-        last_planilha_hc = None
 
-        def determine_engine(ext: str) -> str:
-            ext = (ext or '').lower()
-            if ext == '.xlsb':
-                try:
-                    importlib.import_module('pyxlsb')
-                except ImportError:
-                    raise RuntimeError('Dependência pyxlsb não encontrada. Instale com: pip install pyxlsb')
-                return 'pyxlsb'
-            if ext == '.xls':
-                try:
-                    importlib.import_module('xlrd')
-                except ImportError:
-                    raise RuntimeError('Dependência xlrd não encontrada. Instale com: pip install xlrd==1.2.0')
-                return 'xlrd'
-            try:
-                importlib.import_module('openpyxl')
-            except ImportError:
-                raise RuntimeError('Dependência openpyxl não encontrada. Instale com: pip install openpyxl')
-            return 'openpyxl'
-
-        def read_dataframe(storage, *, sheet_name=0, extension=None):
-            ext = extension or Path(storage.filename).suffix.lower()
-            engine = determine_engine(ext)
+def run_ingest_job(job, files, invalid_names=()):
+    """Processa os arquivos de um job de importação (Input*Dados).
+
+    Roda na thread do coordenador de ``app/jobs.py``; as mensagens ficam no job
+    e o retorno (prévias) é o que a página exibe ao abrir o resultado.
+    """
+    dataset_store.clear('hc')
+
+    preview_filename = None
+    preview_df = None
+    preview_shape = None
+    processed_any = False
+    hc_previews = []
+
+    # Todos os arquivos começam a ser lidos juntos; os resultados são usados na ordem do envio
+    pending = job.submit_files([
+        (item['path'], detect_kind(item['name']), Path(item['name']).suffix.lower(), item['name'])
+        for item in files
+    ])
+
+    for index, item in enumerate(files):
+        filename = item['name']
+        extension = Path(filename).suffix.lower()
+        kind = detect_kind(filename)
+
+        if kind == 'hc':
             try:
-                storage.stream.seek(0)
-            except Exception:
-                pass
-            return pd.read_excel(storage, engine=engine, sheet_name=sheet_name)
-
-        preview_filename = None
-        preview_df = None
-        preview_shape = None
-        processed_any = False
-        invalid_names = []
-        hc_previews = []
-
-        for file in files:
-            filename = file.filename
-            extension = Path(filename).suffix.lower()
-            if extension not in allowed_extensions:
-                invalid_names.append(filename)
+                display_df = job.wait(pending, index, filename)
+            except RuntimeError as dep_err:
+                job.message('danger', str(dep_err))
                 continue
-
-            uppercase_name = filename.strip().upper()
-
-            if uppercase_name.startswith('HC'):
-                try:
-                    df_hc = read_dataframe(file, sheet_name='Base Colab.', extension=extension)
-                except RuntimeError as dep_err:
-                    flash(str(dep_err), 'danger')
-                    continue
-                except ValueError as sheet_err:
-                    flash(f'Planilha "{filename}" não contém a aba "Base Colab.": {sheet_err}', 'danger')
-                    continue
-                except Exception as err:
-                    current_app.logger.exception('Falha ao carregar planilha HC %s', filename)
-                    flash(f'Falha ao processar a planilha "{filename}": {err}', 'danger')
-                    continue
-
-                display_df = df_hc.copy()
-                expected_cols = ["Matrícula", "Cargo", "Situação", "Turno"]
-                missing_cols = [col for col in expected_cols if col not in display_df.columns]
-                if missing_cols:
-                    flash(f'Planilha "{filename}" não possui as colunas esperadas: {", ".join(missing_cols)}', 'warning')
-                    continue
-
-                display_df = display_df[expected_cols].copy()
-                display_df = display_df.rename(columns={
-                    "Cargo": "Cargo HC",
-                    "Situação": "Situação HC",
-                    "Turno": "Turno HC"
-                })
-                display_df['Situação HC'] = display_df['Situação HC'].apply(normalize_situacao_hc)
-                display_df['Matrícula'] = display_df['Matrícula'].apply(normalize_matricula)
-                display_df = display_df[display_df['Matrícula'].notna()].copy()
-                try:
-                    display_df['Matrícula'] = display_df['Matrícula'].astype(int)
-                except Exception:
-                    pass
-
-                processed_any = True
-                last_planilha_hc = display_df.copy()
-                current_app.logger.info('Planilha HC detectada: "%s" (%s). Linhas: %s | Colunas: %s', filename, extension or 'sem extensão', display_df.shape[0], list(display_df.columns))
-                try:
-                    preview_block = display_df.head(5).copy()
-                except Exception:
-                    preview_block = display_df
-                try:
-                    preview_block = preview_block.fillna('')
-                except Exception:
-                    pass
-                try:
-                    preview_rows = preview_block.astype(str).values.tolist()
-                except Exception:
-                    preview_rows = preview_block.values.tolist()
-                preview_cols_hc = [str(c) for c in list(preview_block.columns)]
-                hc_previews.append({
-                    'filename': filename,
-                    'shape': display_df.shape,
-                    'columns': preview_cols_hc,
-                    'rows': preview_rows,
-                })
-                try:
-                    console_preview = display_df.head(5).to_string(index=False)
-                except Exception:
-                    console_preview = str(display_df.head(5))
-                print(f'[Input*Dados][HC] {filename} - Prévia das 5 primeiras linhas:\n{console_preview}')
-                flash(f'Planilha "{filename}" (HC) carregada e registrada no console.', 'info')
+            except MissingColumnsError as cols_err:
+                job.message('warning', f'Planilha "{filename}" não possui as colunas esperadas: {", ".join(cols_err.columns)}')
+                continue
+            except ValueError as sheet_err:
+                job.message('danger', f'Planilha "{filename}" não contém a aba "{HC_SHEET}": {sheet_err}')
+                continue
+            except Exception as err:
+                current_app.logger.exception('Falha ao carregar planilha HC %s', filename)
+                job.message('danger', f'Falha ao processar a planilha "{filename}": {err}')
                 continue
 
             try:
-                df = read_dataframe(file, extension=extension)
-            except RuntimeError as dep_err:
-                flash(str(dep_err), 'danger')
-                continue
+                with job.stage('publishing', filename):
+                    dataset_store.save('hc', display_df)
             except Exception as err:
-                current_app.logger.exception('Falha ao processar planilha %s', filename)
-                flash(f'Falha ao processar o arquivo "{filename}": {err}', 'danger')
+                current_app.logger.exception('Falha ao gravar planilha HC %s', filename)
+                job.message('danger', f'Falha ao salvar a planilha "{filename}": {err}')
                 continue
+            processed_any = True
+            current_app.logger.info('Planilha HC detectada: "%s" (%s). Linhas: %s | Colunas: %s', filename, extension or 'sem extensão', display_df.shape[0], list(display_df.columns))
+            preview_cols_hc, preview_rows = preview_table(display_df)
+            hc_previews.append({
+                'filename': filename,
+                'shape': list(display_df.shape),
+                'columns': preview_cols_hc,
+                'rows': preview_rows,
+            })
+            try:
+                console_preview = display_df.head(5).to_string(index=False)
+            except Exception:
+                console_preview = str(display_df.head(5))
+            print(f'[Input*Dados][HC] {filename} - Prévia das 5 primeiras linhas:\n{console_preview}')
+            job.message('info', f'Planilha "{filename}" (HC) carregada e registrada no console.')
+            continue
 
+        try:
+            df = job.wait(pending, index, filename)
+        except RuntimeError as dep_err:
+            job.message('danger', str(dep_err))
+            continue
+        except MissingColumnsError as cols_err:
             processed_any = True
+            job.message('danger', f'Falha ao processar arquivo de rastreabilidade "{filename}": {cols_err}')
+            continue
+        except Exception as err:
+            current_app.logger.exception('Falha ao processar planilha %s', filename)
+            job.message('danger', f'Falha ao processar o arquivo "{filename}": {err}')
+            continue
 
-            if filename.startswith("Rastreabilidade_Tra"):
-                try:
-                    df_listColomns = ["Do Endereço", "Funcionário", "Nome", "Data", "Execução por Voz"]
-                    df_trabalho = df[df_listColomns].copy()
-                    df_trabalho["MOD"] = df_trabalho["Do Endereço"].fillna("").astype(str).str[:1]
+        processed_any = True
+
+        if kind == 'rastreabilidade':
+            try:
+                df_trabalho = df
 
+                with job.stage('merging', filename):
                     talkman_matriculas = set()
                     for matricula_raw, tipo_raw in (
                         db.session.query(Colaborador.matricula, Colaborador.tipo)
@@ -922,119 +1060,160 @@ def input_dados():
                         if tipo == 'TALKMAN':
                             talkman_matriculas.add(matricula)
 
-                    def flag_treinado(raw):
-                        matricula = normalize_matricula(raw)
-                        return 'Sim' if matricula is not None and matricula in talkman_matriculas else 'Não'
+                    treinado_mask = normalize_matricula_series(df_trabalho['Funcionário']).isin(talkman_matriculas)
+                    df_trabalho['Treinado'] = np.where(treinado_mask, 'Sim', 'Não').astype(object)
 
-                    df_trabalho['Treinado'] = df_trabalho['Funcionário'].apply(flag_treinado)
+                    job.message('info', f'Arquivo de rastreabilidade detectado. Linhas: Columns {RASTREABILIDADE_COLUMNS} | MOD e Treinado adicionados')
 
-                    flash(f'Arquivo de rastreabilidade detectado. Linhas: Columns {df_listColomns} | MOD e Treinado adicionados', 'info')
-
-                    global last_planilha
                     planilha = df_trabalho.copy()
-                    resultado = manipular_dados(planilha)
-                    if resultado is not None:
-                        df_manipulada, planilha, bancodb = resultado
-                        if planilha is not None:
-                            last_planilha = planilha
-                except Exception as e:
-                    current_app.logger.exception('Falha ao processar arquivo de rastreabilidade %s', filename)
-                    flash(f'Falha ao processar arquivo de rastreabilidade "{filename}": {e}', 'danger')
-                    continue
-
-                candidate_df = df_trabalho
-            else:
-                candidate_df = df
+                    df_manipulada, planilha, bancodb = manipular_dados(planilha)
 
-            if preview_df is None:
-                preview_df = candidate_df
-                preview_filename = filename
-                preview_shape = candidate_df.shape
+                with job.stage('publishing', filename):
+                    if planilha is not None:
+                        dataset_store.save('input', planilha)
+            except MergeDataError as e:
+                job.message('danger', f'Arquivo de rastreabilidade "{filename}": {e}')
+                continue
+            except Exception as e:
+                current_app.logger.exception('Falha ao processar arquivo de rastreabilidade %s', filename)
+                job.message('danger', f'Falha ao processar arquivo de rastreabilidade "{filename}": {e}')
+                continue
 
-            rows_count = candidate_df.shape[0]
-            cols_count = candidate_df.shape[1]
-            flash(f'Arquivo "{filename}" processado com sucesso. Linhas: {rows_count} | Colunas: {cols_count}', 'success')
+            candidate_df = df_trabalho
+            shape = candidate_df.shape
+        else:
+            candidate_df = df
+            # Da planilha genérica só a prévia é lida; a dimensão da aba vem da leitura
+            shape = tuple(df.attrs.get('source_shape') or df.shape)
+
+        if preview_df is None:
+            preview_df = candidate_df
+            preview_filename = filename
+            preview_shape = shape
 
-        if invalid_names:
-            ignored = ', '.join(invalid_names)
-            flash(f'Arquivos ignorados por formato inválido: {ignored}', 'warning')
+        rows_count, cols_count = shape
+        job.message('success', f'Arquivo "{filename}" processado com sucesso. Linhas: {rows_count} | Colunas: {cols_count}')
 
-        if not processed_any:
+    # O HC é limpo no início do job, então as visões do painel sempre mudam
+    try:
+        with job.stage('publishing'):
+            rebuild_derived_views()
+            # Deixa o merge HC e as listas de seleção prontos para a primeira abertura do painel
+            hc_panel = hc_panel_table()
+            if hc_panel is not None:
+                facet_columns(hc_panel[0], hc_panel[1])
+    except Exception as err:
+        current_app.logger.exception('Falha ao recalcular as visões derivadas do Input*Dados')
+        job.message('warning', f'Falha ao preparar os dados do painel ({err}); eles serão recalculados ao abrir o painel.')
+
+    if invalid_names:
+        ignored = ', '.join(invalid_names)
+        job.message('warning', f'Arquivos ignorados por formato inválido: {ignored}')
+
+    if not processed_any or (preview_df is None and not hc_previews):
+        return None
+
+    preview_cols = None
+    preview_rows = None
+    if preview_df is not None:
+        preview_cols, preview_rows = preview_table(preview_df)
+
+    return {
+        'preview_cols': preview_cols,
+        'preview_rows': preview_rows,
+        'preview_shape': list(preview_shape) if preview_shape else None,
+        'filename': preview_filename,
+        'hc_previews': hc_previews,
+    }
+
+
+def wants_json() -> bool:
+    best = request.accept_mimetypes.best_match(['application/json', 'text/html'])
+    return best == 'application/json' and request.accept_mimetypes[best] > request.accept_mimetypes['text/html']
+
+
+# Página para upload de planilha (Input*Dados)
+@bp.route('/input-dados', methods=['GET', 'POST'])
+def input_dados():
+    if request.method == 'POST':
+        files = [f for f in request.files.getlist('files') if f and f.filename]
+        if not files:
+            if wants_json():
+                return jsonify({'error': 'Nenhum arquivo selecionado.'}), 400
+            flash('Nenhum arquivo selecionado.', 'warning')
             return redirect(url_for('main.input_dados'))
 
-        if preview_df is None and not hc_previews:
+        valid = [f for f in files if Path(f.filename).suffix.lower() in ALLOWED_EXTENSIONS]
+        invalid_names = [f.filename for f in files if Path(f.filename).suffix.lower() not in ALLOWED_EXTENSIONS]
+        if not valid:
+            message = f'Arquivos ignorados por formato inválido: {", ".join(invalid_names)}'
+            if wants_json():
+                return jsonify({'error': message}), 400
+            flash(message, 'warning')
             return redirect(url_for('main.input_dados'))
 
-        preview_cols = None
-        preview_rows = None
-        if preview_df is not None:
-            preview_display = preview_df.head(5).copy()
-            try:
-                preview_display = preview_display.fillna('')
-            except Exception:
-                pass
-            try:
-                preview_rows = preview_display.astype(str).values.tolist()
-            except Exception:
-                preview_rows = preview_display.values.tolist()
-            preview_cols = [str(c) for c in list(preview_display.columns)]
-
-        return render_template(
-            'input_dados.html',
-            preview_cols=preview_cols,
-            preview_rows=preview_rows,
-            preview_shape=preview_shape,
-            filename=preview_filename,
-            hc_previews=hc_previews,
-        )
+        job_id = ingest_jobs.submit(valid, run_ingest_job, invalid_names=invalid_names)
+        result_url = url_for('main.input_dados', job=job_id)
+        if wants_json():
+            return jsonify({
+                'job_id': job_id,
+                'status_url': url_for('main.api_input_job', job_id=job_id),
+                'result_url': result_url,
+            }), 202
+        return redirect(result_url)
+
+    job_id = request.args.get('job')
+    if job_id:
+        status = ingest_jobs.status(job_id)
+        if status is None:
+            flash('Processamento não encontrado (pode ter expirado). Envie os arquivos novamente.', 'warning')
+            return redirect(url_for('main.input_dados'))
+        if status['state'] in ('queued', 'running'):
+            return render_template(
+                'input_dados.html',
+                job=status,
+                job_status_url=url_for('main.api_input_job', job_id=job_id),
+            )
+        for category, text in status.get('messages', []):
+            flash(text, category)
+        return render_template('input_dados.html', job=status, **(status.get('result') or {}))
 
     return render_template('input_dados.html')
 
-@bp.route('/painel-grafico', methods=['GET'])
-def painel_grafico(planilha=None):
-    """Renderiza o painel gráfico com cards de consolidados."""
 
+@bp.route('/api/input-dados/jobs/<job_id>')
+def api_input_job(job_id):
+    """Estado de um job de importação: etapa corrente, tempos por etapa e resultado."""
+    status = ingest_jobs.status(job_id)
+    if status is None:
+        return jsonify({'error': 'Job não encontrado'}), 404
+    payload = {key: value for key, value in status.items() if key not in ('messages', 'result')}
+    payload['result_url'] = url_for('main.input_dados', job=job_id)
+    return jsonify(payload)
+
+
+def painel_query_args(skip_keys=None, overrides=None):
+    """Parâmetros da requisição atual (sem vazios), para montar links e formulários do painel."""
+    skip = set(skip_keys or [])
+    base = {k: v for k, v in request.args.to_dict(flat=True).items() if v not in (None, '') and k not in skip}
+    if overrides:
+        base.update(overrides)
+    return base
+
+
+def painel_registros_context() -> dict:
+    """Consolidados do banco (aba Registros) para o período e filtros da requisição."""
     # Consolidados do banco com período selecionável
     try:
-        # Faixa total disponível no banco (para exibição informativa)
-        min_all = db.session.query(func.min(Colaborador.data)).scalar()
-        max_all = db.session.query(func.max(Colaborador.data)).scalar()
-
-        # Turnos disponíveis (distintos no banco)
-        turnos_rows = (
-            db.session.query(Colaborador.turno)
-            .filter(Colaborador.turno.isnot(None))
-            .distinct()
-            .order_by(Colaborador.turno.asc())
-            .all()
-        )
-        available_turnos = [t[0] for t in turnos_rows]
-
-        # Filtros adicionais: Setor, Tipo, Supervisor (para timeline)
-        setores_rows = (
-            db.session.query(Colaborador.setor)
-            .filter(Colaborador.setor.isnot(None))
-            .distinct()
-            .order_by(Colaborador.setor.asc())
-            .all()
-        )
-        tipos_rows = (
-            db.session.query(Colaborador.tipo)
-            .filter(Colaborador.tipo.isnot(None))
-            .distinct()
-            .order_by(Colaborador.tipo.asc())
-            .all()
-        )
-        supervisores_rows = (
-            db.session.query(Colaborador.supervisor)
-            .filter(Colaborador.supervisor.isnot(None))
-            .distinct()
-            .order_by(Colaborador.supervisor.asc())
-            .all()
-        )
-        available_setores = [s[0] for s in setores_rows]
-        available_tipos = [t[0] for t in tipos_rows]
-        available_supervisores = [s[0] for s in supervisores_rows]
+        # Faixa total disponível no banco e valores distintos das dimensões (lidos do resumo diário)
+        data_version = get_data_version()
+        catalog = query_cache.get_or_set(('painel_catalog', data_version), load_dimension_catalog)
+        min_all = catalog['min_all']
+        max_all = catalog['max_all']
+        available_turnos = catalog['turnos']
+        available_setores = catalog['setores']
+        available_tipos = catalog['tipos']
+        available_supervisores = catalog['supervisores']
 
         # Ler período do usuário (GET) e definir padrão como HOJE (performance)
         min_param = request.args.get('min_data')
@@ -1056,115 +1235,31 @@ def painel_grafico(planilha=None):
         sel_min = parse_date(min_param) or today
         sel_max = parse_date(max_param) or today
 
-        # Query filtrada pelo período e turno selecionados
-        q = db.session.query(Colaborador)
-        if sel_min:
-            q = q.filter(Colaborador.data >= sel_min)
-        if sel_max:
-            q = q.filter(Colaborador.data <= sel_max)
-        if selected_turno and selected_turno != 'all':
-            q = q.filter(Colaborador.turno == selected_turno)
-        if selected_tipo and selected_tipo != 'all':
-            q = q.filter(Colaborador.tipo == selected_tipo)
-
-        total_colaboradores = q.count()
-
-        # Agregações para gráficos (aplicando os mesmos filtros)
-        q_setor = db.session.query(
-            Colaborador.setor.label('setor'),
-            func.count(func.distinct(Colaborador.matricula)).label('qtd')
-        )
-        if sel_min:
-            q_setor = q_setor.filter(Colaborador.data >= sel_min)
-        if sel_max:
-            q_setor = q_setor.filter(Colaborador.data <= sel_max)
-        if selected_turno and selected_turno != 'all':
-            q_setor = q_setor.filter(Colaborador.turno == selected_turno)
-        if selected_tipo and selected_tipo != 'all':
-            q_setor = q_setor.filter(Colaborador.tipo == selected_tipo)
-        q_setor = q_setor.filter(Colaborador.setor.isnot(None)).group_by(Colaborador.setor).order_by(func.count(func.distinct(Colaborador.matricula)).desc())
-        setor_rows = q_setor.all()
-        setor_labels = [r.setor for r in setor_rows]
-        setor_series = [int(r.qtd or 0) for r in setor_rows]
-
-        # Agregação simples por tipo (contagem total sem distinct)
-        q_tipo_resumo = db.session.query(
-            Colaborador.tipo.label('tipo'),
-            func.count(Colaborador.matricula).label('qtd')
-        )
-        if sel_min:
-            q_tipo_resumo = q_tipo_resumo.filter(Colaborador.data >= sel_min)
-        if sel_max:
-            q_tipo_resumo = q_tipo_resumo.filter(Colaborador.data <= sel_max)
-        if selected_turno and selected_turno != 'all':
-            q_tipo_resumo = q_tipo_resumo.filter(Colaborador.turno == selected_turno)
-        if selected_tipo and selected_tipo != 'all':
-            q_tipo_resumo = q_tipo_resumo.filter(Colaborador.tipo == selected_tipo)
-        q_tipo_resumo = (
-            q_tipo_resumo
-            .filter(Colaborador.tipo.isnot(None))
-            .group_by(Colaborador.tipo)
-            .order_by(func.count(Colaborador.matricula).desc())
-        )
-        tipo_rows = q_tipo_resumo.all()
-        tipo_labels = [r.tipo for r in tipo_rows]
-        tipo_series = [int(r.qtd or 0) for r in tipo_rows]
-
-        q_turno = db.session.query(
-            Colaborador.turno.label('turno'),
-            func.count(Colaborador.matricula).label('qtd')
-        )
-        if sel_min:
-            q_turno = q_turno.filter(Colaborador.data >= sel_min)
-        if sel_max:
-            q_turno = q_turno.filter(Colaborador.data <= sel_max)
-        if selected_turno and selected_turno != 'all':
-            q_turno = q_turno.filter(Colaborador.turno == selected_turno)
-        if selected_tipo and selected_tipo != 'all':
-            q_turno = q_turno.filter(Colaborador.tipo == selected_tipo)
-        q_turno = q_turno.filter(Colaborador.turno.isnot(None)).group_by(Colaborador.turno).order_by(func.count(Colaborador.matricula).desc())
-        turno_rows = q_turno.all()
-        turno_labels = [r.turno for r in turno_rows]
-        turno_series = [int(r.qtd or 0) for r in turno_rows]
-
-        # Agregação simples por setor (contagem total sem distinct para análise de volume)
-        q_setor_total = db.session.query(
-            Colaborador.setor.label('setor'),
-            func.count(Colaborador.id).label('qtd')
+        # Séries, totais e limites de data do período filtrado (lidos do resumo diário)
+        aggregates_key = (
+            'painel_aggregates', data_version, sel_min, sel_max,
+            selected_turno, selected_tipo, selected_setor, selected_supervisor,
         )
-        if sel_min:
-            q_setor_total = q_setor_total.filter(Colaborador.data >= sel_min)
-        if sel_max:
-            q_setor_total = q_setor_total.filter(Colaborador.data <= sel_max)
-        if selected_turno and selected_turno != 'all':
-            q_setor_total = q_setor_total.filter(Colaborador.turno == selected_turno)
-        if selected_tipo and selected_tipo != 'all':
-            q_setor_total = q_setor_total.filter(Colaborador.tipo == selected_tipo)
-        q_setor_total = (
-            q_setor_total
-            .filter(Colaborador.setor.isnot(None))
-            .group_by(Colaborador.setor)
-            .order_by(func.count(Colaborador.id).desc())
-        )
-        setor_total_rows = q_setor_total.all()
-        stacked_categories = [r.setor for r in setor_total_rows]
-        stacked_series = [int(r.qtd or 0) for r in setor_total_rows]
-        min_data = db.session.query(func.min(Colaborador.data))
-        max_data = db.session.query(func.max(Colaborador.data))
-        if sel_min:
-            min_data = min_data.filter(Colaborador.data >= sel_min)
-            max_data = max_data.filter(Colaborador.data >= sel_min)
-        if sel_max:
-            min_data = min_data.filter(Colaborador.data <= sel_max)
-            max_data = max_data.filter(Colaborador.data <= sel_max)
-        if selected_turno and selected_turno != 'all':
-            min_data = min_data.filter(Colaborador.turno == selected_turno)
-            max_data = max_data.filter(Colaborador.turno == selected_turno)
-        if selected_tipo and selected_tipo != 'all':
-            min_data = min_data.filter(Colaborador.tipo == selected_tipo)
-            max_data = max_data.filter(Colaborador.tipo == selected_tipo)
-        min_data = min_data.scalar()
-        max_data = max_data.scalar()
+        aggregates = query_cache.get_or_set(aggregates_key, lambda: summary_dashboard_aggregates(
+            sel_min,
+            sel_max,
+            turno=selected_turno,
+            tipo=selected_tipo,
+            setor=selected_setor,
+            supervisor=selected_supervisor,
+        ))
+        total_colaboradores = aggregates['total_colaboradores']
+        min_data = aggregates['min_data']
+        max_data = aggregates['max_data']
+        setor_labels = aggregates['setor_labels']
+        setor_series = aggregates['setor_series']
+        tipo_labels = aggregates['tipo_labels']
+        tipo_series = aggregates['tipo_series']
+        turno_labels = aggregates['turno_labels']
+        turno_series = aggregates['turno_series']
+        stacked_categories = aggregates['stacked_categories']
+        stacked_series = aggregates['stacked_series']
+        timeline_data = aggregates['timeline_data']
 
         # Strings para inputs (YYYY-MM-DD)
         def to_str(d):
@@ -1178,35 +1273,6 @@ def painel_grafico(planilha=None):
         min_data_str = to_str(sel_min)
         max_data_str = to_str(sel_max)
         today_str = to_str(today)
-
-        # Série temporal (Data X contagem distinta de Matrícula) com filtros
-        q_time = db.session.query(
-            Colaborador.data.label('data'),
-            func.count(func.distinct(Colaborador.matricula)).label('qtd'),
-        )
-        if sel_min:
-            q_time = q_time.filter(Colaborador.data >= sel_min)
-        if sel_max:
-            q_time = q_time.filter(Colaborador.data <= sel_max)
-        if selected_turno and selected_turno != 'all':
-            q_time = q_time.filter(Colaborador.turno == selected_turno)
-        if selected_setor and selected_setor != 'all':
-            q_time = q_time.filter(Colaborador.setor == selected_setor)
-        if selected_tipo and selected_tipo != 'all':
-            q_time = q_time.filter(Colaborador.tipo == selected_tipo)
-        if selected_supervisor and selected_supervisor != 'all':
-            q_time = q_time.filter(Colaborador.supervisor == selected_supervisor)
-        q_time = q_time.group_by(Colaborador.data).order_by(Colaborador.data.asc())
-        time_rows = q_time.all()
-        # Converter para pares [timestamp_ms, valor]
-        timeline_data = []
-        for r in time_rows:
-            try:
-                # Usar meio-dia para evitar DST edge-cases
-                ts = datetime(r.data.year, r.data.month, r.data.day, 12, 0, 0)
-                timeline_data.append([int(ts.timestamp() * 1000), int(r.qtd or 0)])
-            except Exception:
-                pass
     except Exception as e:
         current_app.logger.exception('Falha ao calcular consolidados do banco: %s', e)
         total_colaboradores, min_data, max_data = 0, None, None
@@ -1227,60 +1293,37 @@ def painel_grafico(planilha=None):
         stacked_categories = []
         stacked_series = []
 
-    def build_query_args(skip_keys=None, overrides=None):
-        skip = set(skip_keys or [])
-        base = {k: v for k, v in request.args.to_dict(flat=True).items() if v not in (None, '') and k not in skip}
-        if overrides:
-            base.update(overrides)
-        return base
-
-    hc_turno_lookup = {}
-    try:
-        lookup_source_hc = last_planilha_hc
-    except NameError:
-        lookup_source_hc = None
-    if lookup_source_hc is not None:
-        try:
-            required_cols = {'Matrícula', 'Turno HC'}
-            if required_cols.issubset(lookup_source_hc.columns):
-                extra_cols = []
-                if 'Situação HC' in lookup_source_hc.columns:
-                    extra_cols.append('Situação HC')
-                if 'Turno' in lookup_source_hc.columns:
-                    extra_cols.append('Turno')
-                turno_lookup_df = lookup_source_hc[['Matrícula', 'Turno HC', *extra_cols]].copy()
-                turno_lookup_df['Matrícula'] = turno_lookup_df['Matrícula'].apply(normalize_matricula)
-                turno_lookup_df = turno_lookup_df[turno_lookup_df['Matrícula'].notna()]
-                turno_lookup_df['Turno HC'] = turno_lookup_df['Turno HC'].fillna('').astype(str).str.strip()
-
-                if 'Situação HC' in turno_lookup_df.columns:
-                    situacao_normalizada = turno_lookup_df['Situação HC'].apply(normalize_situacao_hc).fillna('')
-                    situacao_ascii = (
-                        situacao_normalizada
-                        .astype(str)
-                        .apply(lambda value: unicodedata.normalize('NFKD', value).encode('ASCII', 'ignore').decode('ASCII'))
-                        .str.lower()
-                    )
-                    temporario_mask = situacao_ascii.str.contains('tempor', na=False)
-                else:
-                    temporario_mask = pd.Series(False, index=turno_lookup_df.index)
-
-                if 'Turno' in turno_lookup_df.columns:
-                    turno_fallback = turno_lookup_df['Turno'].fillna('').astype(str).str.strip()
-                else:
-                    turno_fallback = pd.Series('', index=turno_lookup_df.index)
-
-                fallback_mask = (turno_lookup_df['Turno HC'] == '') & temporario_mask & (turno_fallback != '')
-                if fallback_mask.any():
-                    turno_lookup_df.loc[fallback_mask, 'Turno HC'] = turno_fallback.loc[fallback_mask]
+    return dict(
+        total_colaboradores=total_colaboradores,
+        min_data=min_data,
+        max_data=max_data,
+        min_all_str=min_all_str,
+        max_all_str=max_all_str,
+        min_data_str=min_data_str,
+        max_data_str=max_data_str,
+        today_str=today_str,
+        setor_labels=setor_labels,
+        setor_series=setor_series,
+        tipo_labels=tipo_labels,
+        tipo_series=tipo_series,
+        turno_labels=turno_labels,
+        turno_series=turno_series,
+        stacked_categories=stacked_categories,
+        stacked_series=stacked_series,
+        timeline_data=timeline_data,
+        available_turnos=available_turnos,
+        selected_turno=selected_turno,
+        available_setores=available_setores,
+        available_tipos=available_tipos,
+        available_supervisores=available_supervisores,
+        selected_setor=selected_setor,
+        selected_tipo=selected_tipo,
+        selected_supervisor=selected_supervisor,
+    )
 
-                turno_lookup_df = turno_lookup_df.drop_duplicates(subset=['Matrícula'], keep='first')
-                turno_lookup_df['Turno HC'] = turno_lookup_df['Turno HC'].replace('', np.nan).fillna('1° Turno')
-                hc_turno_lookup = turno_lookup_df.set_index('Matrícula')['Turno HC'].to_dict()
-        except Exception as err:
-            current_app.logger.warning('Falha ao construir lookup de Turno HC para Input*Dados: %s', err)
-            hc_turno_lookup = {}
 
+def painel_input_context() -> dict:
+    """Tabela da separação (Input*Dados) e gráficos de treinamento, com filtros, ordenação e página."""
     input_column_definitions = get_input_column_definitions()
     input_table_columns = [col["name"] for col in input_column_definitions]
     input_table_rows = []
@@ -1294,26 +1337,7 @@ def painel_grafico(planilha=None):
     input_table_range_start = 0
     input_table_range_end = 0
     merge_colab_percent = None
-    merge_turno_charts = {
-        'turno1': {
-            'labels': [],
-            'values': [],
-            'datasets': [],
-            'totals': {'execucao': 0, 'treinado': 0},
-            'series_label': 'Treinados',
-            'turno_label': '1° Turno',
-            'color': '#f59e0b'
-        },
-        'turno2': {
-            'labels': [],
-            'values': [],
-            'datasets': [],
-            'totals': {'execucao': 0, 'treinado': 0},
-            'series_label': 'Treinados',
-            'turno_label': '2° Turno',
-            'color': '#ef4444'
-        }
-    }
+    merge_turno_charts = empty_turno_charts()
     input_sort = (request.args.get('input_sort') or '').strip()
     valid_input_sorts = {col['param'] for col in input_column_definitions}
     if input_sort not in valid_input_sorts:
@@ -1330,47 +1354,26 @@ def painel_grafico(planilha=None):
         if value:
             input_filters[col['name']] = value
 
+    # Visão da separação calculada na importação (app/derived.py): aqui só filtra, ordena e pagina
     try:
-        source_df = last_planilha
-    except NameError:
-        source_df = None
+        input_view, input_view_meta = get_input_view()
+    except Exception as e:
+        current_app.logger.exception('Falha ao carregar a visão do Input*Dados: %s', e)
+        input_view, input_view_meta = None, {}
 
-    if source_df is not None:
+    if input_view is not None:
         try:
-            df_input = source_df.copy()
-            missing_cols = [col for col in input_table_columns if col not in df_input.columns]
-            if missing_cols:
-                current_app.logger.warning('Planilha Input*Dados ajustada por colunas ausentes: %s', missing_cols)
-                for col in missing_cols:
-                    default_value = 'Não' if col == 'Treinado' else ''
-                    df_input[col] = default_value
-            df_input = df_input[input_table_columns].copy()
-            if hc_turno_lookup and {'Funcionário', 'Turno HC'}.issubset(df_input.columns):
-                try:
-                    normalized_matriculas = df_input['Funcionário'].apply(normalize_matricula)
-                    mapped_turnos = normalized_matriculas.map(hc_turno_lookup).fillna('')
-                    existing_turnos = df_input['Turno HC'].fillna('').astype(str)
-                    df_input['Turno HC'] = (
-                        existing_turnos
-                        .where(existing_turnos.str.strip() != '', mapped_turnos)
-                        .fillna('')
-                    )
-                    df_input['Turno HC'] = df_input['Turno HC'].replace('', '1° Turno')
-                except Exception as err:
-                    current_app.logger.warning('Falha ao combinar Turno HC com Input*Dados: %s', err)
-            filtered_df = df_input.copy()
-            for col_name, filter_value in input_filters.items():
-                filter_series = filtered_df[col_name].astype(str).fillna('')
-                filtered_df = filtered_df[filter_series.str.contains(filter_value, case=False, na=False)]
-
+            # Filtro e ordenação viram posições em cache (app/table_index.py); a página é só um fatiamento
+            input_table_key = ('input_view', input_view_meta.get('version'))
+            sort_column = None
             if input_sort:
                 sort_column = next((col['name'] for col in input_column_definitions if col['param'] == input_sort), None)
-                if sort_column:
-                    ascending = input_order == 'asc'
-                    filtered_df = sort_dataframe(filtered_df, sort_column, ascending=ascending)
+            input_positions = row_positions(
+                input_table_key, input_view, input_filters,
+                sort_column=sort_column, ascending=input_order == 'asc',
+            )
 
-            display_df = filtered_df.fillna('')
-            input_table_total = len(display_df)
+            input_table_total = len(input_positions)
             if input_table_total > 0:
                 input_table_has_data = True
                 input_table_pages = max(1, math.ceil(input_table_total / input_table_page_size))
@@ -1378,7 +1381,7 @@ def painel_grafico(planilha=None):
                     input_table_page = input_table_pages
                 start = (input_table_page - 1) * input_table_page_size
                 end = start + input_table_page_size
-                page_df = display_df.iloc[start:end]
+                page_df = input_view.iloc[input_positions[start:end]][input_table_columns].fillna('')
                 input_table_range_start = start + 1
                 input_table_range_end = min(end, input_table_total)
                 input_table_rows = []
@@ -1400,133 +1403,16 @@ def painel_grafico(planilha=None):
                         formatted[col] = text
                     input_table_rows.append(formatted)
 
-                negative_pattern = re.compile(r"\b(n[aã]o|pendente|aguard|sem|falta)\b", re.IGNORECASE)
-
-                def is_execucao_sim(value):
-                    if value is None:
-                        return False
-                    try:
-                        text = str(value).strip()
-                    except Exception:
-                        return False
-                    if not text:
-                        return False
-                    lowered = text.lower()
-                    if lowered in {"", "nan", "none", "null", "0"}:
-                        return False
-                    if negative_pattern.search(lowered):
-                        return False
-                    return 'sim' in lowered
-
-                trained_mask = display_df["Treinado"].astype(str).str.strip().str.lower() == 'sim'
-                trained_total = int(trained_mask.sum())
-
-                if 'Execução por Voz' in display_df.columns:
-                    exec_sim_mask = display_df['Execução por Voz'].apply(is_execucao_sim)
-                else:
-                    exec_sim_mask = pd.Series(False, index=display_df.index)
-
-                trained_exec_mask = trained_mask & exec_sim_mask
-                trained_exec_count = int(trained_exec_mask.sum())
-                trained_no_exec_count = max(0, trained_total - trained_exec_count)
-                total_count = trained_exec_count + trained_no_exec_count
-                if total_count > 0:
-                    trained_pct = round((trained_exec_count / total_count) * 100, 2)
-                    untrained_pct = round((trained_no_exec_count / total_count) * 100, 2)
+                if input_filters or 'merge_turno_charts' not in input_view_meta:
+                    merge_colab_percent, merge_turno_charts = query_cache.get_or_set(
+                        ('input_charts', input_table_key, filters_key(input_filters)),
+                        lambda: input_charts(input_view.iloc[row_positions(input_table_key, input_view, input_filters)]),
+                    )
                 else:
-                    trained_pct = untrained_pct = 0.0
-
-                merge_colab_percent = {
-                    "labels": ["Com execução por Voz", "Sem execução por Voz"],
-                    "values": [trained_exec_count, trained_no_exec_count],
-                    "percentages": [trained_pct, untrained_pct],
-                    "total": total_count
-                }
+                    merge_colab_percent = input_view_meta.get('merge_colab_percent')
+                    merge_turno_charts = input_view_meta['merge_turno_charts']
 
-                if {'Data', 'Turno HC'}.issubset(display_df.columns):
-                    def normalize_turno_label(value):
-                        default_turno = '1° Turno'
-                        if value is None:
-                            return default_turno
-                        try:
-                            text = str(value).strip()
-                        except Exception:
-                            return default_turno
-                        if not text:
-                            return default_turno
-                        normalized = unicodedata.normalize('NFKD', text).encode('ASCII', 'ignore').decode('ASCII')
-                        lowered = normalized.lower().replace('º', '').replace('°', '')
-                        lowered = re.sub(r'[^a-z0-9]+', ' ', lowered).strip()
-                        if lowered.startswith('1') or lowered.startswith('primeiro') or lowered.startswith('turno 1'):
-                            return '1° Turno'
-                        if lowered.startswith('2') or lowered.startswith('segundo') or lowered.startswith('turno 2'):
-                            return '2° Turno'
-                        return text or default_turno
-
-                    def prepare_group(mask: pd.Series, count_label: str) -> pd.DataFrame:
-                        if mask is None or not mask.any():
-                            return pd.DataFrame(columns=['__turno', '__parsed_date', count_label])
-                        subset = display_df.loc[mask, ['Data', 'Turno HC']].copy()
-                        subset['__parsed_date'] = pd.to_datetime(subset['Data'], dayfirst=True, errors='coerce')
-                        subset = subset.dropna(subset=['__parsed_date'])
-                        if subset.empty:
-                            return pd.DataFrame(columns=['__turno', '__parsed_date', count_label])
-                        subset['__turno'] = subset['Turno HC'].apply(normalize_turno_label)
-                        grouped = (
-                            subset
-                            .groupby(['__turno', '__parsed_date'])
-                            .size()
-                            .reset_index(name=count_label)
-                        )
-                        return grouped
-
-                    exec_grouped = prepare_group(exec_sim_mask, 'execucao_count')
-                    trained_grouped = prepare_group(trained_mask, 'treinado_count')
-
-                    if not exec_grouped.empty or not trained_grouped.empty:
-                        combined = pd.merge(
-                            exec_grouped,
-                            trained_grouped,
-                            on=['__turno', '__parsed_date'],
-                            how='outer'
-                        ).fillna(0)
-                        combined['execucao_count'] = combined.get('execucao_count', 0).astype(int)
-                        combined['treinado_count'] = combined.get('treinado_count', 0).astype(int)
-
-                        for key, turno_label in [('turno1', '1° Turno'), ('turno2', '2° Turno')]:
-                            turno_df = combined[combined['__turno'] == turno_label].copy()
-                            if not turno_df.empty:
-                                turno_df = turno_df.sort_values('__parsed_date')
-                                labels = turno_df['__parsed_date'].dt.strftime('%d/%m/%Y').tolist()
-                                exec_values = turno_df['execucao_count'].astype(int).tolist()
-                                treinado_values = turno_df['treinado_count'].astype(int).tolist()
-                                merge_turno_charts[key]['labels'] = labels
-                                merge_turno_charts[key]['values'] = exec_values
-                                merge_turno_charts[key]['datasets'] = [
-                                    {
-                                        'key': 'execucao',
-                                        'label': 'Execução por Voz (Sim)',
-                                        'values': exec_values,
-                                        'color': '#2563eb'
-                                    },
-                                    {
-                                        'key': 'treinado',
-                                        'label': 'Treinado (Sim)',
-                                        'values': treinado_values,
-                                        'color': '#16a34a'
-                                    }
-                                ]
-                                merge_turno_charts[key]['totals'] = {
-                                    'execucao': int(sum(exec_values)),
-                                    'treinado': int(sum(treinado_values))
-                                }
-                            else:
-                                merge_turno_charts[key]['labels'] = []
-                                merge_turno_charts[key]['values'] = []
-                                merge_turno_charts[key]['datasets'] = []
-                                merge_turno_charts[key]['totals'] = {'execucao': 0, 'treinado': 0}
-
-                preserved_args = build_query_args(overrides={'tab': 'input', 'input_filter': 'separacao'})
+                preserved_args = painel_query_args(overrides={'tab': 'input', 'input_filter': 'separacao'})
                 preserved_args.pop('input_page', None)
                 window = 2
                 start_page = max(1, input_table_page - window)
@@ -1574,15 +1460,38 @@ def painel_grafico(planilha=None):
             'sort_direction': input_order if input_sort == col['param'] else None,
         })
 
-    input_form_args = build_query_args(
+    input_form_args = painel_query_args(
         skip_keys={'input_page', 'input_sort', 'input_order'} | input_filter_keys,
         overrides={'tab': 'input', 'input_filter': 'separacao'}
     )
-    input_export_args = build_query_args(
+    input_export_args = painel_query_args(
         skip_keys={'input_page'},
         overrides={'tab': 'input', 'input_filter': 'separacao'}
     )
 
+    return dict(
+        input_table_columns=input_table_columns,
+        input_table_rows=input_table_rows,
+        input_table_total=input_table_total,
+        input_table_page=input_table_page,
+        input_table_pages=input_table_pages,
+        input_table_page_size=input_table_page_size,
+        input_table_has_data=input_table_has_data,
+        input_table_pagination=input_table_pagination,
+        input_table_range_start=input_table_range_start,
+        input_table_range_end=input_table_range_end,
+        merge_colab_percent=merge_colab_percent,
+        merge_turno_charts=merge_turno_charts,
+        input_column_meta=input_column_meta,
+        input_sort=input_sort,
+        input_order=input_order,
+        input_form_args=input_form_args,
+        input_export_args=input_export_args,
+    )
+
+
+def painel_hc_context() -> dict:
+    """Tabela Merge Colaboradores x HC, resumo e gráfico de treinamento por cargo."""
     hc_merged_rows = []
     hc_merged_columns = []
     hc_preview_info = None
@@ -1603,164 +1512,20 @@ def painel_grafico(planilha=None):
     hc_slug_to_column = {}
 
     try:
-        source_hc = last_planilha_hc
-    except NameError:
-        source_hc = None
+        hc_panel = hc_panel_table()
+    except Exception as e:
+        current_app.logger.exception('Falha ao gerar merge HC: %s', e)
+        hc_panel = None
 
-    if source_hc is not None:
+    if hc_panel is not None:
         try:
-            bind = db.session.get_bind()
-            stmt = (
-                select(
-                    Colaborador.matricula.label("Matrícula"),
-                    Colaborador.nome.label("Nome"),
-                    Colaborador.tipo.label("Tipo"),
-                    Colaborador.setor.label("Setor"),
-                    Colaborador.area.label("Área"),
-                    Colaborador.turno.label("Turno"),
-                    Colaborador.supervisor.label("Supervisor"),
-                    Colaborador.integracao.label("Integração"),
-                    Colaborador.data.label("Data"),
-                )
-                .where(Colaborador.tipo == 'TALKMAN')
-            )
-            df_db = pd.read_sql(stmt, bind)
-            df_db['Matrícula'] = df_db['Matrícula'].apply(normalize_matricula)
-            df_db = df_db[df_db['Matrícula'].notna()].copy()
-            try:
-                df_db['Matrícula'] = df_db['Matrícula'].astype(int)
-            except Exception:
-                pass
-
-            merged_hc = pd.merge(df_db, source_hc, on='Matrícula', how='left')
-
-            execucao_lookup = build_execucao_por_voz_lookup(source_df)
-            if execucao_lookup is not None:
-                merged_hc = pd.merge(
-                    merged_hc,
-                    execucao_lookup,
-                    on='Matrícula',
-                    how='left'
-                )
-            hc_plan_for_chart = source_hc[['Matrícula', 'Situação HC']].copy()
-            if execucao_lookup is not None:
-                hc_plan_for_chart = pd.merge(
-                    hc_plan_for_chart,
-                    execucao_lookup,
-                    on='Matrícula',
-                    how='left'
-                )
-            elif 'Execução por Voz' not in hc_plan_for_chart.columns:
-                hc_plan_for_chart['Execução por Voz'] = ''
-            if 'Situação HC' in merged_hc.columns:
-                merged_hc['Situação HC'] = merged_hc['Situação HC'].apply(normalize_situacao_hc)
-            if 'Situação HC' in hc_plan_for_chart.columns:
-                hc_plan_for_chart['Situação HC'] = hc_plan_for_chart['Situação HC'].apply(normalize_situacao_hc)
-            if {'Turno HC', 'Turno', 'Situação HC'}.issubset(merged_hc.columns):
-                temporario_mask = merged_hc['Situação HC'] == 'Tempórario'
-                if temporario_mask.any():
-                    merged_hc.loc[temporario_mask, 'Turno HC'] = merged_hc.loc[temporario_mask, 'Turno']
-            cargo_hc_column = 'Cargo HC' if 'Cargo HC' in merged_hc.columns else None
-            if cargo_hc_column:
-                with_hc = int(merged_hc[cargo_hc_column].notna().sum())
-                without_hc = int(merged_hc[cargo_hc_column].isna().sum())
-            else:
-                with_hc = 0
-                without_hc = len(merged_hc)
-
-            hc_preview_info = {
-                'total': len(merged_hc),
-                'with_hc': with_hc,
-                'without_hc': without_hc,
-            }
-
-            execucao_column = 'Execução por Voz' if 'Execução por Voz' in merged_hc.columns else None
-            if execucao_column and {'Situação HC', 'Matrícula'}.issubset(merged_hc.columns):
-                pivot_source = merged_hc[['Situação HC', execucao_column, 'Matrícula']].copy()
-
-                def _clean_execucao(value):
-                    if pd.isna(value):
-                        return ''
-                    text = str(value).strip()
-                    lowered = text.lower()
-                    if not text or lowered in {'nan', 'none', 'null', 'sem informação', 'sem informacao', 'sem dados'}:
-                        return ''
-                    return text
-
-                def _normalize_execucao_category(value):
-                    if not value:
-                        return ''
-                    text = str(value).strip()
-                    if not text:
-                        return ''
-                    normalized = unicodedata.normalize('NFKD', text).encode('ASCII', 'ignore').decode('ASCII')
-                    normalized = re.sub(r'\s+', ' ', normalized).strip().lower()
-                    if not normalized:
-                        return ''
-                    normalized = normalized.replace('%', '')
-                    if 'nao' in normalized:
-                        return 'Não'
-                    if 'sim' in normalized:
-                        return 'Sim'
-                    return ''
-
-                pivot_source[execucao_column] = pivot_source[execucao_column].apply(_clean_execucao)
-                pivot_source = pivot_source[pivot_source[execucao_column] != '']
-                pivot_source[execucao_column] = pivot_source[execucao_column].apply(_normalize_execucao_category)
-                pivot_source = pivot_source[pivot_source[execucao_column] != '']
-                if not pivot_source.empty:
-                    pivot_source['Situação HC'] = pivot_source['Situação HC'].fillna('Sem Situação').astype(str).str.strip()
-                    pivot_source.loc[pivot_source['Situação HC'] == '', 'Situação HC'] = 'Sem Situação'
-
-                    pivot_table = pd.pivot_table(
-                        pivot_source,
-                        index='Situação HC',
-                        columns=execucao_column,
-                        values='Matrícula',
-                        aggfunc='count',
-                        fill_value=0,
-                    )
-
-                    if not pivot_table.empty:
-                        try:
-                            pivot_table = pivot_table.astype(int)
-                        except Exception:
-                            pivot_table = pivot_table.applymap(lambda x: int(x) if pd.notna(x) else 0)
-
-                        desired_execucao = ['Sim', 'Não']
-                        pivot_table = pivot_table.loc[:, [col for col in pivot_table.columns if col in desired_execucao]]
-                        for col in desired_execucao:
-                            if col not in pivot_table.columns:
-                                pivot_table[col] = 0
-                        pivot_table = pivot_table[desired_execucao]
-                        pivot_table = pivot_table.loc[:, (pivot_table != 0).any(axis=0)]
-
-                        if not pivot_table.empty:
-                            totals_by_situacao = pivot_table.sum(axis=1).sort_values(ascending=False)
-                            pivot_table = pivot_table.loc[totals_by_situacao.index]
-                            pivot_table = pivot_table.loc[:, [col for col in desired_execucao if col in pivot_table.columns]]
-
-                            datasets = []
-                            for column in pivot_table.columns:
-                                column_label = str(column).strip() or 'Execução não informada'
-                                values = [int(v) for v in pivot_table[column].astype(int).tolist()]
-                                datasets.append({
-                                    'label': column_label,
-                                    'data': values,
-                                    'total': int(sum(values)),
-                                })
-
-                            hc_training_chart = {
-                                'situacao_labels': [str(idx) for idx in pivot_table.index.tolist()],
-                                'datasets': datasets,
-                                'totals': [int(v) for v in totals_by_situacao.loc[pivot_table.index].astype(int).tolist()],
-                                'execucao_labels': [str(c) for c in pivot_table.columns.tolist()],
-                                'overall_total': int(pivot_table.values.sum()),
-                            }
-
+            hc_panel_key, merged_hc, hc_preview_info, hc_training_chart = hc_panel
+            # Colunas com poucos valores viram listas de seleção (valor exato, app/table_index.py)
+            hc_facet_columns = set(facet_columns(hc_panel_key, merged_hc))
 
             slug_counts = {}
             hc_filters = {}
+            hc_facets = {}
             for column in merged_hc.columns:
                 base_slug = slugify_column(column)
                 if base_slug in slug_counts:
@@ -1773,44 +1538,54 @@ def painel_grafico(planilha=None):
                 value = (request.args.get(f"hc_filter_{slug}") or '').strip()
                 if value:
                     hc_filters[column] = value
+                facet_value = request.args.get(f"hc_facet_{slug}") or ''
+                if facet_value:
+                    hc_facets[column] = facet_value
                 hc_column_meta.append({
                     'name': str(column),
                     'slug': slug,
                     'filter_value': value,
+                    'facet': column in hc_facet_columns,
+                    'facet_value': facet_value,
+                    'facet_options': [],
                 })
 
-            filtered_hc = merged_hc.copy()
-            for column, value in hc_filters.items():
-                filter_series = filtered_hc[column].astype(str).fillna('')
-                filtered_hc = filtered_hc[filter_series.str.contains(value, case=False, na=False)]
+            options = facet_options(
+                hc_panel_key, merged_hc, [column for column in merged_hc.columns if column in hc_facet_columns],
+                filters=hc_filters, facets=hc_facets,
+            )
+            for column, meta in zip(merged_hc.columns, hc_column_meta):
+                meta['facet_options'] = options.get(column, [])
 
+            sort_column = None
             if hc_sort in hc_slug_to_column:
                 sort_column = hc_slug_to_column[hc_sort]
-                ascending = hc_order == 'asc'
-                filtered_hc = sort_dataframe(filtered_hc, sort_column, ascending=ascending)
             else:
                 hc_sort = ''
                 hc_order = 'asc'
+            hc_positions = row_positions(
+                hc_panel_key, merged_hc, hc_filters,
+                sort_column=sort_column, ascending=hc_order == 'asc', facets=hc_facets,
+            )
 
-            display_df = filtered_hc.fillna('')
-            hc_table_total = len(display_df)
+            hc_table_total = len(hc_positions)
             if hc_table_total > 0:
                 hc_table_pages = max(1, math.ceil(hc_table_total / hc_table_page_size))
                 if hc_table_page > hc_table_pages:
                     hc_table_page = hc_table_pages
                 start = (hc_table_page - 1) * hc_table_page_size
                 end = start + hc_table_page_size
-                page_df = display_df.iloc[start:end].copy()
+                page_df = merged_hc.iloc[hc_positions[start:end]].fillna('')
                 hc_table_range_start = start + 1
                 hc_table_range_end = min(end, hc_table_total)
 
-                hc_merged_columns = [str(c) for c in list(display_df.columns)]
+                hc_merged_columns = [str(c) for c in list(merged_hc.columns)]
                 try:
                     hc_merged_rows = page_df.astype(str).values.tolist()
                 except Exception:
                     hc_merged_rows = page_df.values.tolist()
 
-                preserved_args = build_query_args(overrides={'tab': 'input', 'input_filter': 'hc'})
+                preserved_args = painel_query_args(overrides={'tab': 'input', 'input_filter': 'hc'})
                 preserved_args.pop('hc_page', None)
 
                 window = 2
@@ -1837,7 +1612,7 @@ def painel_grafico(planilha=None):
                     'page_links': page_links,
                 }
             else:
-                hc_merged_columns = [str(c) for c in list(display_df.columns)]
+                hc_merged_columns = [str(c) for c in list(merged_hc.columns)]
         except Exception as e:
             current_app.logger.exception('Falha ao gerar merge HC: %s', e)
 
@@ -1845,62 +1620,20 @@ def painel_grafico(planilha=None):
     for meta in hc_column_meta:
         slug = meta['slug']
         hc_filter_keys.add(f"hc_filter_{slug}")
+        hc_filter_keys.add(f"hc_facet_{slug}")
         meta['is_sorted'] = hc_sort == slug
         meta['sort_direction'] = hc_order if meta['is_sorted'] else None
 
-    hc_form_args = build_query_args(
+    hc_form_args = painel_query_args(
         skip_keys={'hc_page', 'hc_sort', 'hc_order'} | hc_filter_keys,
         overrides={'tab': 'input', 'input_filter': 'hc'}
     )
-    hc_export_args = build_query_args(
+    hc_export_args = painel_query_args(
         skip_keys={'hc_page'},
         overrides={'tab': 'input', 'input_filter': 'hc'}
     )
 
-    return render_template(
-        'painel_grafico.html',
-        total_colaboradores=total_colaboradores,
-        min_data=min_data,
-        max_data=max_data,
-        min_all_str=min_all_str,
-        max_all_str=max_all_str,
-        min_data_str=min_data_str,
-        max_data_str=max_data_str,
-        today_str=today_str,
-        setor_labels=setor_labels,
-        setor_series=setor_series,
-        tipo_labels=tipo_labels,
-        tipo_series=tipo_series,
-        turno_labels=turno_labels,
-        turno_series=turno_series,
-        stacked_categories=stacked_categories,
-        stacked_series=stacked_series,
-        timeline_data=timeline_data,
-        available_turnos=available_turnos,
-        selected_turno=selected_turno,
-        available_setores=available_setores,
-        available_tipos=available_tipos,
-        available_supervisores=available_supervisores,
-        selected_setor=selected_setor,
-        selected_tipo=selected_tipo,
-        selected_supervisor=selected_supervisor,
-        input_table_columns=input_table_columns,
-        input_table_rows=input_table_rows,
-        input_table_total=input_table_total,
-        input_table_page=input_table_page,
-        input_table_pages=input_table_pages,
-        input_table_page_size=input_table_page_size,
-        input_table_has_data=input_table_has_data,
-        input_table_pagination=input_table_pagination,
-        input_table_range_start=input_table_range_start,
-        input_table_range_end=input_table_range_end,
-        merge_colab_percent=merge_colab_percent,
-        merge_turno_charts=merge_turno_charts,
-        input_column_meta=input_column_meta,
-        input_sort=input_sort,
-        input_order=input_order,
-        input_form_args=input_form_args,
-        input_export_args=input_export_args,
+    return dict(
         hc_merged_columns=hc_merged_columns,
         hc_merged_rows=hc_merged_rows,
         hc_preview_info=hc_preview_info,
@@ -1920,60 +1653,210 @@ def painel_grafico(planilha=None):
     )
 
 
-@bp.route('/painel-grafico/export/separacao', methods=['GET'])
-def export_input_separacao():
-    try:
-        source_df = last_planilha
-    except NameError:
-        source_df = None
+# Cada aba (e cada subpainel do Input*Dados) é um fragmento com o próprio template e só os
+# contextos que ele usa: a página já vem com o da aba ativa e os demais são buscados ao abrir.
+PAINEL_FRAGMENTS = {
+    'registros': ('painel_grafico_registros.html', (painel_registros_context,)),
+    'separacao': ('painel_grafico_separacao.html', (painel_input_context,)),
+    'hc': ('painel_grafico_hc.html', (painel_hc_context,)),
+    'merge': ('painel_grafico_merge.html', (painel_input_context, painel_hc_context)),
+}
 
-    if source_df is None:
-        flash('Nenhuma planilha de separação carregada para exportação.', 'warning')
-        return redirect(url_for('main.painel_grafico', tab='input', input_filter='separacao'))
 
-    hc_turno_lookup = {}
-    try:
-        lookup_source_hc = last_planilha_hc
-    except NameError:
-        lookup_source_hc = None
-    if lookup_source_hc is not None:
-        try:
-            if {'Matrícula', 'Turno HC'}.issubset(lookup_source_hc.columns):
-                turno_lookup_df = lookup_source_hc[['Matrícula', 'Turno HC']].copy()
-                turno_lookup_df['Matrícula'] = turno_lookup_df['Matrícula'].apply(normalize_matricula)
-                turno_lookup_df = turno_lookup_df[turno_lookup_df['Matrícula'].notna()]
-                turno_lookup_df['Turno HC'] = turno_lookup_df['Turno HC'].fillna('').astype(str).str.strip()
-                turno_lookup_df = turno_lookup_df.drop_duplicates(subset=['Matrícula'], keep='first')
-                hc_turno_lookup = turno_lookup_df.set_index('Matrícula')['Turno HC'].to_dict()
-        except Exception as err:
-            current_app.logger.warning('Falha ao construir lookup de Turno HC para exportação: %s', err)
-            hc_turno_lookup = {}
+def painel_fragment_context(names) -> dict:
+    """Variáveis de template dos fragmentos ``names``, calculando cada contexto uma vez."""
+    context = {}
+    builders = []
+    for name in names:
+        for builder in PAINEL_FRAGMENTS[name][1]:
+            if builder not in builders:
+                builders.append(builder)
+    for builder in builders:
+        context.update(builder())
+    return context
+
+
+def painel_initial_fragment() -> str:
+    """Fragmento aberto pela URL (``tab`` e ``input_filter``), o único calculado na página."""
+    tab = request.args.get('tab')
+    if tab == 'input':
+        return 'hc' if request.args.get('input_filter') == 'hc' else 'separacao'
+    if tab == 'merge':
+        return 'merge'
+    return 'registros'
+
+
+@bp.route('/painel-grafico', methods=['GET'])
+def painel_grafico(planilha=None):
+    """Renderiza o painel gráfico; só a aba ativa é calculada, as demais carregam ao abrir."""
+    fragments = [painel_initial_fragment()]
+    return render_template(
+        'painel_grafico.html',
+        fragments=fragments,
+        fragment_args=request.args.to_dict(flat=True),
+        **painel_fragment_context(fragments),
+    )
+
+
+@bp.route('/painel-grafico/fragment/<name>', methods=['GET'])
+def painel_fragment(name):
+    """HTML de uma aba do painel, com os mesmos parâmetros de filtro da página."""
+    if name not in PAINEL_FRAGMENTS:
+        return jsonify({'error': f'Fragmento desconhecido: {name}'}), 404
+    template, _ = PAINEL_FRAGMENTS[name]
+    response = make_response(render_template(template, **painel_fragment_context([name])))
+    # Cada aba tem a própria URL e ETag: reabrir sem mudanças recebe um 304 vazio
+    response.headers['Cache-Control'] = 'private, no-cache'
+    response.add_etag()
+    return response.make_conditional(request)
+
+
+# API JSON do painel: as mesmas seções e filtros da página, sem HTML. ``sections`` escolhe as
+# seções e ``fields`` (``secao.campo``) os campos de cada uma; sem ``fields`` a seção vem inteira.
+
+def _painel_api_summary(ctx):
+    return {
+        'total': ctx['total_colaboradores'],
+        'periodo': {
+            'min': ctx['min_data_str'],
+            'max': ctx['max_data_str'],
+            'min_all': ctx['min_all_str'],
+            'max_all': ctx['max_all_str'],
+        },
+        'tipo': {'labels': ctx['tipo_labels'], 'series': ctx['tipo_series']},
+        'turno': {'labels': ctx['turno_labels'], 'series': ctx['turno_series']},
+        'setor': {'labels': ctx['setor_labels'], 'series': ctx['setor_series']},
+        'stacked': {'categories': ctx['stacked_categories'], 'series': ctx['stacked_series']},
+        'filtros': {
+            'turno': ctx['selected_turno'],
+            'tipo': ctx['selected_tipo'],
+            'setor': ctx['selected_setor'],
+            'supervisor': ctx['selected_supervisor'],
+            'turnos': ctx['available_turnos'],
+            'tipos': ctx['available_tipos'],
+            'setores': ctx['available_setores'],
+            'supervisores': ctx['available_supervisores'],
+        },
+    }
+
+
+def _painel_api_timeline(ctx):
+    return {'points': ctx['timeline_data']}
+
+
+def _painel_api_pagination(page, pages, total, page_size, start, end):
+    return {'page': page, 'pages': pages, 'total': total, 'page_size': page_size, 'start': start, 'end': end}
+
+
+def _painel_api_input_table(ctx):
+    columns = ctx['input_table_columns']
+    return {
+        'columns': columns,
+        'rows': [[row[col] for col in columns] for row in ctx['input_table_rows']],
+        'pagination': _painel_api_pagination(
+            ctx['input_table_page'], ctx['input_table_pages'], ctx['input_table_total'],
+            ctx['input_table_page_size'], ctx['input_table_range_start'], ctx['input_table_range_end'],
+        ),
+        'charts': {'colab_percent': ctx['merge_colab_percent'], 'turnos': ctx['merge_turno_charts']},
+    }
+
+
+def _painel_api_merge_hc(ctx):
+    return {
+        'columns': ctx['hc_merged_columns'],
+        'rows': ctx['hc_merged_rows'],
+        'pagination': _painel_api_pagination(
+            ctx['hc_table_page'], ctx['hc_table_pages'], ctx['hc_table_total'],
+            ctx['hc_table_page_size'], ctx['hc_table_range_start'], ctx['hc_table_range_end'],
+        ),
+        'facets': {
+            meta['name']: [[option['value'], option['count']] for option in meta['facet_options']]
+            for meta in ctx['hc_column_meta'] if meta['facet']
+        },
+        'preview': ctx['hc_preview_info'],
+        'training_chart': ctx['hc_training_chart'],
+    }
+
+
+# seção -> (contexto da página de onde sai, conversão)
+PAINEL_API_SECTIONS = {
+    'summary': ('registros', _painel_api_summary),
+    'timeline': ('registros', _painel_api_timeline),
+    'input-table': ('input', _painel_api_input_table),
+    'merge-hc': ('hc', _painel_api_merge_hc),
+}
+
+_PAINEL_CONTEXTS = {
+    'registros': painel_registros_context,
+    'input': painel_input_context,
+    'hc': painel_hc_context,
+}
+
+
+def _painel_api_response(sections):
+    unknown = [name for name in sections if name not in PAINEL_API_SECTIONS]
+    if unknown:
+        return jsonify({'error': f'Seções desconhecidas: {", ".join(unknown)}'}), 400
+
+    fields = {}
+    for item in (request.args.get('fields') or '').split(','):
+        section, _, field = item.strip().partition('.')
+        if section and field:
+            fields.setdefault(section, set()).add(field)
+
+    contexts = {}
+    payload = {'api': 1}
+    for name in sections:
+        context_name, convert = PAINEL_API_SECTIONS[name]
+        if context_name not in contexts:
+            contexts[context_name] = _PAINEL_CONTEXTS[context_name]()
+        data = convert(contexts[context_name])
+        if name in fields:
+            unknown = sorted(fields[name] - set(data))
+            if unknown:
+                return jsonify({'error': f'Campos desconhecidos em {name}: {", ".join(unknown)}'}), 400
+            data = {key: value for key, value in data.items() if key in fields[name]}
+        payload[name] = data
+
+    # JSON compacto, com acentos sem escape
+    response = current_app.response_class(
+        current_app.json.dumps(payload, ensure_ascii=False, separators=(',', ':')),
+        mimetype='application/json',
+    )
+    # O cliente revalida com If-None-Match; sem mudança a resposta é um 304 vazio
+    response.headers['Cache-Control'] = 'no-cache'
+    response.add_etag()
+    return response.make_conditional(request)
+
+
+@bp.route('/api/painel/v1', methods=['GET'])
+def api_painel():
+    """Várias seções do painel de uma vez (``sections=summary,timeline``; todas se omitido)."""
+    requested = [name.strip() for name in (request.args.get('sections') or '').split(',') if name.strip()]
+    return _painel_api_response(requested or list(PAINEL_API_SECTIONS))
 
-    definitions = get_input_column_definitions()
-    columns = [col['name'] for col in definitions]
 
+@bp.route('/api/painel/v1/<section>', methods=['GET'])
+def api_painel_section(section):
+    return _painel_api_response([section])
+
+
+@bp.route('/painel-grafico/export/separacao', methods=['GET'])
+def export_input_separacao():
     try:
-        export_df = source_df.copy()
+        input_view, input_view_meta = get_input_view()
     except Exception as err:
-        current_app.logger.exception('Falha ao copiar planilha de separação para exportação: %s', err)
+        current_app.logger.exception('Falha ao carregar a visão do Input*Dados para exportação: %s', err)
         flash(f'Falha ao preparar dados para exportação: {err}', 'danger')
         return redirect(url_for('main.painel_grafico', tab='input', input_filter='separacao'))
 
-    for column in columns:
-        if column not in export_df.columns:
-            default_value = 'Não' if column == 'Treinado' else ''
-            export_df[column] = default_value
-
-    export_df = export_df[columns].copy()
+    if input_view is None:
+        flash('Nenhuma planilha de separação carregada para exportação.', 'warning')
+        return redirect(url_for('main.painel_grafico', tab='input', input_filter='separacao'))
 
-    if hc_turno_lookup and {'Funcionário', 'Turno HC'}.issubset(export_df.columns):
-        try:
-            normalized_matriculas = export_df['Funcionário'].apply(normalize_matricula)
-            mapped_turnos = normalized_matriculas.map(hc_turno_lookup).fillna('')
-            existing_turnos = export_df['Turno HC'].fillna('').astype(str)
-            export_df['Turno HC'] = existing_turnos.where(existing_turnos.str.strip() != '', mapped_turnos).fillna('')
-        except Exception as err:
-            current_app.logger.warning('Falha ao combinar Turno HC na exportação de Input*Dados: %s', err)
+    definitions = get_input_column_definitions()
+    columns = [col['name'] for col in definitions]
+    table_key = ('input_view', input_view_meta.get('version'))
 
     filters = {}
     for definition in definitions:
@@ -1981,29 +1864,26 @@ def export_input_separacao():
         if filter_value:
             filters[definition['name']] = filter_value
 
-    for column, value in filters.items():
-        try:
-            series = export_df[column].astype(str).fillna('')
-            export_df = export_df[series.str.contains(value, case=False, na=False)]
-        except Exception as err:
-            current_app.logger.warning('Falha ao aplicar filtro "%s" na exportação: %s', column, err)
-
     input_sort = (request.args.get('input_sort') or '').strip()
     input_order = (request.args.get('input_order') or 'asc').lower()
-    valid_sorts = {col['param'] for col in definitions}
-    if input_sort in valid_sorts:
-        sort_column = next((col['name'] for col in definitions if col['param'] == input_sort), None)
-        if sort_column:
-            ascending = input_order != 'desc'
-            try:
-                export_df = sort_dataframe(export_df, sort_column, ascending=ascending)
-            except Exception as err:
-                current_app.logger.warning('Falha ao ordenar exportação por %s: %s', sort_column, err)
+    sort_column = next((col['name'] for col in definitions if col['param'] == input_sort), None)
+    try:
+        positions = row_positions(table_key, input_view, filters, sort_column=sort_column, ascending=input_order != 'desc')
+    except Exception as err:
+        current_app.logger.warning('Falha ao ordenar exportação por %s: %s', sort_column, err)
+        positions = row_positions(table_key, input_view, filters)
 
+    # Mesmas posições (em cache) da tabela do painel
+    export_df = input_view.iloc[positions][columns]
     export_df = export_df.fillna('')
 
     try:
-        return dataframe_to_excel_response(export_df, filename_prefix='input_dados', sheet_name='Separacao')
+        return dataframe_export_response(
+            export_df,
+            export_format=request.args.get('format'),
+            filename_prefix='input_dados',
+            sheet_name='Separacao',
+        )
     except RuntimeError as err:
         flash(str(err), 'danger')
         return redirect(url_for('main.painel_grafico', tab='input', input_filter='separacao'))
@@ -2011,67 +1891,32 @@ def export_input_separacao():
 
 @bp.route('/painel-grafico/export/hc', methods=['GET'])
 def export_input_hc():
-    try:
-        source_hc = last_planilha_hc
-    except NameError:
-        source_hc = None
+    hc_entry, source_hc = dataset_store.load('hc')
 
     if source_hc is None:
         flash('Nenhuma planilha HC carregada para exportação.', 'warning')
         return redirect(url_for('main.painel_grafico', tab='input', input_filter='hc'))
 
     try:
-        bind = db.session.get_bind()
-        stmt = select(
-            Colaborador.matricula.label("Matrícula"),
-            Colaborador.nome.label("Nome"),
-            Colaborador.tipo.label("Tipo"),
-            Colaborador.setor.label("Setor"),
-            Colaborador.area.label("Área"),
-            Colaborador.turno.label("Turno"),
-            Colaborador.supervisor.label("Supervisor"),
-            Colaborador.integracao.label("Integração"),
-            Colaborador.data.label("Data"),
-        )
-        df_db = pd.read_sql(stmt, bind)
-    except Exception as err:
-        current_app.logger.exception('Falha ao carregar dados do banco para exportação HC: %s', err)
-        flash(f'Falha ao carregar dados do banco para exportação: {err}', 'danger')
-        return redirect(url_for('main.painel_grafico', tab='input', input_filter='hc'))
+        execucao_lookup = get_execucao_lookup()
 
-    df_db['Matrícula'] = df_db['Matrícula'].apply(normalize_matricula)
-    df_db = df_db[df_db['Matrícula'].notna()].copy()
-    try:
-        df_db['Matrícula'] = df_db['Matrícula'].astype(int)
-    except Exception:
-        pass
+        # Todos os tipos de colaborador (o painel mostra só TALKMAN); em cache como o merge do painel
+        export_key = ('export_hc', get_data_version(), hc_entry['version'], dataset_store.version('execucao_lookup'))
 
-    try:
-        merged_hc = pd.merge(df_db, source_hc, on='Matrícula', how='left')
+        def load_export_hc():
+            df_db = pd.read_sql(hc_database_statement(talkman_only=False), db.session.get_bind())
+            return export_key + (time.time_ns(),), build_hc_panel(df_db, source_hc, execucao_lookup)[0]
+
+        table_key, merged_hc = query_cache.get_or_set(export_key, load_export_hc)
     except Exception as err:
         current_app.logger.exception('Falha ao gerar merge HC para exportação: %s', err)
         flash(f'Falha ao mesclar dados do banco com HC: {err}', 'danger')
         return redirect(url_for('main.painel_grafico', tab='input', input_filter='hc'))
 
-    try:
-        source_df = last_planilha
-    except NameError:
-        source_df = None
-
-    execucao_lookup = build_execucao_por_voz_lookup(source_df)
-    if execucao_lookup is not None:
-        merged_hc = pd.merge(merged_hc, execucao_lookup, on='Matrícula', how='left')
-
-    if 'Situação HC' in merged_hc.columns:
-        merged_hc['Situação HC'] = merged_hc['Situação HC'].apply(normalize_situacao_hc)
-    if {'Turno HC', 'Turno', 'Situação HC'}.issubset(merged_hc.columns):
-        temporario_mask = merged_hc['Situação HC'] == 'Tempórário'
-        if temporario_mask.any():
-            merged_hc.loc[temporario_mask, 'Turno HC'] = merged_hc.loc[temporario_mask, 'Turno']
-
     slug_counts = {}
     slug_to_column = {}
     filters = {}
+    facets = {}
     for column in merged_hc.columns:
         base_slug = slugify_column(column)
         count = slug_counts.get(base_slug, 0)
@@ -2084,29 +1929,32 @@ def export_input_hc():
         value = (request.args.get(f"hc_filter_{slug}") or '').strip()
         if value:
             filters[column] = value
-
-    export_df = merged_hc.copy()
-    for column, value in filters.items():
-        try:
-            series = export_df[column].astype(str).fillna('')
-            export_df = export_df[series.str.contains(value, case=False, na=False)]
-        except Exception as err:
-            current_app.logger.warning('Falha ao aplicar filtro "%s" na exportação HC: %s', column, err)
+        facet_value = request.args.get(f"hc_facet_{slug}") or ''
+        if facet_value:
+            facets[column] = facet_value
 
     hc_sort = (request.args.get('hc_sort') or '').strip()
     hc_order = (request.args.get('hc_order') or 'asc').lower()
-    if hc_sort in slug_to_column:
-        sort_column = slug_to_column[hc_sort]
-        ascending = hc_order != 'desc'
-        try:
-            export_df = sort_dataframe(export_df, sort_column, ascending=ascending)
-        except Exception as err:
-            current_app.logger.warning('Falha ao ordenar exportação HC por %s: %s', sort_column, err)
+    sort_column = slug_to_column.get(hc_sort)
+    try:
+        positions = row_positions(
+            table_key, merged_hc, filters,
+            sort_column=sort_column, ascending=hc_order != 'desc', facets=facets,
+        )
+    except Exception as err:
+        current_app.logger.warning('Falha ao ordenar exportação HC por %s: %s', sort_column, err)
+        positions = row_positions(table_key, merged_hc, filters, facets=facets)
 
+    export_df = merged_hc.iloc[positions]
     export_df = export_df.fillna('')
 
     try:
-        return dataframe_to_excel_response(export_df, filename_prefix='merge_hc', sheet_name='MergeHC')
+        return dataframe_export_response(
+            export_df,
+            export_format=request.args.get('format'),
+            filename_prefix='merge_hc',
+            sheet_name='MergeHC',
+        )
     except RuntimeError as err:
         flash(str(err), 'danger')
         return redirect(url_for('main.painel_grafico', tab='input', input_filter='hc'))
\ No newline at end of file
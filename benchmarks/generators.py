@@ -0,0 +1,242 @@
+"""Dados sintéticos determinísticos para os benchmarks.
+
+Tudo sai de ``numpy.random.default_rng`` com a semente informada: a mesma
+chamada gera sempre as mesmas linhas (em qualquer máquina), então resultados
+de execuções diferentes são comparáveis. ``GENERATOR_VERSION`` muda quando a
+geração mudar, para não comparar com dados antigos.
+
+- ``people``: o quadro de colaboradores (matrícula, nome e lotação fixa: setor,
+  turno e supervisor), com cerca de um terço das linhas de ``colaboradores``,
+  já que a mesma pessoa passa por mais de uma integração (TALKMAN, RECICLAGEM...);
+- ``colaborador_batches``: linhas de ``colaboradores`` em lotes de dicionários,
+  com mais integrações em dias úteis e volume crescendo ao longo do período;
+- ``rastreabilidade_frame`` e ``hc_frame``: as planilhas do Input*Dados como
+  saem da leitura (antes da normalização de ``app/ingest.py``).
+"""
+from datetime import date, datetime, time, timedelta
+
+import numpy as np
+import pandas as pd
+
+GENERATOR_VERSION = 1
+
+# Fim padrão do período gerado (fixo para a geração não depender do dia)
+END_DATE = date(2025, 12, 31)
+
+# Valores das listas padrão (seed_defaults em app/__init__.py) e seus pesos
+TIPOS = {'TALKMAN': 0.6, 'RECICLAGEM': 0.25, 'COLETOR': 0.15}
+SETORES = {
+    'Expedição': 0.3,
+    'Fracionado': 0.25,
+    'Carga Grossa': 0.2,
+    'Recebimento': 0.15,
+    'Controle de estoque': 0.1,
+}
+TURNOS = {'1° Turno': 0.55, '2° Turno': 0.45}
+AREAS = {'fluido': 1.0}
+INTEGRACOES = {'SIM': 0.9, 'NÃO': 0.1}
+
+# Supervisores por (setor, turno); o primeiro de cada equipe concentra mais gente
+SUPERVISORES_POR_EQUIPE = 4
+
+OBSERVACOES = ('Reintegração após afastamento', 'Remanejado de setor', 'Treinamento complementar',
+               'Integração parcial, retornar', 'Troca de turno')
+OBSERVACAO_FRACAO = 0.05
+
+# Integrações de domingo a sábado em relação a um dia útil (weekday(): segunda = 0)
+PESO_DIA_SEMANA = (1.0, 1.0, 1.0, 1.0, 0.9, 0.45, 0.15)
+
+PRIMEIROS_NOMES = (
+    'MARIA', 'JOSE', 'ANA', 'JOAO', 'ANTONIO', 'FRANCISCO', 'CARLOS', 'PAULO', 'PEDRO', 'LUCAS',
+    'LUIZ', 'MARCOS', 'LUIS', 'GABRIEL', 'RAFAEL', 'FRANCISCA', 'DANIEL', 'MARCELO', 'BRUNO', 'EDUARDO',
+    'FELIPE', 'RAIMUNDO', 'RODRIGO', 'ANTONIA', 'ADRIANA', 'JULIANA', 'MARCIA', 'FERNANDA', 'PATRICIA', 'ALINE',
+    'JOÃO', 'JOSÉ', 'MÁRCIO', 'SÉRGIO', 'FÁBIO', 'DÉBORA', 'LÚCIA', 'VITÓRIA', 'CAMILA', 'LETÍCIA',
+)
+SOBRENOMES = (
+    'SILVA', 'SANTOS', 'OLIVEIRA', 'SOUZA', 'RODRIGUES', 'FERREIRA', 'ALVES', 'PEREIRA', 'LIMA', 'GOMES',
+    'COSTA', 'RIBEIRO', 'MARTINS', 'CARVALHO', 'ALMEIDA', 'LOPES', 'SOARES', 'FERNANDES', 'VIEIRA', 'BARBOSA',
+    'ROCHA', 'DIAS', 'NASCIMENTO', 'ANDRADE', 'MOREIRA', 'NUNES', 'MARQUES', 'MACHADO', 'MENDES', 'FREITAS',
+    'CONCEIÇÃO', 'ARAÚJO', 'JESUS', 'ASSUNÇÃO', 'BRAGANÇA',
+)
+
+CARGOS = {'OPERADOR DE LOGISTICA I': 0.45, 'OPERADOR DE LOGISTICA II': 0.25, 'CONFERENTE': 0.12,
+          'OPERADOR DE EMPILHADEIRA': 0.1, 'AUXILIAR DE LOGISTICA': 0.08}
+SITUACOES_HC = {'ATIVIDADE NORMAL': 0.8, 'FERIAS': 0.06, 'AFASTAMENTO DOENCA': 0.04,
+                'Temporário': 0.06, 'RESCISAO': 0.01, '': 0.03}
+EXECUCOES = {'Sim': 0.7, 'Não': 0.25, '': 0.05}
+# Primeira letra do endereço = módulo (MOD)
+MODULOS = {'A': 0.3, 'B': 0.25, 'C': 0.2, 'D': 0.15, 'E': 0.1}
+
+# Linhas geradas por vez (fixo: os lotes entregues não mudam a sequência gerada)
+_CHUNK = 100_000
+
+
+def _rng(seed: int, *stream):
+    return np.random.default_rng([seed, *stream])
+
+
+def _pick(rng, weighted: dict, size: int) -> np.ndarray:
+    values = np.array(list(weighted), dtype=object)
+    weights = np.array(list(weighted.values()), dtype=float)
+    return values[rng.choice(len(values), size=size, p=weights / weights.sum())]
+
+
+def _names(rng, size: int) -> np.ndarray:
+    first = np.array(PRIMEIROS_NOMES, dtype=object)[rng.integers(len(PRIMEIROS_NOMES), size=size)]
+    middle = np.array(SOBRENOMES, dtype=object)[rng.integers(len(SOBRENOMES), size=size)]
+    last = np.array(SOBRENOMES, dtype=object)[rng.integers(len(SOBRENOMES), size=size)]
+    return first + ' ' + middle + ' ' + last
+
+
+def supervisores() -> dict:
+    """``{(setor, turno): [supervisores]}`` — nomes fixos, independentes da semente."""
+    teams = {}
+    position = 0
+    for setor in SETORES:
+        for turno in TURNOS:
+            names = []
+            for _ in range(SUPERVISORES_POR_EQUIPE):
+                names.append(f'{PRIMEIROS_NOMES[position % len(PRIMEIROS_NOMES)]} '
+                             f'{SOBRENOMES[(position * 7) % len(SOBRENOMES)]}')
+                position += 1
+            teams[(setor, turno)] = names
+    return teams
+
+
+def people(rows: int, seed: int) -> pd.DataFrame:
+    """Quadro de colaboradores por trás de ``rows`` registros: Matrícula, Nome, Setor, Turno, Supervisor."""
+    rng = _rng(seed, 0)
+    size = max(100, rows // 3)
+    # Matrículas únicas, espalhadas numa faixa de 6 dígitos ou mais
+    matriculas = 100_000 + rng.choice(max(900_000, size * 3), size=size, replace=False)
+    setor = _pick(rng, SETORES, size)
+    turno = _pick(rng, TURNOS, size)
+    teams = supervisores()
+    team_weights = 1.0 / np.arange(1, SUPERVISORES_POR_EQUIPE + 1)
+    team_choice = rng.choice(SUPERVISORES_POR_EQUIPE, size=size, p=team_weights / team_weights.sum())
+    supervisor = np.array([teams[(s, t)][i] for s, t, i in zip(setor, turno, team_choice)], dtype=object)
+    return pd.DataFrame({
+        'Matrícula': matriculas.astype(np.int64),
+        'Nome': _names(rng, size),
+        'Setor': setor,
+        'Turno': turno,
+        'Supervisor': supervisor,
+    })
+
+
+def _day_weights(start: date, days: int) -> np.ndarray:
+    weekdays = (np.arange(days) + start.weekday()) % 7
+    weights = np.array(PESO_DIA_SEMANA)[weekdays]
+    # Operação crescendo: o fim do período tem o dobro de integrações do início
+    weights = weights * np.linspace(0.5, 1.0, days)
+    return weights / weights.sum()
+
+
+def colaborador_batches(rows: int, seed: int, days: int = 3 * 365, end: date = END_DATE,
+                        batch_size: int = 50_000, staff: pd.DataFrame | None = None):
+    """Gera ``rows`` registros de ``colaboradores`` (dicionários do modelo) em lotes de ``batch_size``.
+
+    As datas cobrem ``days`` dias até ``end``. ``staff`` é o quadro de ``people()``
+    (calculado se omitido).
+    """
+    staff = people(rows, seed) if staff is None else staff
+    start = end - timedelta(days=days - 1)
+    day_p = _day_weights(start, days)
+    base = np.datetime64(start, 'D')
+    batch = []
+    for chunk_index, chunk_start in enumerate(range(0, rows, _CHUNK)):
+        size = min(_CHUNK, rows - chunk_start)
+        rng = _rng(seed, 1, chunk_index)
+        who = rng.integers(len(staff), size=size)
+        day_offsets = rng.choice(days, size=size, p=day_p)
+        seconds = rng.integers(6 * 3600, 22 * 3600, size=size)
+        tipo = _pick(rng, TIPOS, size)
+        area = _pick(rng, AREAS, size)
+        integracao = _pick(rng, INTEGRACOES, size)
+        with_obs = rng.random(size) < OBSERVACAO_FRACAO
+        obs = np.array(OBSERVACOES, dtype=object)[rng.integers(len(OBSERVACOES), size=size)]
+        # Alguns registros com supervisor de outra equipe (cobertura de férias)
+        other_team = rng.random(size) < 0.03
+        other_who = rng.integers(len(staff), size=size)
+
+        datas = (base + day_offsets).astype(object)
+        created = (base + day_offsets).astype('datetime64[s]') + seconds.astype('timedelta64[s]')
+        created = created.astype(object)
+        matricula = staff['Matrícula'].to_numpy()[who]
+        nome = staff['Nome'].to_numpy()[who]
+        setor = staff['Setor'].to_numpy()[who]
+        turno = staff['Turno'].to_numpy()[who]
+        supervisor = np.where(other_team, staff['Supervisor'].to_numpy()[other_who], staff['Supervisor'].to_numpy()[who])
+
+        for i in range(size):
+            batch.append({
+                'matricula': int(matricula[i]),
+                'nome': nome[i],
+                'tipo': tipo[i],
+                'setor': setor[i],
+                'area': area[i],
+                'turno': turno[i],
+                'supervisor': supervisor[i],
+                'integracao': integracao[i],
+                'data': datas[i],
+                'observacao': obs[i] if with_obs[i] else None,
+                'created_at': created[i],
+            })
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+    if batch:
+        yield batch
+
+
+def rastreabilidade_frame(rows: int, seed: int, staff: pd.DataFrame, days: int = 30,
+                          end: date = END_DATE, known_fraction: float = 0.85) -> pd.DataFrame:
+    """Planilha de rastreabilidade (separação) com ``rows`` linhas nos últimos ``days`` dias até ``end``.
+
+    ``known_fraction`` das linhas são de matrículas do quadro ``staff``; o resto,
+    de matrículas que não estão no banco.
+    """
+    rng = _rng(seed, 2)
+    pickers = max(1, min(len(staff), 2_000))
+    team = staff.iloc[rng.choice(len(staff), size=pickers, replace=False)].reset_index(drop=True)
+    who = rng.integers(pickers, size=rows)
+    known = rng.random(rows) < known_fraction
+    matricula = np.where(known, team['Matrícula'].to_numpy()[who], 10_000_000 + rng.integers(90_000, size=rows))
+    nome = np.where(known, team['Nome'].to_numpy()[who], _names(rng, rows))
+
+    start = datetime.combine(end - timedelta(days=days - 1), time(6))
+    stamps = np.datetime64(start, 's') + rng.integers(days * 86_400 - 8 * 3_600, size=rows).astype('timedelta64[s]')
+    datas = pd.to_datetime(stamps).strftime('%d/%m/%Y %H:%M:%S')
+
+    modulo = _pick(rng, MODULOS, rows)
+    endereco = pd.Series(modulo).str.cat([
+        pd.Series(rng.integers(1, 40, size=rows)).map('{:02d}'.format),
+        pd.Series(rng.integers(1, 200, size=rows)).map('{:03d}'.format),
+        pd.Series(rng.integers(1, 6, size=rows)).astype(str),
+    ], sep='-')
+    return pd.DataFrame({
+        'Do Endereço': endereco.to_numpy(dtype=object),
+        'Funcionário': matricula.astype(np.int64),
+        'Nome': nome,
+        'Data': np.asarray(datas, dtype=object),
+        'Execução por Voz': _pick(rng, EXECUCOES, rows),
+    })
+
+
+def hc_frame(rows: int, seed: int, staff: pd.DataFrame, known_fraction: float = 0.9) -> pd.DataFrame:
+    """Aba "Base Colab." da planilha HC com ``rows`` linhas (Matrícula, Cargo, Situação, Turno)."""
+    rng = _rng(seed, 3)
+    known_rows = min(len(staff), int(rows * known_fraction))
+    matricula = np.concatenate([
+        staff['Matrícula'].to_numpy()[rng.choice(len(staff), size=known_rows, replace=False)],
+        20_000_000 + rng.choice(max(1, rows * 2), size=rows - known_rows, replace=False),
+    ])
+    rng.shuffle(matricula)
+    situacao = _pick(rng, SITUACOES_HC, rows)
+    turno = _pick(rng, {**TURNOS, '': 0.05}, rows)
+    return pd.DataFrame({
+        'Matrícula': matricula.astype(np.int64),
+        'Cargo': _pick(rng, CARGOS, rows),
+        'Situação': situacao,
+        'Turno': turno,
+    })
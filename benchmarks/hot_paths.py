@@ -0,0 +1,363 @@
+"""Tempos dos caminhos quentes da aplicação sobre dados sintéticos, com comparação a uma baseline.
+
+Gera (uma vez, no diretório temporário do sistema) um banco com ``--rows`` colaboradores
+espalhados por ``--days`` dias e as planilhas do Input*Dados (rastreabilidade
+com ``--input-rows`` linhas e HC com ``--hc-rows``), publicadas como na
+importação. Os dados vêm de ``generators.py`` com semente fixa: a mesma linha
+de comando mede sempre os mesmos dados.
+
+Casos medidos (``--cases`` filtra por prefixo, ex.: ``--cases painel,tabela.``):
+
+- ``painel.<aba>``: /painel-grafico com a aba aberta (registros, separacao, hc, merge);
+- ``tabela.pagina_<n>``: /tabela na primeira página, no meio e na última (OFFSET);
+- ``tabela_export.<formato>``: /tabela/export dos últimos ``--export-days`` dias;
+- ``export_input_separacao.<formato>`` e ``export_input_hc.<formato>``;
+- ``manipular_dados``: merge da planilha de rastreabilidade com o banco.
+
+Cada caso roda ``--repeat`` vezes em dois modos: ``frio`` (caches em memória
+limpos antes de cada execução, como na primeira requisição após uma gravação)
+e ``quente`` (após uma execução de aquecimento). Antes da medição todos os
+casos rodam uma vez, para que imports e compilação de templates não caiam no
+primeiro caso. O JSON de saída traz mediana, p95 e mínimo em ms; com
+``--baseline`` as medianas são comparadas às de um resultado anterior e o
+comando sai com código 1 se algum caso piorar além de ``--tolerance`` (e de
+``--min-delta-ms``, para ignorar ruído em casos rápidos).
+
+Uso (na raiz do projeto):
+    python benchmarks/hot_paths.py --rows 100000 --json benchmarks/resultado.json
+    python benchmarks/hot_paths.py --rows 100000 --baseline benchmarks/resultado.json
+    python benchmarks/hot_paths.py --rows 5000000 --input-rows 1000000 --hc-rows 50000 --repeat 3
+"""
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+
+BENCH_DIR = Path(__file__).resolve().parent
+ROOT = BENCH_DIR.parent
+sys.path.insert(0, str(ROOT))
+
+from app import create_app, db  # noqa: E402
+from generators import (  # noqa: E402
+    END_DATE,
+    GENERATOR_VERSION,
+    colaborador_batches,
+    hc_frame,
+    people,
+    rastreabilidade_frame,
+)
+
+MIN_ROWS = 10_000
+MAX_ROWS = 5_000_000
+
+EXPORT_FORMATS = ('csv', 'xlsx')
+
+RESULT_FORMAT = 1
+
+
+def make_app(workdir: Path):
+    return create_app({
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{workdir / 'bench.db'}",
+        'DATASETS_DIR': str(workdir / 'datasets'),
+        'PARSE_CACHE_DIR': str(workdir / 'parse_cache'),
+        'INGEST_JOBS_DIR': str(workdir / 'jobs'),
+        'DATA_VERSION_FILE': str(workdir / 'data_version'),
+        'INGEST_WORKERS': 0,
+    })
+
+
+def dataset_params(args) -> dict:
+    return {
+        'rows': args.rows,
+        'days': args.days,
+        'input_rows': args.input_rows,
+        'hc_rows': args.hc_rows,
+        'seed': args.seed,
+        'generator_version': GENERATOR_VERSION,
+    }
+
+
+def default_workdir(params: dict) -> Path:
+    name = 'r{rows}-d{days}-i{input_rows}-h{hc_rows}-s{seed}-g{generator_version}'.format(**params)
+    # Fora do repositório: o banco e as planilhas geradas passam de centenas de MB
+    return Path(tempfile.gettempdir()) / 'qualidade-benchmarks' / name
+
+
+def rastreabilidade_trabalho(raw):
+    """Planilha de rastreabilidade como o job de importação a entrega ao ``manipular_dados``."""
+    from app.ingest import normalize_rastreabilidade
+    from app.models import Colaborador
+    from app.normalization import normalize_matricula_series
+
+    df = normalize_rastreabilidade(raw)
+    talkman = {matricula for (matricula,) in db.session.query(Colaborador.matricula)
+               .filter(Colaborador.tipo == 'TALKMAN').distinct()}
+    treinado = normalize_matricula_series(df['Funcionário']).isin(talkman)
+    df['Treinado'] = np.where(treinado, 'Sim', 'Não').astype(object)
+    return df
+
+
+def input_frames(params: dict):
+    staff = people(params['rows'], params['seed'])
+    return (
+        rastreabilidade_frame(params['input_rows'], params['seed'], staff),
+        hc_frame(params['hc_rows'], params['seed'], staff),
+    )
+
+
+def build_dataset(workdir: Path, params: dict) -> dict:
+    """Gera o banco e publica as planilhas em ``workdir``; devolve os tempos de geração."""
+    from sqlalchemy import insert
+
+    from app.datasets import dataset_store
+    from app.derived import rebuild_derived_views
+    from app.ingest import normalize_hc
+    from app.models import Colaborador
+    from app.summary import rebuild_summary
+    from app.views import hc_panel_table, manipular_dados
+
+    workdir.mkdir(parents=True, exist_ok=True)
+    app = make_app(workdir)
+    timings = {}
+    with app.app_context():
+        if db.session.query(Colaborador.id).first() is not None:
+            raise SystemExit(f'{workdir} já tem dados incompletos; rode com --rebuild')
+        started = time.perf_counter()
+        staff = people(params['rows'], params['seed'])
+        inserted = 0
+        for batch in colaborador_batches(params['rows'], params['seed'], days=params['days'], staff=staff):
+            db.session.execute(insert(Colaborador), batch)
+            db.session.commit()
+            inserted += len(batch)
+            print(f'  colaboradores: {inserted}/{params["rows"]}', end='\r', flush=True)
+        print()
+        rebuild_summary()
+        db.session.commit()
+        db.session.execute(db.text('ANALYZE'))
+        db.session.commit()
+        timings['colaboradores_s'] = round(time.perf_counter() - started, 1)
+
+        started = time.perf_counter()
+        raw_input, raw_hc = input_frames(params)
+        with app.app_context():
+            dataset_store.save('hc', normalize_hc(raw_hc))
+            _, planilha, _ = manipular_dados(rastreabilidade_trabalho(raw_input))
+            dataset_store.save('input', planilha)
+            rebuild_derived_views()
+            hc_panel_table()
+        timings['planilhas_s'] = round(time.perf_counter() - started, 1)
+    return timings
+
+
+def prepare(args) -> tuple[Path, dict]:
+    params = dataset_params(args)
+    workdir = Path(args.workdir) if args.workdir else default_workdir(params)
+    marker = workdir / 'dataset.json'
+    if args.rebuild and workdir.exists():
+        import shutil
+        shutil.rmtree(workdir)
+    if marker.exists():
+        info = json.loads(marker.read_text(encoding='utf-8'))
+        if info.get('params') != params:
+            raise SystemExit(f'{workdir} foi gerado com outros parâmetros; use outro --workdir ou --rebuild')
+        return workdir, info
+    print(f'Gerando dados em {workdir}...', flush=True)
+    info = {'params': params, 'geracao': build_dataset(workdir, params)}
+    marker.write_text(json.dumps(info, ensure_ascii=False, indent=2), encoding='utf-8')
+    return workdir, info
+
+
+def build_cases(app, client, params: dict, args) -> dict:
+    """``{nome: função}``; cada função executa o caso e devolve (status, bytes)."""
+    from app.views import manipular_dados
+
+    end = END_DATE
+    period = {'min_data': (end - timedelta(days=params['days'] - 1)).isoformat(), 'max_data': end.isoformat()}
+    export_period = {'min_data': (end - timedelta(days=args.export_days - 1)).isoformat(), 'max_data': end.isoformat()}
+
+    def get(url, query=None):
+        def run():
+            response = client.get(url, query_string=query)
+            # Consome o corpo inteiro (as exportações são geradas em streaming)
+            size = len(response.get_data())
+            return response.status_code, size
+        return run
+
+    cases = {}
+    for tab, extra in (
+        ('registros', {'tab': 'registros'}),
+        ('separacao', {'tab': 'input', 'input_filter': 'separacao'}),
+        ('hc', {'tab': 'input', 'input_filter': 'hc'}),
+        ('merge', {'tab': 'merge'}),
+    ):
+        cases[f'painel.{tab}'] = get('/painel-grafico', {**period, **extra})
+
+    pages = max(1, -(-params['rows'] // args.per_page))
+    for page in sorted({1, (pages + 1) // 2, pages}):
+        cases[f'tabela.pagina_{page}'] = get('/tabela', {**period, 'per_page': args.per_page, 'page': page})
+
+    for export_format in EXPORT_FORMATS:
+        cases[f'tabela_export.{export_format}'] = get('/tabela/export', {**export_period, 'format': export_format})
+    for export_format in EXPORT_FORMATS:
+        cases[f'export_input_separacao.{export_format}'] = get('/painel-grafico/export/separacao', {'format': export_format})
+    for export_format in EXPORT_FORMATS:
+        cases[f'export_input_hc.{export_format}'] = get('/painel-grafico/export/hc', {'format': export_format})
+
+    with app.app_context():
+        raw_input, _ = input_frames(params)
+        trabalho = rastreabilidade_trabalho(raw_input)
+
+    def run_manipular():
+        with app.app_context():
+            merged, _, _ = manipular_dados(trabalho.copy())
+        return 200, len(merged)
+
+    cases['manipular_dados'] = run_manipular
+    return cases
+
+
+def clear_caches():
+    from app.cache import bump_data_version, query_cache
+    from app.table_index import index_cache
+
+    bump_data_version()
+    query_cache.clear()
+    index_cache.clear()
+
+
+def stats(timings) -> dict:
+    ordered = sorted(timings)
+    p95 = ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))]
+    return {
+        'mediana_ms': round(statistics.median(ordered), 2),
+        'p95_ms': round(p95, 2),
+        'min_ms': round(ordered[0], 2),
+        'execucoes': len(ordered),
+    }
+
+
+def measure(run, repeat: int, cold: bool) -> dict:
+    if not cold:
+        run()
+    timings = []
+    status = size = None
+    for _ in range(repeat):
+        if cold:
+            clear_caches()
+        started = time.perf_counter()
+        status, size = run()
+        timings.append((time.perf_counter() - started) * 1000)
+    return {**stats(timings), 'status': status, 'bytes': size}
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(report: dict, baseline: dict, tolerance: float, min_delta_ms: float) -> list:
+    """Linhas ``(caso, base, atual, variação, regressão)`` dos casos presentes nos dois resultados."""
+    if baseline.get('dados') != report['dados']:
+        raise SystemExit('A baseline foi medida com outros dados (--rows, --seed...); os tempos não são comparáveis.')
+    rows = []
+    for key, result in report['resultados'].items():
+        base = baseline.get('resultados', {}).get(key)
+        if not base:
+            continue
+        before, after = base['mediana_ms'], result['mediana_ms']
+        change = (after - before) / before if before else 0.0
+        regression = change > tolerance and after - before > min_delta_ms
+        rows.append((key, before, after, change, regression))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100_000, help=f'Registros em colaboradores ({MIN_ROWS} a {MAX_ROWS})')
+    parser.add_argument('--days', type=int, default=3 * 365, help='Dias cobertos pelos registros')
+    parser.add_argument('--input-rows', type=int, default=100_000, help='Linhas da planilha de rastreabilidade')
+    parser.add_argument('--hc-rows', type=int, default=10_000, help='Linhas da planilha HC')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--repeat', type=int, default=5, help='Execuções medidas por caso e modo')
+    parser.add_argument('--modes', default='frio,quente', help='Modos medidos (frio,quente)')
+    parser.add_argument('--cases', help='Prefixos dos casos a medir, separados por vírgula')
+    parser.add_argument('--per-page', type=int, default=100, help='Registros por página na tabela')
+    parser.add_argument('--export-days', type=int, default=90, help='Período exportado da tabela (dias)')
+    parser.add_argument('--workdir', help='Diretório dos dados gerados (padrão: <temp>/qualidade-benchmarks/<parâmetros>)')
+    parser.add_argument('--rebuild', action='store_true', help='Gera os dados de novo mesmo se já existirem')
+    parser.add_argument('--json', help='Grava os resultados neste arquivo')
+    parser.add_argument('--baseline', help='Resultado anterior (JSON) para comparar')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='Piora relativa aceita na mediana (0.25 = 25%%)')
+    parser.add_argument('--min-delta-ms', type=float, default=10.0, help='Piora absoluta mínima para contar como regressão')
+    args = parser.parse_args(argv)
+    if not MIN_ROWS <= args.rows <= MAX_ROWS:
+        parser.error(f'--rows deve estar entre {MIN_ROWS} e {MAX_ROWS}')
+    modes = [mode.strip() for mode in args.modes.split(',') if mode.strip()]
+    if not modes or set(modes) - {'frio', 'quente'}:
+        parser.error('--modes aceita frio e/ou quente')
+
+    workdir, info = prepare(args)
+    app = make_app(workdir)
+    client = app.test_client()
+    cases = build_cases(app, client, info['params'], args)
+    if args.cases:
+        prefixes = tuple(item.strip() for item in args.cases.split(',') if item.strip())
+        cases = {name: run for name, run in cases.items() if name.startswith(prefixes)}
+
+    report = {
+        'formato': RESULT_FORMAT,
+        'dados': info['params'],
+        'ambiente': {
+            'data': datetime.now().isoformat(timespec='seconds'),
+            'git': git_revision(),
+            'python': platform.python_version(),
+            'plataforma': platform.platform(),
+            'repeat': args.repeat,
+        },
+        'geracao': info.get('geracao'),
+        'resultados': {},
+    }
+    # Uma passada sem medir: imports, compilação dos templates e leitura das planilhas do disco
+    for run in cases.values():
+        run()
+    print(f"{'caso':<36} {'modo':<7} {'mediana_ms':>11} {'p95_ms':>9} {'min_ms':>9} {'status':>7} {'bytes':>12}")
+    for name, run in cases.items():
+        for mode in modes:
+            result = measure(run, args.repeat, cold=mode == 'frio')
+            report['resultados'][f'{name}/{mode}'] = result
+            print(f"{name:<36} {mode:<7} {result['mediana_ms']:>11.1f} {result['p95_ms']:>9.1f} "
+                  f"{result['min_ms']:>9.1f} {result['status']:>7} {result['bytes']:>12}", flush=True)
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding='utf-8')
+        print(f'\nResultados em {args.json}')
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding='utf-8'))
+        rows = compare(report, baseline, args.tolerance, args.min_delta_ms)
+        print(f"\nComparação com {args.baseline} (git {baseline.get('ambiente', {}).get('git')}):")
+        print(f"{'caso':<44} {'base_ms':>10} {'atual_ms':>10} {'variação':>9}")
+        for key, before, after, change, regression in rows:
+            flag = '  REGRESSÃO' if regression else ''
+            print(f'{key:<44} {before:>10.1f} {after:>10.1f} {change:>+9.0%}{flag}')
+        regressions = [row for row in rows if row[4]]
+        if regressions:
+            print(f'\n{len(regressions)} caso(s) mais lento(s) que a baseline além de {args.tolerance:.0%}.')
+            return 1
+        print('\nNenhuma regressão.')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,196 @@
+"""Leituras e gravações concorrentes no SQLite: perfil padrão x ``SQLITE_PRAGMAS``.
+
+Simula a troca de turno: ``--writers`` processos lançam integrações pelo
+formulário (POST /alimentacao, com resumo diário e índice de busca) enquanto
+``--readers`` processos abrem a tabela e o resumo do painel. Cada perfil roda num
+banco novo em um diretório temporário, com os mesmos ``--rows`` registros
+gerados com semente fixa:
+
+- ``padrao``: journal de rollback e demais PRAGMAs padrão do SQLite (como antes
+  do perfil de conexão);
+- ``perfil``: ``SQLITE_PRAGMAS`` de ``app/__init__.py`` (WAL, busy_timeout...).
+
+Uso (na raiz do projeto):
+    python benchmarks/sqlite_profile.py --seconds 10 --readers 8 --writers 4
+    python benchmarks/sqlite_profile.py --json resultado.json
+
+Compare as latências das leituras (em WAL não esperam o commit dos
+gravadores) e os erros "database is locked" das gravações.
+"""
+import argparse
+import json
+import multiprocessing
+import random
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import insert  # noqa: E402
+
+from app import create_app, db  # noqa: E402
+from generators import colaborador_batches  # noqa: E402
+
+PROFILES = {
+    'padrao': {'journal_mode': 'DELETE'},
+    'perfil': None,  # SQLITE_PRAGMAS do app
+}
+
+# Acima disso a leitura conta como "esperou" (ms)
+SLOW_READ_MS = 50
+
+
+def make_app(workdir: Path, pragmas):
+    config = {
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{workdir / 'bench.db'}",
+        'DATASETS_DIR': str(workdir / 'datasets'),
+        'PARSE_CACHE_DIR': str(workdir / 'parse_cache'),
+        'INGEST_JOBS_DIR': str(workdir / 'jobs'),
+        'DATA_VERSION_FILE': str(workdir / 'data_version'),
+        'INGEST_WORKERS': 0,
+    }
+    if pragmas is not None:
+        config['SQLITE_PRAGMAS'] = pragmas
+    return create_app(config)
+
+
+def seed(app, rows: int, seed_value: int):
+    """Gera ``rows`` colaboradores determinísticos nos últimos 90 dias e monta o resumo."""
+    from app.models import Colaborador, ConfigList
+    from app.summary import rebuild_summary
+
+    with app.app_context():
+        lists = {}
+        for item in ConfigList.query.all():
+            lists.setdefault(item.nome_lista, []).append(item.valor)
+        for batch in colaborador_batches(rows, seed_value, days=90, end=date.today()):
+            db.session.execute(insert(Colaborador), batch)
+        rebuild_summary()
+        db.session.commit()
+        return lists
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def summarize(latencies, errors, seconds):
+    return {
+        'requisicoes': len(latencies),
+        'por_segundo': round(len(latencies) / seconds, 1),
+        'erros': errors,
+        'p50_ms': round(percentile(latencies, 0.50), 1),
+        'p95_ms': round(percentile(latencies, 0.95), 1),
+        'p99_ms': round(percentile(latencies, 0.99), 1),
+        'max_ms': round(max(latencies, default=0.0), 1),
+        f'acima_{SLOW_READ_MS}ms': sum(1 for value in latencies if value > SLOW_READ_MS),
+    }
+
+
+def _worker(kind, index, workdir, pragmas, lists, start_at, seconds, seed_value):
+    """Um processo lendo ou gravando de ``start_at`` até ``start_at + seconds``; devolve (latências, erros)."""
+    app = make_app(Path(workdir), pragmas)
+    client = app.test_client()
+    today = date.today()
+    period = f'min_data={(today - timedelta(days=29)).isoformat()}&max_data={today.isoformat()}'
+    read_urls = [f'/tabela?{period}', f'/api/painel/v1/summary?{period}']
+    rng = random.Random(seed_value * 1000 + index)
+    latencies, errors, sequence = [], 0, 0
+    time.sleep(max(0.0, start_at - time.time()))
+    while time.time() < start_at + seconds:
+        sequence += 1
+        started = time.perf_counter()
+        try:
+            if kind == 'leituras':
+                ok = client.get(read_urls[(index + sequence) % len(read_urls)]).status_code == 200
+            else:
+                ok = client.post('/alimentacao', data={
+                    'matricula': str(200000 + index * 100000 + sequence),
+                    'nome': f'INTEGRACAO {index}-{sequence}',
+                    'tipo': rng.choice(lists['tipo']),
+                    'setor': rng.choice(lists['setor']),
+                    'area': rng.choice(lists['area']),
+                    'turno': rng.choice(lists['turno']),
+                    'supervisor': f'SUPERVISOR {rng.randrange(12):02d}',
+                    'integracao': rng.choice(lists['integracao']),
+                    'data': today.isoformat(),
+                }).status_code == 302
+        except Exception:
+            ok = False
+        latencies.append((time.perf_counter() - started) * 1000)
+        errors += 0 if ok else 1
+    return latencies, errors
+
+
+def run_profile(name, pragmas, args):
+    # Um processo por leitor/gravador, como no servidor com vários processos (sem disputa do GIL)
+    with tempfile.TemporaryDirectory(prefix=f'bench-sqlite-{name}-') as tmp:
+        app = make_app(Path(tmp), pragmas)
+        lists = seed(app, args.rows, args.seed)
+        with app.app_context():
+            journal_mode = db.session.execute(db.text('PRAGMA journal_mode')).scalar()
+            db.session.remove()
+            db.engine.dispose()
+
+        jobs = [('leituras', i) for i in range(args.readers)] + [('gravacoes', i) for i in range(args.writers)]
+        # Tempo para cada processo montar o app antes de a medição começar
+        start_at = time.time() + args.warmup
+        results = {'leituras': ([], 0), 'gravacoes': ([], 0)}
+        with ProcessPoolExecutor(max_workers=len(jobs), mp_context=multiprocessing.get_context('spawn')) as executor:
+            futures = [
+                (kind, executor.submit(_worker, kind, index, tmp, pragmas, lists, start_at, args.seconds, args.seed))
+                for kind, index in jobs
+            ]
+            for kind, future in futures:
+                latencies, errors = future.result()
+                total_latencies, total_errors = results[kind]
+                results[kind] = (total_latencies + latencies, total_errors + errors)
+
+        return {
+            'journal_mode': journal_mode,
+            **{kind: summarize(latencies, errors, args.seconds) for kind, (latencies, errors) in results.items()},
+        }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--seconds', type=float, default=10.0, help='Duração de cada perfil (s)')
+    parser.add_argument('--readers', type=int, default=8, help='Processos lendo tabela e painel')
+    parser.add_argument('--writers', type=int, default=4, help='Processos gravando pelo formulário')
+    parser.add_argument('--warmup', type=float, default=5.0, help='Espera para os processos subirem o app (s)')
+    parser.add_argument('--rows', type=int, default=20000, help='Registros gerados antes da medição')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--profiles', default=','.join(PROFILES), help='Perfis a rodar (padrao,perfil)')
+    parser.add_argument('--json', help='Grava os resultados neste arquivo')
+    args = parser.parse_args(argv)
+
+    report = {
+        'parametros': {key: getattr(args, key) for key in ('seconds', 'readers', 'writers', 'rows', 'seed')},
+        'perfis': {},
+    }
+    for name in [item.strip() for item in args.profiles.split(',') if item.strip()]:
+        print(f'Perfil {name}...', flush=True)
+        report['perfis'][name] = run_profile(name, PROFILES[name], args)
+
+    columns = ('requisicoes', 'por_segundo', 'erros', 'p50_ms', 'p95_ms', 'p99_ms', 'max_ms', f'acima_{SLOW_READ_MS}ms')
+    print()
+    print(f"{'perfil':<8} {'journal':<8} {'tipo':<10} " + ' '.join(f'{column:>12}' for column in columns))
+    for name, result in report['perfis'].items():
+        for kind in ('leituras', 'gravacoes'):
+            values = ' '.join(f'{result[kind][column]:>12}' for column in columns)
+            print(f"{name:<8} {result['journal_mode']:<8} {kind:<10} {values}")
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding='utf-8')
+        print(f'\nResultados em {args.json}')
+
+
+if __name__ == '__main__':
+    main()
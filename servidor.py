@@ -1,9 +1,14 @@
 from app import create_app
 
 
-def main_cli(host: str = "0.0.0.0", port: int = 5000, debug: bool = True):
-    """Modo CLI tradicional (útil para desenvolvimento)."""
+def main_cli(host: str = "0.0.0.0", port: int = 5000, debug: bool = True, production: bool = False,
+             threads: int | None = None, processes: int | None = None):
+    """Modo CLI: servidor de desenvolvimento do Flask ou, com ``production``, o de produção (waitress)."""
     app = create_app()
+    if production:
+        from app.serving import serve
+        serve(app, host=host, port=port, threads=threads, processes=processes)
+        return
     app.run(host=host, port=port, debug=debug)
 
 
@@ -13,19 +18,19 @@ def main_gui(default_port: int = 5000):
     import webbrowser
     import socket
     import os
+    import sys
     import subprocess
     from tkinter import Tk, StringVar, IntVar, DISABLED, NORMAL
     from tkinter import ttk, messagebox
-    from werkzeug.serving import make_server
+    from app.serving import ProductionServer
 
     class ServerThread(threading.Thread):
-        def __init__(self, app, host: str, port: int):
+        """Servidor de produção (threads/processos) rodando fora da thread do Tk."""
+
+        def __init__(self, app, host: str, port: int, threads: int, processes: int):
             super().__init__(daemon=True)
-            self._host = host
-            self._port = port
-            self._server = make_server(host, port, app)
-            self._ctx = app.app_context()
-            self._ctx.push()
+            self._server = ProductionServer(app, host=host, port=port, threads=threads, processes=processes)
+            print(self._server.summary(), flush=True)
 
         def run(self):
             self._server.serve_forever()
@@ -35,7 +40,12 @@ def main_gui(default_port: int = 5000):
 
         @property
         def url(self) -> str:
-            return f"http://{self._host}:{self._port}"
+            return self._server.url
+
+        @property
+        def workers(self) -> str:
+            options = self._server.options
+            return f"{options['processes']} processo(s) × {options['threads']} threads"
 
     def port_available(port: int) -> bool:
         with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
@@ -50,8 +60,8 @@ def main_gui(default_port: int = 5000):
 
     root = Tk()
     root.title("QUALIDADE Integração - Painel")
-    root.geometry("560x260")
-    root.minsize(520, 240)
+    root.geometry("620x300")
+    root.minsize(580, 280)
 
     style = ttk.Style()
     try:
@@ -78,6 +88,9 @@ def main_gui(default_port: int = 5000):
     status_var = StringVar(value="Parado")
     url_var = StringVar(value="—")
     port_var = IntVar(value=default_port)
+    threads_var = IntVar(value=app.config.get('SERVER_THREADS', 8))
+    processes_var = IntVar(value=app.config.get('SERVER_PROCESSES', 1))
+    workers_var = StringVar(value="—")
     btn_state = {"server": None}
     server_thread: ServerThread | None = None
 
@@ -111,6 +124,14 @@ def main_gui(default_port: int = 5000):
     stop_btn.grid(row=0, column=3)
     open_btn.grid(row=0, column=5, padx=(8, 0))
 
+    # Threads por processo e processos do servidor de produção
+    ttk.Label(controls, text="Threads:").grid(row=1, column=0, padx=(0, 6), pady=(8, 0), sticky='w')
+    threads_entry = ttk.Spinbox(controls, from_=1, to=64, textvariable=threads_var, width=8)
+    threads_entry.grid(row=1, column=1, pady=(8, 0))
+    ttk.Label(controls, text="Processos:").grid(row=1, column=2, padx=8, pady=(8, 0), sticky='e')
+    processes_entry = ttk.Spinbox(controls, from_=1, to=max(1, os.cpu_count() or 1), textvariable=processes_var, width=6)
+    processes_entry.grid(row=1, column=3, pady=(8, 0), sticky='w')
+
     # Status
     status_frame = ttk.Frame(container)
     status_frame.grid(row=3, column=0, sticky='ew')
@@ -124,6 +145,9 @@ def main_gui(default_port: int = 5000):
     url_label = ttk.Label(status_frame, textvariable=url_var, foreground=primary)
     url_label.grid(row=1, column=1, columnspan=2, padx=(6, 0), pady=(6, 0), sticky='w')
 
+    ttk.Label(status_frame, text="Workers:").grid(row=2, column=0, sticky='w', pady=(6, 0))
+    ttk.Label(status_frame, textvariable=workers_var).grid(row=2, column=1, columnspan=4, padx=(6, 0), pady=(6, 0), sticky='w')
+
     copy_btn = ttk.Button(status_frame, text="Copiar URL", style='Primary.TButton')
     copy_btn.grid(row=1, column=3, padx=(8, 0), pady=(6, 0), sticky='w')
 
@@ -136,10 +160,12 @@ def main_gui(default_port: int = 5000):
         status_var.set("Rodando" if running else "Parado")
         if url:
             url_var.set(url)
+        workers_var.set(server_thread.workers if running and server_thread is not None else "—")
         open_btn.config(state=NORMAL if running else DISABLED)
         stop_btn.config(state=NORMAL if running else DISABLED)
         start_btn.config(state=DISABLED if running else NORMAL)
-        port_entry.config(state=DISABLED if running else NORMAL)
+        for entry in (port_entry, threads_entry, processes_entry):
+            entry.config(state=DISABLED if running else NORMAL)
         status_dot.config(foreground=primary if running else danger)
 
     def on_start():
@@ -149,7 +175,8 @@ def main_gui(default_port: int = 5000):
             messagebox.showerror("Porta ocupada", f"A porta {port} já está em uso. Escolha outra.")
             return
         try:
-            server_thread = ServerThread(app, host="127.0.0.1", port=port)
+            server_thread = ServerThread(app, host="127.0.0.1", port=port,
+                                         threads=int(threads_var.get()), processes=int(processes_var.get()))
             server_thread.start()
             set_running(True, server_thread.url)
         except Exception as e:
@@ -159,6 +186,10 @@ def main_gui(default_port: int = 5000):
     def on_stop():
         nonlocal server_thread
         if server_thread is not None:
+            # Encerramento gracioso: espera as requisições em andamento terminarem
+            status_var.set("Encerrando...")
+            stop_btn.config(state=DISABLED)
+            root.update_idletasks()
             try:
                 server_thread.shutdown()
             except Exception:
@@ -212,14 +243,22 @@ def main_gui(default_port: int = 5000):
 
 if __name__ == "__main__":
     import argparse
+    import multiprocessing
+    # Pool de processos dos jobs de importação no executável empacotado (Windows)
+    multiprocessing.freeze_support()
     parser = argparse.ArgumentParser(description="QUALIDADE Integração - Servidor")
     parser.add_argument("--cli", action="store_true", help="Rodar no modo console tradicional")
     parser.add_argument("--host", default="0.0.0.0")
     parser.add_argument("--port", type=int, default=5000)
     parser.add_argument("--debug", action="store_true")
+    parser.add_argument("--production", action="store_true",
+                        help="No modo console, usar o servidor de produção (waitress) em vez do servidor do Flask")
+    parser.add_argument("--threads", type=int, help="Threads por processo do servidor de produção (SERVER_THREADS)")
+    parser.add_argument("--processes", type=int, help="Processos do servidor de produção (SERVER_PROCESSES)")
     args = parser.parse_args()
 
     if args.cli:
-        main_cli(host=args.host, port=args.port, debug=args.debug)
+        main_cli(host=args.host, port=args.port, debug=args.debug, production=args.production,
+                 threads=args.threads, processes=args.processes)
     else:
         main_gui(default_port=args.port)
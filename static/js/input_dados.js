@@ -1,4 +1,4 @@
-// Input*Dados - JS exclusivo da página para validação leve do upload
+// Input*Dados - JS exclusivo da página: validação leve do upload e acompanhamento do processamento
 (function(){
   document.addEventListener('DOMContentLoaded', function(){
     const form = document.querySelector('form[data-loading="true"][action*="/input-dados"]') || document.querySelector('form[action*="/input-dados"]');
@@ -55,6 +55,54 @@
 
     fileInput?.addEventListener('change', validate);
 
+    // Acompanhamento do job de importação (o upload só agenda o processamento)
+    const stageLabels = {
+      queued: 'Na fila',
+      reading: 'Lendo planilhas',
+      normalizing: 'Normalizando',
+      merging: 'Cruzando com o banco',
+      publishing: 'Publicando',
+    };
+    const loadingText = document.querySelector('#loadingOverlay .loading-text');
+
+    function showStage(status){
+      const label = stageLabels[status.stage || status.state] || 'Processando';
+      const text = status.current_file ? `${label}: ${status.current_file}` : label;
+      if(loadingText){ loadingText.textContent = text; }
+      const stageEl = document.querySelector('[data-job-stage]');
+      if(stageEl){ stageEl.textContent = label; }
+      const fileEl = document.querySelector('[data-job-file]');
+      if(fileEl){ fileEl.textContent = status.current_file || ''; }
+    }
+
+    function pollJob(statusUrl, resultUrl){
+      if(window.AppLoading){ window.AppLoading.show(); }
+      const tick = function(){
+        fetch(statusUrl, { headers: { 'Accept': 'application/json' } })
+          .then((resp) => resp.json().then((data) => ({ ok: resp.ok, data })))
+          .then(({ ok, data }) => {
+            if(!ok){ window.location.href = resultUrl; return; }
+            showStage(data);
+            if(data.state === 'done' || data.state === 'failed'){
+              window.location.href = data.result_url || resultUrl;
+              return;
+            }
+            setTimeout(tick, 800);
+          })
+          .catch(() => setTimeout(tick, 2000));
+      };
+      tick();
+    }
+
+    function resetSubmit(message){
+      if(window.AppLoading){ window.AppLoading.hide(); }
+      if(submitBtn){ submitBtn.disabled = false; submitBtn.classList.remove('disabled'); }
+      if(feedback && message){
+        feedback.textContent = message;
+        feedback.classList.add('text-danger');
+      }
+    }
+
     form.addEventListener('submit', function(ev){
       // valida de novo no submit
       if(!validate()){
@@ -64,7 +112,31 @@
       }
       // evita duplo submit
       if(submitBtn){ submitBtn.disabled = true; submitBtn.classList.add('disabled'); }
-      return true;
+      if(!window.fetch || !window.FormData){ return true; }
+
+      ev.preventDefault();
+      fetch(form.action, {
+        method: 'POST',
+        body: new FormData(form),
+        headers: { 'Accept': 'application/json' },
+      })
+        .then((resp) => resp.json().then((data) => ({ ok: resp.ok, data })))
+        .then(({ ok, data }) => {
+          if(!ok || !data.status_url){
+            resetSubmit(data.error || 'Falha ao enviar os arquivos.');
+            return;
+          }
+          showStage({ state: 'queued' });
+          pollJob(data.status_url, data.result_url);
+        })
+        .catch(() => resetSubmit('Falha ao enviar os arquivos. Tente novamente.'));
+      return false;
     }, true);
+
+    // Página aberta com um job ainda em andamento (envio sem JavaScript ou recarga)
+    const jobCard = document.getElementById('ingestJob');
+    if(jobCard && jobCard.dataset.jobStatusUrl){
+      pollJob(jobCard.dataset.jobStatusUrl, jobCard.dataset.jobResultUrl);
+    }
   });
 })();
@@ -14,26 +14,52 @@
     }
   }
 
-  const SETOR_LABELS = readJson('data-setor-labels', []);
-  const SETOR_SERIES = readJson('data-setor-series', []);
-  const TIPO_LABELS = readJson('data-tipo-labels', []);
-  const TIPO_SERIES = readJson('data-tipo-series', []);
-  const TURNO_LABELS = readJson('data-turno-labels', []);
-  const TURNO_SERIES = readJson('data-turno-series', []);
-  const STACKED_CATEGORIES = readJson('data-stacked-categories', []);
-  const STACKED_SERIES = readJson('data-stacked-series', []);
-  const maxVal = Math.max(0, ...TIPO_SERIES);
-  const maxIndex = TIPO_SERIES.findIndex((value) => value === maxVal);
-  const TIMELINE = readJson('data-timeline', []);
-  const MERGE_COLAB_PERCENT = readJson('data-merge-colab-percent', null);
-  const MERGE_TURNOS = readJson('data-merge-turnos', null);
-  const MERGE_HC_DATA = readJson('data-merge-hc', null);
-  const AVAILABLE_SETORES = readJson('data-available-setores', []);
-  const AVAILABLE_TIPOS = readJson('data-available-tipos', []);
-  const AVAILABLE_SUPERVISORES = readJson('data-available-supervisores', []);
-  const SELECTED_SETOR = readJson('data-selected-setor', 'all');
-  const SELECTED_TIPO = readJson('data-selected-tipo', 'all');
-  const SELECTED_SUPERVISOR = readJson('data-selected-supervisor', 'all');
+  // Os blocos JSON vêm com o fragmento de cada aba; são relidos quando ele é carregado
+  let SETOR_LABELS = [];
+  let SETOR_SERIES = [];
+  let TIPO_LABELS = [];
+  let TIPO_SERIES = [];
+  let TURNO_LABELS = [];
+  let TURNO_SERIES = [];
+  let STACKED_CATEGORIES = [];
+  let STACKED_SERIES = [];
+  let TIMELINE = [];
+  let MERGE_COLAB_PERCENT = null;
+  let MERGE_TURNOS = null;
+  let MERGE_HC_DATA = null;
+  let AVAILABLE_SETORES = [];
+  let AVAILABLE_TIPOS = [];
+  let AVAILABLE_SUPERVISORES = [];
+  let SELECTED_SETOR = 'all';
+  let SELECTED_TIPO = 'all';
+  let SELECTED_SUPERVISOR = 'all';
+
+  function loadRegistrosData() {
+    SETOR_LABELS = readJson('data-setor-labels', []);
+    SETOR_SERIES = readJson('data-setor-series', []);
+    TIPO_LABELS = readJson('data-tipo-labels', []);
+    TIPO_SERIES = readJson('data-tipo-series', []);
+    TURNO_LABELS = readJson('data-turno-labels', []);
+    TURNO_SERIES = readJson('data-turno-series', []);
+    STACKED_CATEGORIES = readJson('data-stacked-categories', []);
+    STACKED_SERIES = readJson('data-stacked-series', []);
+    TIMELINE = readJson('data-timeline', []);
+    AVAILABLE_SETORES = readJson('data-available-setores', []);
+    AVAILABLE_TIPOS = readJson('data-available-tipos', []);
+    AVAILABLE_SUPERVISORES = readJson('data-available-supervisores', []);
+    SELECTED_SETOR = readJson('data-selected-setor', 'all');
+    SELECTED_TIPO = readJson('data-selected-tipo', 'all');
+    SELECTED_SUPERVISOR = readJson('data-selected-supervisor', 'all');
+  }
+
+  function loadMergeData() {
+    MERGE_COLAB_PERCENT = readJson('data-merge-colab-percent', null);
+    MERGE_TURNOS = readJson('data-merge-turnos', null);
+    MERGE_HC_DATA = readJson('data-merge-hc', null);
+  }
+
+  loadRegistrosData();
+  loadMergeData();
 
   let chartDefaultsApplied = false;
 
@@ -2080,6 +2106,27 @@
     window.AppPanel.mergeMounted = true;
   }
 
+  function registrosPaletteSize() {
+    return Math.max(
+      TIPO_SERIES.length,
+      TURNO_SERIES.length,
+      STACKED_SERIES.length,
+      6
+    );
+  }
+
+  function buildRegistrosPalette(mode) {
+    const paletteBase = [
+      getCssVar('--accent-color', '#3498db'),
+      getCssVar('--accent-hover', '#2980b9'),
+      getCssVar('--success-color', '#27ae60'),
+      getCssVar('--warning-color', '#f39c12'),
+      getCssVar('--danger-color', '#e74c3c'),
+      getCssVar('--primary-color', '#2c3e50')
+    ];
+    return buildPalette(registrosPaletteSize(), paletteBase, mode);
+  }
+
   function mountCharts() {
     if (!ensureChartSetup()) return;
 
@@ -2102,7 +2149,7 @@
             <div class="badge bg-primary bg-opacity-10 text-primary px-2 py-1" style="font-size: 0.7rem; font-weight: 600;">Barras</div>
           </div>
           <div class="card-body">
-            <div class="chart-wrapper" style="height: 360px;">
+            <div class="chart-wrapper" style="height: 360px;" data-registros-chart="tipo">
               <canvas id="chart-tipo"></canvas>
             </div>
           </div>
@@ -2118,7 +2165,7 @@
             <div class="badge bg-success bg-opacity-10 text-success px-2 py-1" style="font-size: 0.7rem; font-weight: 600;">Donut</div>
           </div>
           <div class="card-body">
-            <div class="chart-wrapper" style="height: 360px;">
+            <div class="chart-wrapper" style="height: 360px;" data-registros-chart="turno">
               <canvas id="chart-turno"></canvas>
             </div>
           </div>
@@ -2134,7 +2181,7 @@
             <div class="badge bg-warning bg-opacity-10 text-warning px-2 py-1" style="font-size: 0.7rem; font-weight: 600;">Barras</div>
           </div>
           <div class="card-body">
-            <div class="chart-wrapper" style="height: 380px;">
+            <div class="chart-wrapper" style="height: 380px;" data-registros-chart="setor">
               <canvas id="chart-setor"></canvas>
             </div>
           </div>
@@ -2167,7 +2214,7 @@
             </div>
           </div>
           <div class="card-body">
-            <div class="chart-wrapper" style="height: 420px;">
+            <div class="chart-wrapper" style="height: 420px;" data-registros-chart="timeline">
               <canvas id="chart-timeline"></canvas>
             </div>
           </div>
@@ -2177,24 +2224,7 @@
     target.appendChild(timelineRow);
 
     const mode = document.documentElement.dataset.bsTheme === 'dark' ? 'dark' : 'light';
-    const paletteBase = [
-      getCssVar('--accent-color', '#3498db'),
-      getCssVar('--accent-hover', '#2980b9'),
-      getCssVar('--success-color', '#27ae60'),
-      getCssVar('--warning-color', '#f39c12'),
-      getCssVar('--danger-color', '#e74c3c'),
-      getCssVar('--primary-color', '#2c3e50')
-    ];
-    const palette = buildPalette(
-      Math.max(
-        TIPO_SERIES.length,
-        TURNO_SERIES.length,
-        STACKED_SERIES.length,
-        6
-      ),
-      paletteBase,
-      mode
-    );
+    const palette = buildRegistrosPalette(mode);
 
     const tipoCtx = document.getElementById('chart-tipo').getContext('2d');
     const turnoCtx = document.getElementById('chart-turno').getContext('2d');
@@ -2256,7 +2286,130 @@
       params.set('setor', document.getElementById('flt-setor')?.value || 'all');
       params.set('tipo', document.getElementById('flt-tipo')?.value || 'all');
       params.set('supervisor', document.getElementById('flt-supervisor')?.value || 'all');
+      refreshRegistros(params);
+    });
+  }
+
+  // Gráficos da aba Registros: cada um com o campo da API (/api/painel/v1) de que depende
+  const REGISTROS_CHARTS = {
+    tipo: { canvas: 'chart-tipo', render: renderTipoChart },
+    turno: { canvas: 'chart-turno', render: renderTurnoChart },
+    setor: { canvas: 'chart-setor', render: renderSetorChart },
+    timeline: { canvas: 'chart-timeline', render: renderTimelineChart }
+  };
+
+  function registrosSnapshot() {
+    return {
+      tipo: JSON.stringify([TIPO_LABELS, TIPO_SERIES]),
+      turno: JSON.stringify([TURNO_LABELS, TURNO_SERIES]),
+      setor: JSON.stringify([STACKED_CATEGORIES, STACKED_SERIES]),
+      timeline: JSON.stringify(TIMELINE)
+    };
+  }
+
+  function rerenderRegistrosChart(key, palette, mode) {
+    const config = REGISTROS_CHARTS[key];
+    const wrapper = document.querySelector(`[data-registros-chart="${key}"]`);
+    if (!config || !wrapper) return;
+    const current = window.AppPanel.charts[key];
+    if (current && typeof current.destroy === 'function') {
+      try {
+        current.destroy();
+      } catch (err) {
+        console.warn(`Falha ao destruir gráfico ${key}`, err);
+      }
+    }
+    delete window.AppPanel.charts[key];
+    // O render pode ter trocado o canvas por uma mensagem de "sem dados"
+    wrapper.innerHTML = `<canvas id="${config.canvas}"></canvas>`;
+    const chart = config.render(wrapper.querySelector('canvas').getContext('2d'), palette, mode);
+    if (chart) {
+      window.AppPanel.charts[key] = chart;
+    }
+  }
+
+  function applyRegistrosData(summary, timeline) {
+    const before = registrosSnapshot();
+    const paletteSizeBefore = registrosPaletteSize();
+
+    TIPO_LABELS = summary.tipo.labels;
+    TIPO_SERIES = summary.tipo.series;
+    TURNO_LABELS = summary.turno.labels;
+    TURNO_SERIES = summary.turno.series;
+    SETOR_LABELS = summary.setor.labels;
+    SETOR_SERIES = summary.setor.series;
+    STACKED_CATEGORIES = summary.stacked.categories;
+    STACKED_SERIES = summary.stacked.series;
+    TIMELINE = timeline.points;
+    AVAILABLE_SETORES = summary.filtros.setores;
+    AVAILABLE_TIPOS = summary.filtros.tipos;
+    AVAILABLE_SUPERVISORES = summary.filtros.supervisores;
+    SELECTED_SETOR = summary.filtros.setor;
+    SELECTED_TIPO = summary.filtros.tipo;
+    SELECTED_SUPERVISOR = summary.filtros.supervisor;
+
+    const total = document.getElementById('total-colaboradores');
+    if (total) {
+      total.textContent = summary.total;
+    }
+    populateTimelineFilters();
+
+    if (!window.AppPanel.mounted || !ensureChartSetup()) return;
+    const after = registrosSnapshot();
+    // Com outra quantidade de cores a paleta muda e todos os gráficos são refeitos
+    const paletteChanged = registrosPaletteSize() !== paletteSizeBefore;
+    const mode = document.documentElement.dataset.bsTheme === 'dark' ? 'dark' : 'light';
+    const palette = buildRegistrosPalette(mode);
+    Object.keys(REGISTROS_CHARTS).forEach((key) => {
+      if (paletteChanged || before[key] !== after[key]) {
+        rerenderRegistrosChart(key, palette, mode);
+      }
+    });
+  }
+
+  let registrosRequest = 0;
+
+  async function refreshRegistros(params) {
+    const form = document.getElementById('registros-filtros');
+    const apiUrl = form?.dataset.apiUrl;
+    if (!apiUrl || typeof window.fetch !== 'function') {
       window.location.search = params.toString();
+      return;
+    }
+    const requestId = ++registrosRequest;
+    const apiParams = new URLSearchParams(params);
+    apiParams.set('sections', 'summary,timeline');
+    form.setAttribute('aria-busy', 'true');
+    try {
+      const response = await fetch(`${apiUrl}?${apiParams.toString()}`, { headers: { Accept: 'application/json' } });
+      if (!response.ok) {
+        throw new Error(`HTTP ${response.status}`);
+      }
+      const data = await response.json();
+      if (requestId !== registrosRequest) return;
+      applyRegistrosData(data.summary, data.timeline);
+      const queryString = params.toString();
+      window.history.replaceState({}, '', `${window.location.pathname}${queryString ? `?${queryString}` : ''}${window.location.hash}`);
+    } catch (err) {
+      console.warn('Falha ao atualizar os consolidados pela API; recarregando a página.', err);
+      window.location.search = params.toString();
+    } finally {
+      if (requestId === registrosRequest) {
+        form.removeAttribute('aria-busy');
+      }
+    }
+  }
+
+  function setupRegistrosFilters() {
+    const form = document.getElementById('registros-filtros');
+    if (!form) return;
+    form.addEventListener('submit', (event) => {
+      event.preventDefault();
+      const params = new URLSearchParams(window.location.search);
+      new FormData(form).forEach((value, key) => {
+        params.set(key, value);
+      });
+      refreshRegistros(params);
     });
   }
 
@@ -2302,6 +2455,7 @@
         const queryString = params.toString();
         const newUrl = `${window.location.pathname}${queryString ? `?${queryString}` : ''}${window.location.hash}`;
         window.history.replaceState({}, '', newUrl);
+        loadFragment(selectedFilter);
       }
     };
 
@@ -2316,8 +2470,8 @@
     selectFilter(requestedFilter, false);
   }
 
-  function setupTableControls() {
-    const forms = Array.from(document.querySelectorAll('[data-table-control-form]'));
+  function setupTableControls(root = document) {
+    const forms = Array.from(root.querySelectorAll('[data-table-control-form]'));
     if (!forms.length) return;
 
     forms.forEach((form) => {
@@ -2480,6 +2634,62 @@
     });
   }
 
+  function currentInputFragment() {
+    return new URLSearchParams(window.location.search).get('input_filter') === 'hc' ? 'hc' : 'separacao';
+  }
+
+  function onFragmentLoaded(name, holder) {
+    if (name === 'registros') {
+      loadRegistrosData();
+      mountCharts();
+      setupRegistrosFilters();
+      setupDashboardExport();
+    } else if (name === 'merge') {
+      loadMergeData();
+      const mergeTab = document.getElementById('tab-merge');
+      if (mergeTab && !mergeTab.classList.contains('d-none')) {
+        mountMergeCharts(true);
+      }
+    } else {
+      setupTableControls(holder);
+    }
+  }
+
+  async function loadFragment(name) {
+    const holder = document.querySelector(`[data-painel-fragment="${name}"]`);
+    if (!holder || holder.dataset.loaded === 'true' || holder.dataset.loading === 'true') return;
+    holder.dataset.loading = 'true';
+    // A URL foi montada com os filtros da página; vale o que estiver na barra de endereço agora
+    const url = new URL(holder.dataset.fragmentUrl, window.location.origin);
+    url.search = window.location.search;
+    try {
+      const response = await fetch(url, { headers: { Accept: 'text/html' } });
+      if (!response.ok) throw new Error(`HTTP ${response.status}`);
+      holder.innerHTML = await response.text();
+      holder.dataset.loaded = 'true';
+      onFragmentLoaded(name, holder);
+    } catch (err) {
+      console.error(`Falha ao carregar a aba ${name}:`, err);
+      holder.innerHTML = `
+        <div class="alert alert-danger d-flex align-items-center gap-2" role="alert">
+          <i class="bi bi-exclamation-triangle"></i>
+          Não foi possível carregar esta aba. <a href="${window.location.href}" class="alert-link">Recarregue a página</a>.
+        </div>`;
+    } finally {
+      delete holder.dataset.loading;
+    }
+  }
+
+  function loadTabFragments(selector) {
+    if (selector === '#tab-registros') {
+      loadFragment('registros');
+    } else if (selector === '#tab-input') {
+      loadFragment(currentInputFragment());
+    } else if (selector === '#tab-merge') {
+      loadFragment('merge');
+    }
+  }
+
   function setupTabs() {
     if (window.AppPanel.tabsBound) return;
     const buttons = Array.from(document.querySelectorAll('.card-header .btn-group [data-target]'));
@@ -2527,6 +2737,7 @@
         window.history.replaceState({}, '', newUrl);
       }
 
+      loadTabFragments(selector);
       if (selector === '#tab-merge') {
         mountMergeCharts();
       }
@@ -2558,6 +2769,7 @@
   document.addEventListener('DOMContentLoaded', () => {
     setupTabs();
     mountCharts();
+    setupRegistrosFilters();
     setupInputFilters();
     setupTableControls();
     setupDashboardExport();
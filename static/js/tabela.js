@@ -60,4 +60,118 @@
       setTimeout(() => window.AppLoading.show(), 0);
     }, { once: false });
   }
+  // 4) Ações em lote: marca registros e altera/exclui todos em uma requisição (/api/colaboradores/lote)
+  const toolbar = document.getElementById('batch-toolbar');
+  if (toolbar) {
+    const apiUrl = toolbar.dataset.apiUrl;
+    const selectAll = document.querySelector('[data-batch-select-all]');
+    const boxes = Array.from(document.querySelectorAll('[data-batch-select]'));
+    const countEl = toolbar.querySelector('[data-batch-count]');
+    const fieldSelect = toolbar.querySelector('[data-batch-field]');
+    const valueSlot = toolbar.querySelector('[data-batch-value]');
+    let lists = {};
+    try {
+      lists = JSON.parse(document.getElementById('batch-lists').textContent || '{}');
+    } catch (_) {}
+
+    const selected = () => boxes.filter((box) => box.checked);
+
+    const refresh = () => {
+      const total = selected().length;
+      countEl.textContent = String(total);
+      toolbar.classList.toggle('d-none', total === 0);
+      if (selectAll) {
+        selectAll.checked = total > 0 && total === boxes.length;
+        selectAll.indeterminate = total > 0 && total < boxes.length;
+      }
+    };
+
+    // Campo de valor conforme o campo escolhido: lista, data ou texto
+    const renderValueInput = () => {
+      const field = fieldSelect.value;
+      let input;
+      if (Array.isArray(lists[field])) {
+        input = document.createElement('select');
+        input.className = 'form-select form-select-sm';
+        lists[field].forEach((value) => input.add(new Option(value, value)));
+      } else {
+        input = document.createElement('input');
+        input.className = 'form-control form-control-sm';
+        input.type = field === 'data' ? 'date' : 'text';
+        if (field === 'supervisor') input.placeholder = 'Novo supervisor';
+        if (field === 'observacao') input.placeholder = 'Vazio remove a observação';
+      }
+      input.setAttribute('data-batch-input', '');
+      input.setAttribute('aria-label', 'Novo valor');
+      valueSlot.replaceChildren(input);
+    };
+
+    const send = async (payload, button) => {
+      button.disabled = true;
+      if (window.AppLoading && typeof window.AppLoading.show === 'function') window.AppLoading.show();
+      try {
+        const res = await fetch(apiUrl, {
+          method: 'POST',
+          headers: { 'Content-Type': 'application/json' },
+          body: JSON.stringify(payload),
+        });
+        const data = await res.json().catch(() => ({}));
+        if (!res.ok) {
+          const details = (data.erros || []).slice(0, 10).join('\n');
+          const conflicts = (data.conflitos || []).map((c) => c.id).slice(0, 20).join(', ');
+          let message = data.error || `Falha ao gravar (HTTP ${res.status}).`;
+          if (details) message += `\n\n${details}`;
+          if (conflicts) message += `\n\nRegistros em conflito: ${conflicts}`;
+          window.alert(message);
+          if (res.status === 409) window.location.reload();
+          return;
+        }
+        window.location.reload();
+      } catch (err) {
+        window.alert(`Falha ao gravar: ${err}`);
+      } finally {
+        button.disabled = false;
+        if (window.AppLoading && typeof window.AppLoading.hide === 'function') window.AppLoading.hide();
+      }
+    };
+
+    const items = () => selected().map((box) => ({ id: Number(box.value), versao: Number(box.dataset.versao) }));
+
+    boxes.forEach((box) => box.addEventListener('change', refresh));
+    if (selectAll) {
+      selectAll.addEventListener('change', () => {
+        boxes.forEach((box) => { box.checked = selectAll.checked; });
+        refresh();
+      });
+    }
+    fieldSelect.addEventListener('change', renderValueInput);
+    toolbar.querySelector('[data-batch-clear]').addEventListener('click', () => {
+      boxes.forEach((box) => { box.checked = false; });
+      refresh();
+    });
+
+    toolbar.querySelector('[data-batch-apply]').addEventListener('click', (e) => {
+      const field = fieldSelect.value;
+      const input = valueSlot.querySelector('[data-batch-input]');
+      const value = input ? input.value.trim() : '';
+      if (!value && field !== 'observacao') {
+        window.alert('Informe o novo valor.');
+        return;
+      }
+      const label = fieldSelect.options[fieldSelect.selectedIndex].text;
+      const rows = items();
+      if (!window.confirm(`Alterar ${label} para "${value}" em ${rows.length} registro(s)?`)) return;
+      const payload = { atualizar: rows.map((item) => ({ ...item, campos: { [field]: value } })) };
+      send(payload, e.currentTarget);
+    });
+
+    toolbar.querySelector('[data-batch-delete]').addEventListener('click', (e) => {
+      const rows = items();
+      if (!window.confirm(`⚠️ Confirma excluir ${rows.length} registro(s)?`)) return;
+      send({ excluir: rows }, e.currentTarget);
+    });
+
+    renderValueInput();
+    refresh();
+  }
 })();
@@ -0,0 +1,36 @@
+"""Validação do corpo de ``POST /api/colaboradores/lote`` (``app/batch.py``)."""
+import pytest
+
+from app.batch import BatchError, parse_batch
+
+
+LISTS = {field: {} for field in ('tipo', 'setor', 'area', 'turno', 'integracao')}
+
+
+class Unprintable:
+    def __str__(self):
+        raise TypeError('sem texto')
+
+
+def _update(campos):
+    return {'atualizar': [{'id': 1, 'versao': 1, 'campos': campos}]}
+
+
+@pytest.mark.parametrize('value', [
+    'inf', '-Infinity', float('inf'), 10 ** 400,
+    '12.7', 12.7, '1e3', '1e30', 1e30, '99999999999999999999', 2 ** 63,
+])
+def test_invalid_matricula_is_a_batch_error(value):
+    with pytest.raises(BatchError) as info:
+        parse_batch(_update({'matricula': value}), LISTS)
+    assert info.value.errors == [f"atualizar[0] (id 1): Matrícula inválida: '{value}'"]
+
+
+def test_conversion_error_is_a_batch_error():
+    with pytest.raises(BatchError) as info:
+        parse_batch(_update({'nome': Unprintable()}), LISTS)
+    assert info.value.errors == ['atualizar[0] (id 1): Valor inválido para Nome (sem texto)']
+
+
+def test_valid_matricula_passes():
+    assert parse_batch(_update({'matricula': ' 00123 '}), LISTS) == ([(1, 1, {'matricula': 123})], [])
@@ -0,0 +1,52 @@
+"""Regras de cada campo na importação em lote (``app/bulk_import.py``)."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.bulk_import import MATRICULA_MAX, _fold, clean_value, validate_rows
+
+
+# Como ``load_lists()``: valor dobrado -> valor cadastrado
+LISTS = {
+    field: {_fold(value): value}
+    for field, value in (('tipo', 'TALKMAN'), ('setor', 'Expedição'), ('area', 'MOD A'),
+                         ('turno', '1° Turno'), ('integracao', 'Integração'))
+}
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('12345', 12345),
+    (' 00123 ', 123),
+    ('+7', 7),
+    ('123.0', 123),
+    (123, 123),
+    (np.int64(123), 123),
+    (123.0, 123),
+    (str(MATRICULA_MAX), MATRICULA_MAX),
+])
+def test_matricula_accepts_exact_integers(value, expected):
+    assert clean_value('matricula', value, LISTS) == (expected, None)
+
+
+@pytest.mark.parametrize('value', [
+    '12.7', 12.7, '1e3', '1E3', 1e30, '1_000', '0', '-5', 0, True, 'inf', float('nan'), '', None,
+    '99999999999999999999', str(MATRICULA_MAX + 1), MATRICULA_MAX + 1,
+])
+def test_matricula_rejects_fractions_exponents_and_out_of_range(value):
+    matricula, problem = clean_value('matricula', value, LISTS)
+    assert matricula is None
+    assert problem.startswith('Matrícula inválida')
+
+
+def test_out_of_range_matricula_is_a_row_error():
+    row = {'data': '2025-10-01', 'nome': 'TESTE', 'tipo': 'talkman', 'setor': 'expedicao', 'area': 'mod a',
+           'turno': '1° Turno', 'supervisor': 'fulano', 'integracao': 'integracao', 'observacao': ''}
+    df = pd.DataFrame([{**row, 'matricula': '99999999999999999999'}, {**row, 'matricula': '12.7'},
+                       {**row, 'matricula': '1e3'}, {**row, 'matricula': '42'}], dtype=object)
+    records, errors = validate_rows(df, LISTS)
+    assert [record['matricula'] for record in records] == [42]
+    assert errors == [
+        (2, "Matrícula inválida: '99999999999999999999'"),
+        (3, "Matrícula inválida: '12.7'"),
+        (4, "Matrícula inválida: '1e3'"),
+    ]
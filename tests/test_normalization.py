@@ -0,0 +1,130 @@
+"""As versões ``*_series`` de ``app/normalization.py`` devem dar exatamente o
+mesmo resultado de ``Series.apply`` com a função escalar, inclusive o dtype.
+
+Confere colunas com os casos de borda das regras e, se existirem, as colunas
+das planilhas antigas em ``instance/last_*_planilha.pkl``.
+
+    python -m pytest tests/test_normalization.py
+"""
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.normalization import (
+    clean_execucao,
+    clean_execucao_series,
+    is_execucao_sim,
+    is_execucao_sim_series,
+    normalize_execucao,
+    normalize_execucao_category,
+    normalize_execucao_category_series,
+    normalize_execucao_series,
+    normalize_matricula,
+    normalize_matricula_series,
+    normalize_situacao_hc,
+    normalize_situacao_hc_series,
+    normalize_turno_label,
+    normalize_turno_label_series,
+)
+
+
+INSTANCE_DIR = Path(__file__).resolve().parent.parent / 'instance'
+
+SERIES_FUNCTIONS = {
+    'normalize_matricula': (normalize_matricula, normalize_matricula_series),
+    'normalize_situacao_hc': (normalize_situacao_hc, normalize_situacao_hc_series),
+    'normalize_execucao': (normalize_execucao, normalize_execucao_series),
+    'is_execucao_sim': (is_execucao_sim, is_execucao_sim_series),
+    'normalize_turno_label': (normalize_turno_label, normalize_turno_label_series),
+    'clean_execucao': (clean_execucao, clean_execucao_series),
+    'normalize_execucao_category': (normalize_execucao_category, normalize_execucao_category_series),
+}
+
+
+def sample_series() -> dict:
+    """Colunas com os casos de borda das regras (nulos, números, grafias, acentos)."""
+    texts = [
+        'Sim', 'sim ', ' SIM', 'Não', 'nao', 'NÃO', 'Sim, pendente', 'sem execução', 'Assim', '100% Sim',
+        'Atividade Normal', 'ATIVIDADE  NORMAL', 'Afastamento INSS', 'Férias', 'FERIAS', 'Rescisão', 'N/D',
+        'n\\a', 'N A', 'Sem Informação', 'sem dados', 'Outro', '1º Turno', '2° turno', 'Turno 1', 'primeiro',
+        '3º Turno', 'Segundo Turno', '  ', '', 'nan', 'None', 'NULL', '0', '12345', ' 00123 ', '12.7', '-5',
+        '1e3', '1_000', 'inf texto', 'inf', '-Infinity', 'Ç', 'ªº',
+    ]
+    mixed = texts + [None, np.nan, pd.NaT, pd.NA, 0, 1, 1.0, True, False, -0.0, 0.0, 2.5, 10 ** 20, np.int64(7), np.inf]
+    return {
+        'texto': pd.Series(texts * 3, dtype=object),
+        'texto_com_nulos': pd.Series((texts + [None, np.nan]) * 3, dtype=object),
+        'misto': pd.Series(mixed * 2, dtype=object),
+        'inteiros': pd.Series([1, 2, 2, 0, -3, 123456, 2 ** 53 + 1], dtype=np.int64),
+        'inteiros_positivos': pd.Series([5, 7, 5, 9], dtype=np.int64),
+        'floats': pd.Series([1.0, 2.5, np.nan, -0.0, 0.0, 0.9, 3.0, -2.0, 1e17], dtype=np.float64),
+        'floats_sem_validos': pd.Series([np.nan, 0.0, -1.5], dtype=np.float64),
+        'floats_infinitos': pd.Series([3.0, np.inf, -np.inf, np.nan], dtype=np.float64),
+        'booleanos': pd.Series([True, False, True]),
+        'vazio': pd.Series([], dtype=object),
+    }
+
+
+def legacy_columns() -> dict:
+    """Colunas das planilhas antigas gravadas em ``instance/`` (vazio se não houver)."""
+    columns = {}
+    for path in sorted(INSTANCE_DIR.glob('last_*_planilha.pkl')):
+        frame = pd.read_pickle(path)
+        for column in frame.columns:
+            columns[f'{path.stem}:{column}'] = frame[column]
+    return columns
+
+
+def _same_values(expected: pd.Series, result: pd.Series) -> bool:
+    left = expected.to_numpy()
+    right = result.to_numpy()
+    if left.dtype.kind == 'f':
+        return left.tobytes() == right.tobytes()
+    return all(
+        type(a) is type(b) and (a is b or (pd.isna(a) and pd.isna(b)) or a == b)
+        for a, b in zip(left, right)
+    )
+
+
+def assert_equivalent(series: pd.Series, scalar, vectorized):
+    try:
+        expected = series.apply(scalar)
+    except Exception as err:
+        expected = err
+    try:
+        result = vectorized(series)
+    except Exception as err:
+        result = err
+    if isinstance(expected, Exception) or isinstance(result, Exception):
+        assert type(expected) is type(result), f'{expected!r} != {result!r}'
+        return
+    assert expected.dtype == result.dtype
+    assert expected.index.equals(result.index)
+    assert _same_values(expected, result), 'valores diferentes'
+
+
+@pytest.mark.parametrize('func_name', SERIES_FUNCTIONS)
+@pytest.mark.parametrize('column_name', sample_series())
+def test_series_matches_scalar(column_name, func_name):
+    scalar, vectorized = SERIES_FUNCTIONS[func_name]
+    assert_equivalent(sample_series()[column_name], scalar, vectorized)
+
+
+@pytest.mark.parametrize('func_name', SERIES_FUNCTIONS)
+def test_series_matches_scalar_on_legacy_sheets(func_name):
+    columns = legacy_columns()
+    if not columns:
+        pytest.skip('sem planilhas antigas em instance/')
+    scalar, vectorized = SERIES_FUNCTIONS[func_name]
+    for column_name, series in columns.items():
+        try:
+            assert_equivalent(series, scalar, vectorized)
+        except AssertionError as err:
+            raise AssertionError(f'{column_name}: {err}') from None
+
+
+@pytest.mark.parametrize('value', ['inf', ' -inf ', 'Infinity', float('inf'), float('-inf'), float('nan')])
+def test_normalize_matricula_rejects_non_finite(value):
+    assert normalize_matricula(value) is None